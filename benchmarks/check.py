@@ -0,0 +1,100 @@
+import contextlib
+import ipaddress
+import os
+import socket
+import sys
+import threading
+import time
+
+from ping3 import ping
+
+from netcut.check import check_host
+from netcut.portscan import raise_fd_limit
+
+# `netcut check` over HOSTS addresses in 127.0.0.0/8 against the old
+# per-host path (one ping3 echo, then one blocking connect, host after
+# host), which is sampled since it only ever handles one host at a time:
+# - answering: every address answers ICMP echo and reaches a TCP listener.
+#   Loopback round trips are close to zero, the old path's best case
+# - filtered: the listener's accept queue is full, so the kernel drops the
+#   SYNs and every connect waits out TIMEOUT, like a firewalled port
+HOSTS = 10_000
+COUNT = 3
+TIMEOUT = 2.0
+SAMPLE = 200
+FILTERED_SAMPLE = 3
+
+def listen():
+    # bound to every address so all of 127.0.0.0/8 connects; accepted
+    # connections are closed straight away
+    sock = socket.create_server(("0.0.0.0", 0), backlog=4096)
+
+    def accept():
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            conn.close()
+    threading.Thread(target=accept, daemon=True).start()
+    return [sock]
+
+def tarpit():
+    sock = socket.create_server(("0.0.0.0", 0), backlog=0)
+    fillers = []
+    for _ in range(2):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex(("127.0.0.1", sock.getsockname()[1]))
+        fillers.append(filler)
+    time.sleep(0.2)
+    return [sock] + fillers
+
+def old_path(hosts, port):
+    started = time.perf_counter()
+    for host in hosts:
+        ping(host, timeout=TIMEOUT)
+        try:
+            with socket.create_connection((host, port), timeout=TIMEOUT):
+                pass
+        except OSError:
+            pass
+    return (time.perf_counter() - started) / len(hosts)
+
+def run(socks, hosts, count, sample):
+    port = socks[0].getsockname()[1]
+    try:
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results = check_host(hosts, port=port, count=count, timeout=TIMEOUT, jsonl=True)
+        elapsed = time.perf_counter() - started
+        per_host = old_path(hosts[:sample], port)
+    finally:
+        for sock in socks:
+            sock.close()
+    return results, elapsed, per_host
+
+def report(name, count, elapsed, per_host):
+    print(f"   {name:<9} netcut {HOSTS:,} hosts x {count} probes in {elapsed:.1f}s ({HOSTS / elapsed:,.0f} hosts/s), "
+          f"old path {1 / per_host:,.1f} hosts/s with one probe each ({per_host * HOSTS:,.0f}s projected), "
+          f"{per_host * HOSTS / elapsed:.1f}x")
+
+def main():
+    raise_fd_limit(2048)
+    hosts = [str(ip) for ip in ipaddress.ip_network("127.1.0.0/16").hosts()][:HOSTS]
+    results, elapsed, per_host = run(listen(), hosts, COUNT, SAMPLE)
+    icmp = sum(r["icmp"]["received"] == COUNT for r in results)
+    tcp = sum(r["tcp"]["received"] == COUNT for r in results)
+    ok = icmp == tcp == HOSTS
+    print(f"{'✅' if ok else '❌'} {icmp}/{HOSTS} hosts answered every echo, {tcp}/{HOSTS} every connect")
+    report("answering", COUNT, elapsed, per_host)
+
+    results, elapsed, per_host = run(tarpit(), hosts, 1, FILTERED_SAMPLE)
+    filtered = sum(r["tcp"]["state"] == "filtered" for r in results)
+    ok = ok and filtered == HOSTS
+    print(f"{'✅' if filtered == HOSTS else '❌'} {filtered}/{HOSTS} filtered ports timed out")
+    report("filtered", 1, elapsed, per_host)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import netcut.cache
+from netcut.geo import RangeDatabase
+
+# lookups per second through the local range index against the per-address
+# ip-api request `netcut geo` used to make, here served by a loopback
+# stand-in so only the client side is measured. RANGES random IPv4 ranges
+# are written to a CSV, LOOKUPS random addresses are looked up
+RANGES = 500_000
+LOOKUPS = 1_000_000
+API_LOOKUPS = 1000
+SAMPLE = 1000
+PLACES = [("AU", "Queensland", "Brisbane", "APNIC"), ("NL", "North Holland", "Amsterdam", None),
+          ("US", "California", "Los Angeles", "Example"), ("JP", "Tokyo", "Tokyo", None), ("BR", "", "", "")]
+
+class Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = json.dumps({"country": "NL", "regionName": "North Holland", "city": "Amsterdam",
+                           "isp": "Example", "query": self.path.rsplit("/", 1)[-1]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def write_ranges(path, rng):
+    bounds = sorted(rng.sample(range(2 ** 32), 2 * RANGES))
+    ranges = [(bounds[i], bounds[i + 1], rng.choice(PLACES)) for i in range(0, len(bounds), 2)]
+    with open(path, "w") as f:
+        for start, end, place in ranges:
+            f.write(f"{start},{end},{','.join(value or '' for value in place)}\n")
+    return ranges
+
+def expected(ranges, starts, ip):
+    value = int.from_bytes(bytes(map(int, ip.split("."))), "big")
+    i = bisect_right(starts, value) - 1
+    if i < 0 or ranges[i][1] < value:
+        return None
+    return tuple(value or None for value in ranges[i][2])
+
+def old_path(ips):
+    # one request per address, which is what geo_lookup did before
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        started = time.perf_counter()
+        for ip in ips:
+            requests.get(f"http://127.0.0.1:{server.server_port}/json/{ip}", timeout=3).json()
+        return time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def main():
+    rng = random.Random(14)
+    with tempfile.TemporaryDirectory() as tmp:
+        netcut.cache.CACHE_ROOT = os.path.join(tmp, "cache")
+        path = os.path.join(tmp, "ranges.csv")
+        ranges = write_ranges(path, rng)
+        started = time.perf_counter()
+        RangeDatabase.load(path)
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        db = RangeDatabase.load(path)
+        loaded = time.perf_counter() - started
+
+    ips = [".".join(map(str, rng.getrandbits(32).to_bytes(4, "big"))) for _ in range(LOOKUPS)]
+    lookup = db.lookup
+    started = time.perf_counter()
+    hits = sum(lookup(ip) is not None for ip in ips)
+    elapsed = time.perf_counter() - started
+
+    starts = [start for start, _, _ in ranges]
+    ok = all(db.lookup(ip) == expected(ranges, starts, ip) for ip in rng.sample(ips, SAMPLE))
+    print(f"{'✅' if ok else '❌'} {SAMPLE} sampled lookups match the source ranges")
+    print(f"   {len(db):,} ranges: CSV parse + index {built:.2f}s, cached index load {loaded:.2f}s")
+    print(f"   range index {LOOKUPS:,} lookups in {elapsed:.2f}s ({LOOKUPS / elapsed:,.0f}/s, {hits:,} hits)")
+    api = old_path(ips[:API_LOOKUPS])
+    print(f"   old path    {API_LOOKUPS:,} requests in {api:.2f}s ({API_LOOKUPS / api:,.0f}/s against loopback), "
+          f"{api / API_LOOKUPS * LOOKUPS / elapsed:,.0f}x")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+from scapy.utils import PcapReader
+
+from netcut.flows import FlowTable
+from netcut.packets import flow_of, read_chunk
+from netcut.pcapfile import Capture
+
+# offline replay rate of the sniffer: a synthetic Ethernet/IPv4 capture read
+# through the mmap'd raw-header path, against dissecting every packet with
+# scapy the way the sniffer used to (scapy is sampled, it is far slower)
+PACKETS = 200000
+FLOWS = 5000
+SAMPLE = 20000
+
+def write_capture(path, packets, flows):
+    rng = random.Random(1)
+    keys = [(rng.choice((6, 17)), rng.getrandbits(32), rng.getrandbits(32), rng.randrange(1024, 65536),
+             rng.choice((53, 80, 443))) for _ in range(flows)]
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for i in range(packets):
+            proto, src, dst, sport, dport = keys[rng.randrange(flows)]
+            l4 = struct.pack("!HHIIBBHHH", sport, dport, i, 0, 0x50, 0x18, 65535, 0, 0) if proto == 6 \
+                else struct.pack("!HHHH", sport, dport, 8, 0)
+            payload = bytes(rng.randrange(0, 200))
+            ip = struct.pack("!BBHHHBBHII", 0x45, 0, 20 + len(l4) + len(payload), i & 0xFFFF, 0, 64, proto, 0,
+                             src, dst)
+            frame = b"\x02" * 6 + b"\x04" * 6 + b"\x08\x00" + ip + l4 + payload
+            f.write(struct.pack("<IIII", 1_700_000_000 + i // 1000, i % 1000 * 1000, len(frame), len(frame)))
+            f.write(frame)
+
+def netcut_replay(path):
+    table = FlowTable(sys.maxsize, math.inf)
+    started = time.perf_counter()
+    with Capture(path) as capture:
+        read_chunk(capture, table, None)
+    return time.perf_counter() - started, table
+
+def scapy_replay(path, limit):
+    flows = set()
+    started = time.perf_counter()
+    with PcapReader(path) as reader:
+        for i, pkt in enumerate(reader):
+            if i == limit:
+                break
+            flows.add(flow_of(pkt))
+    return (time.perf_counter() - started) / limit
+
+def main():
+    fd, path = tempfile.mkstemp(suffix=".pcap")
+    os.close(fd)
+    try:
+        write_capture(path, PACKETS, FLOWS)
+        elapsed, table = netcut_replay(path)
+        per_packet = scapy_replay(path, SAMPLE)
+    finally:
+        os.remove(path)
+    ok = table.packets == PACKETS and len(table) <= FLOWS
+    print(f"{'✅' if ok else '❌'} netcut {table.packets} packets, {len(table)} flows in {elapsed:.2f}s "
+          f"({table.packets / elapsed:,.0f} pkt/s)")
+    print(f"   scapy  {1 / per_packet:,.0f} pkt/s over the first {SAMPLE} packets, "
+          f"{per_packet * PACKETS / elapsed:.0f}x slower")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
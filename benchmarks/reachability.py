@@ -0,0 +1,78 @@
+import contextlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from netcut.reachability import check_reachability
+
+# throughput of `netcut reachability` as --concurrency grows, over pooled
+# keep-alive connections, against one fresh request at a time, the way it
+# used to check URLs. HOSTS loopback servers each answer after DELAY
+# seconds; they run in their own process so they don't compete with the
+# client for the GIL. Past the point where client and servers saturate the
+# CPU, more concurrency stops paying off
+HOSTS = 8
+URLS = 400
+DELAY = 0.05
+LEVELS = (1, 8, 32, 128)
+PER_HOST = 32
+
+class Slow(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(DELAY)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+def serve(count, ports):
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), Slow) for _ in range(count)]
+    for server in servers:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    ports.put([server.server_port for server in servers])
+    threading.Event().wait()
+
+def main():
+    ports = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(HOSTS, ports), daemon=True)
+    server.start()
+    hosts = ports.get()
+    urls = [f"http://127.0.0.1:{hosts[i % HOSTS]}/{i}" for i in range(URLS)]
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("\n".join(urls))
+    timings = {}
+    try:
+        started = time.perf_counter()
+        for url in urls:
+            requests.get(url, timeout=3)
+        sequential = time.perf_counter() - started
+        for level in LEVELS:
+            started = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                check_reachability(f.name, level, PER_HOST)
+            timings[level] = time.perf_counter() - started
+    finally:
+        os.remove(f.name)
+        server.terminate()
+    print(f"   {URLS} URLs over {HOSTS} hosts, {DELAY * 1000:.0f} ms per response, --per-host {PER_HOST}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"   sequential          {URLS / sequential:7,.0f} URLs/s ({sequential:.2f}s)")
+    for level, elapsed in timings.items():
+        print(f"   --concurrency {level:<5} {URLS / elapsed:7,.0f} URLs/s ({elapsed:.2f}s), {sequential / elapsed:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
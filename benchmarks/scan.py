@@ -0,0 +1,99 @@
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from netcut.portscan import OPEN, ScanController, iter_probes, raise_fd_limit, run_scan
+
+# scan throughput through the selector engine against the thread-pool scan it
+# replaced (create_connection with a 0.5 s timeout on 100 workers):
+# - loopback: closed ports answer with an immediate RST, a few listeners are
+#   mixed in and must all be found
+# - filtered: listeners whose accept queue is already full, so the kernel
+#   drops every further SYN and each probe waits out its timeout, the same
+#   as a firewalled host
+PORTS = 20000
+LISTENERS = 20
+FILTERED_PORTS = 3000
+TIMEOUT = 0.5
+WORKERS = 100
+CONCURRENCY = 1000
+
+def listen(count, backlog=128):
+    socks = []
+    for _ in range(count):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(backlog)
+        socks.append(sock)
+    return socks
+
+def tarpits(count):
+    socks = listen(count, 0)
+    fillers = []
+    for sock in socks:
+        for _ in range(2):
+            filler = socket.socket()
+            filler.setblocking(False)
+            filler.connect_ex(sock.getsockname())
+            fillers.append(filler)
+    time.sleep(0.2)
+    return socks + fillers, [sock.getsockname()[1] for sock in socks]
+
+def engine(host, ports, timeout=None):
+    found = []
+
+    def on_result(target, state, rtt):
+        if state == OPEN:
+            found.append(target[2])
+
+    started = time.perf_counter()
+    controller = ScanController(raise_fd_limit(CONCURRENCY), timeout=timeout)
+    run_scan(iter_probes([(socket.AF_INET, host, host)], ports), controller, on_result, CONCURRENCY)
+    return time.perf_counter() - started, set(found)
+
+def scan_port(host, port):
+    try:
+        with socket.create_connection((host, port), timeout=TIMEOUT):
+            return port
+    except OSError:
+        return None
+
+def thread_pool(host, ports):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        found = {port for port in executor.map(lambda p: scan_port(host, p), ports) if port}
+    return time.perf_counter() - started, found
+
+def report(name, count, elapsed, baseline):
+    print(f"   {name:<9} engine {count / elapsed:,.0f} ports/s ({elapsed:.2f}s), "
+          f"thread pool {count / baseline:,.0f} ports/s ({baseline:.2f}s), {baseline / elapsed:.1f}x")
+
+def main():
+    raise_fd_limit(CONCURRENCY + 3 * FILTERED_PORTS + 256)
+    socks = listen(LISTENERS)
+    opened = {sock.getsockname()[1] for sock in socks}
+    ports = sorted(set(range(1, PORTS - LISTENERS + 1)) | opened)
+    try:
+        elapsed, found = engine("127.0.0.1", ports)
+        baseline, pooled = thread_pool("127.0.0.1", ports)
+    finally:
+        for sock in socks:
+            sock.close()
+    ok = opened <= found and opened <= pooled
+    print(f"{'✅' if ok else '❌'} {len(opened & found)}/{len(opened)} loopback listeners found")
+    report("loopback", len(ports), elapsed, baseline)
+
+    socks, ports = tarpits(FILTERED_PORTS)
+    try:
+        elapsed, found = engine("127.0.0.1", ports, TIMEOUT)
+        baseline, _ = thread_pool("127.0.0.1", ports)
+    finally:
+        for sock in socks:
+            sock.close()
+    print(f"{'✅' if not found else '❌'} {len(ports) - len(found)}/{len(ports)} filtered ports timed out")
+    report("filtered", len(ports), elapsed, baseline)
+    return 0 if ok and not found else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,12 +11,14 @@ setup(
         'requests',
         'scapy',
         'dnspython',
-        'beautifulsoup4',
-        'speedtest-cli',
-        'python-whois',
         'psutil',
-        'ping3'
+        'speedtest-cli',
+        'rich'
     ],
+    extras_require={
+        'geo': ['maxminddb'],
+        'batch': ['pyyaml'],
+    },
     entry_points={
         'console_scripts': [
             'netcut=netcut.main:main',
@@ -28,5 +30,5 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.7',
+    python_requires='>=3.10',
 )
\ No newline at end of file
@@ -1,24 +1,344 @@
-import requests
+import http.client
+import math
+import socket
+import ssl
+import threading
 import time
+from array import array
+from collections import Counter
+from urllib.parse import urlsplit
 
-def monitor_api(url, headers):
-    hdrs = {}
-    if headers:
+import requests
+from rich.console import Console
+from rich.table import Table
+
+from netcut.history import HistoryStore
+from netcut.output import emit, show
+
+PHASES = ("dns", "connect", "tls", "ttfb", "body")
+# HDR-style buckets: values below 128 us are exact, above that every power
+# of two is split into 64 linear sub-buckets, i.e. ~1.5% relative precision
+SUB_BITS = 6
+SUB_COUNT = 1 << SUB_BITS
+BUCKETS = 2 * SUB_COUNT + 40 * SUB_COUNT
+
+class Histogram:
+    __slots__ = ("counts", "total", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKETS))
+        self.total = 0
+        self.sum = 0
+        self.min = math.inf
+        self.max = 0
+
+    @staticmethod
+    def index(us):
+        if us < 2 * SUB_COUNT:
+            return us
+        shift = us.bit_length() - SUB_BITS - 1
+        return 2 * SUB_COUNT + (shift - 1) * SUB_COUNT + (us >> shift) - SUB_COUNT
+
+    @staticmethod
+    def value(index):
+        if index < 2 * SUB_COUNT:
+            return index
+        shift, sub = divmod(index - 2 * SUB_COUNT, SUB_COUNT)
+        shift += 1
+        return ((sub + SUB_COUNT) << shift) + (1 << shift) // 2
+
+    def record(self, ns):
+        us = ns // 1000
+        self.counts[min(BUCKETS - 1, self.index(us))] += 1
+        self.total += 1
+        self.sum += us
+        self.min = min(self.min, us)
+        self.max = max(self.max, us)
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(self.value(i), self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.total:
+            return None
+        ms = lambda us: round(us / 1000, 3)
+        return {"count": self.total, "min": ms(self.min), "mean": ms(self.sum / self.total),
+                **{f"p{q}".replace(".", ""): ms(self.percentile(q)) for q in (50, 90, 99, 99.9)}, "max": ms(self.max)}
+
+class Client:
+    # one keep-alive connection; connections are opened by hand so that name
+    # resolution, TCP connect and the TLS handshake can be timed separately
+    def __init__(self, url, timeout, context):
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.timeout = timeout
+        self.context = context
+        self.conn = None
+
+    def connect(self, phases):
+        t0 = time.perf_counter_ns()
+        family, kind, proto, _, addr = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)[0]
+        t1 = time.perf_counter_ns()
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(addr)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            t2 = time.perf_counter_ns()
+            if self.scheme == "https":
+                sock = self.context.wrap_socket(sock, server_hostname=self.host)
+        except BaseException:
+            sock.close()
+            raise
+        t3 = time.perf_counter_ns()
+        phases.update(dns=t1 - t0, connect=t2 - t1)
+        if self.scheme == "https":
+            phases["tls"] = t3 - t2
+        # http.client only connects when it has no socket, so hand it ours
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        self.conn.sock = sock
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def request(self, method, path, body, headers):
+        for attempt in range(2):
+            phases = {}
+            reused = self.conn is not None
+            if not reused:
+                self.connect(phases)
+            try:
+                sent = time.perf_counter_ns()
+                self.conn.request(method, path, body, headers)
+                response = self.conn.getresponse()
+                first = time.perf_counter_ns()
+                size = len(response.read())
+                done = time.perf_counter_ns()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                # the server may drop an idle keep-alive connection; that
+                # costs a reconnect, not an error
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                self.close()
+                raise
+            phases.update(ttfb=first - sent, body=done - first)
+            if response.will_close:
+                self.close()
+            return response.status, size, phases
+
+class LoadRun:
+    def __init__(self, url, method="GET", body=None, headers=None, timeout=10.0, insecure=False):
+        self.url = urlsplit(url)
+        if self.url.scheme not in ("http", "https") or not self.url.hostname:
+            raise ValueError(f"unsupported URL: {url}")
+        self.path = (self.url.path or "/") + (f"?{self.url.query}" if self.url.query else "")
+        self.method = method
+        self.body = body
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.context = ssl.create_default_context()
+        if insecure:
+            self.context.check_hostname = False
+            self.context.verify_mode = ssl.CERT_NONE
+        self.lock = threading.Lock()
+        self.latency = Histogram()
+        self.phases = {phase: Histogram() for phase in PHASES}
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.bytes = 0
+        self.connections = 0
+
+    def worker(self, next_slot):
+        client = Client(self.url, self.timeout, self.context)
+        latency = Histogram()
+        phases = {phase: Histogram() for phase in PHASES}
+        statuses, errors, received, connections = Counter(), Counter(), 0, 0
         try:
-            for h in headers.split(";"):
-                if ":" in h:
-                    k, v = h.split(":", 1)
-                    hdrs[k.strip()] = v.strip()
-        except Exception as e:
-            print(f"❌ Failed to parse headers: {e}")
-            return
+            while (start := next_slot()) is not None:
+                try:
+                    status, size, timings = client.request(self.method, self.path, self.body, self.headers)
+                except (OSError, http.client.HTTPException, ValueError) as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                # latency runs from the intended start, so a stalled server
+                # is charged for the requests that queued up behind it
+                latency.record(time.perf_counter_ns() - start)
+                for phase, ns in timings.items():
+                    phases[phase].record(ns)
+                connections += "connect" in timings
+                statuses[status] += 1
+                received += size
+        finally:
+            client.close()
+            with self.lock:
+                self.latency.merge(latency)
+                for phase in PHASES:
+                    self.phases[phase].merge(phases[phase])
+                self.statuses.update(statuses)
+                self.errors.update(errors)
+                self.bytes += received
+                self.connections += connections
+
+    def run(self, count=None, concurrency=10, duration=None, rate=None):
+        # closed loop: every worker fires its next request as soon as the
+        # last one finished. open loop (--rate): requests are due on a fixed
+        # schedule whether or not earlier ones have come back
+        lock = threading.Lock()
+        issued = 0
+        started = time.perf_counter_ns()
+        deadline = started + int(duration * 1e9) if duration else None
+        interval = int(1e9 / rate) if rate else 0
+
+        def next_slot():
+            nonlocal issued
+            with lock:
+                if count is not None and issued >= count:
+                    return None
+                due = started + issued * interval if interval else time.perf_counter_ns()
+                if deadline is not None and due >= deadline:
+                    return None
+                issued += 1
+            wait = due - time.perf_counter_ns()
+            if wait > 0:
+                time.sleep(wait / 1e9)
+            return due
+
+        threads = [threading.Thread(target=self.worker, args=(next_slot,), daemon=True) for _ in range(max(1, concurrency))]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.2)
+        except KeyboardInterrupt:
+            with lock:
+                count = issued
+            for thread in threads:
+                thread.join()
+        return (time.perf_counter_ns() - started) / 1e9
+
+    def summary(self, elapsed, concurrency, rate):
+        completed = self.latency.total
+        return {"url": self.url.geturl(), "method": self.method, "mode": "open" if rate else "closed",
+                "concurrency": concurrency, "rate": rate, "elapsed": round(elapsed, 3), "completed": completed,
+                "errors": dict(self.errors), "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "throughput": round(completed / elapsed, 1) if elapsed else None,
+                "bytes_per_sec": round(self.bytes / elapsed) if elapsed else None, "connections": self.connections,
+                "latency": self.latency.summary(), "phases": {phase: self.phases[phase].summary() for phase in PHASES}}
+
+def render(summary):
+    table = Table(title=f"{summary['method']} {summary['url']} — {summary['completed']} requests in "
+                        f"{summary['elapsed']:.2f}s ({summary['throughput']} req/s, {summary['mode']} loop)")
+    table.add_column("Phase", style="bold cyan")
+    for column in ("Count", "Min", "Mean", "p50", "p90", "p99", "p99.9", "Max"):
+        table.add_column(column, justify="right")
+    rows = [("total", summary["latency"])] + list(summary["phases"].items())
+    for name, stats in rows:
+        if not stats:
+            continue
+        table.add_row(name, str(stats["count"]), *(f"{stats[key]:.2f}" for key in ("min", "mean", "p50", "p90", "p99", "p999", "max")))
+    return table
+
+def read_body(data, data_file):
+    if data_file:
+        with open(data_file, "rb") as f:
+            return f.read()
+    return data.encode() if data is not None else None
 
+def parse_headers(headers):
+    hdrs = {}
+    for h in (headers or "").split(";"):
+        if ":" in h:
+            k, v = h.split(":", 1)
+            hdrs[k.strip()] = v.strip()
+    return hdrs
+
+def benchmark_api(url, headers=None, method="GET", body=None, count=None, concurrency=10, duration=None, rate=None,
+                  timeout=10.0, insecure=False, record=False, jsonl=False):
+    console = Console()
+    if count is None and duration is None:
+        count = 1000 if rate is None else None
+        duration = 10.0 if rate else None
     try:
-        start = time.time()
-        r = requests.get(url, headers=hdrs)
-        end = time.time()
-        print("Status Code:", r.status_code)
-        print("Latency (ms):", round((end - start) * 1000, 2))
-        print("Headers:", r.headers)
+        run = LoadRun(url, method, body, parse_headers(headers), timeout, insecure)
+    except ValueError as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return None
+    if not jsonl:
+        target = f"{count} requests" if count else f"{duration}s"
+        pace = f"{rate} req/s open loop" if rate else "closed loop"
+        console.print(f"🚀 {method} {url}: {target}, {concurrency} connections, {pace}")
+    elapsed = run.run(count, concurrency, duration, rate)
+    summary = run.summary(elapsed, concurrency, rate)
+    if record and summary["latency"]:
+        store = HistoryStore()
+        store.append(f"api:{url}", time.time(), not run.errors and all(code < 400 for code in run.statuses),
+                     summary["latency"]["p50"])
+        store.close()
+    if jsonl:
+        emit(summary)
+        return summary
+    console.print(render(summary))
+    statuses = ", ".join(f"{code}×{count}" for code, count in summary["statuses"].items()) or "none"
+    errors = ", ".join(f"{name}×{count}" for name, count in summary["errors"].items()) or "none"
+    console.print(f"Status codes: {statuses} | errors: {errors} | connections opened: {summary['connections']} | "
+                  f"{summary['bytes_per_sec'] / 1024:.1f} KiB/s")
+    return summary
+
+def probe(url, hdrs, method="GET", body=None, timeout=10.0):
+    result = {"url": url, "method": method, "ok": False, "status": None, "latency_ms": None, "headers": None}
+    try:
+        start = time.perf_counter()
+        r = requests.request(method, url, headers=hdrs, data=body, timeout=timeout)
+        end = time.perf_counter()
     except Exception as e:
-        print("Error:", e)
\ No newline at end of file
+        result["error"] = str(e)
+        return result
+    result.update(ok=r.status_code < 400, status=r.status_code, latency_ms=round((end - start) * 1000, 2),
+                  headers=dict(r.headers))
+    return result
+
+def render_probe(result):
+    if "error" in result:
+        print("Error:", result["error"])
+        return
+    print("Status Code:", result["status"])
+    print("Latency (ms):", result["latency_ms"])
+    print("Headers:", result["headers"])
+
+def monitor_api(url, headers, record=False, method="GET", body=None, timeout=10.0):
+    try:
+        hdrs = parse_headers(headers)
+    except Exception as e:
+        print(f"❌ Failed to parse headers: {e}")
+        return
+
+    result = probe(url, hdrs, method, body, timeout)
+    if record:
+        store = HistoryStore()
+        store.append(f"api:{url}", time.time(), result["ok"], result["latency_ms"])
+        store.close()
+    return show(result, render_probe)
@@ -1,23 +1,26 @@
-import os
-from collections import defaultdict
 from rich.console import Console
 from rich.table import Table
+from netcut.neighbors import read_neighbors, watch_neighbors
+from netcut.output import show_all
 
-def view_arp_table():
+def render(records):
     console = Console()
-    arp_table = os.popen("arp -a").read()
     table = Table(title="ARP Table")
     table.add_column("IP")
     table.add_column("MAC")
     table.add_column("Interface")
-    mac_map = defaultdict(list)
-    for line in arp_table.splitlines():
-        parts = line.split()
-        if len(parts) >= 3:
-            ip, mac, iface = parts[0], parts[1], parts[-1]
-            mac_map[mac].append(ip)
-            table.add_row(ip, mac, iface)
+    for r in records:
+        table.add_row(r["ip"], r["mac"], r["interface"])
     console.print(table)
-    for mac, ips in mac_map.items():
-        if len(ips) > 1:
-            console.print(f"[bold red]Potential ARP spoofing detected on MAC {mac} used by: {', '.join(ips)}[/bold red]")
\ No newline at end of file
+    conflicts = {}
+    for r in records:
+        if r["conflict"]:
+            conflicts.setdefault(r["mac"], []).append(r["ip"])
+    for mac, ips in conflicts.items():
+        console.print(f"[bold red]Potential ARP spoofing detected on MAC {mac} used by: {', '.join(sorted(ips))}[/bold red]")
+
+def view_arp_table(watch=False, interval=2.0):
+    if watch:
+        watch_neighbors(Console(), interval)
+        return
+    return show_all(read_neighbors().records(), render)
@@ -1,19 +1,255 @@
-import psutil
+import math
+import socket
+import threading
 import time
-from rich.console import Console
+from array import array
+
+import psutil
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 
-def show_bandwidth():
+from netcut.flows import parse_frame
+from netcut.output import emit, status, structured
+
+# time constant of the rate smoothing, in seconds, so the display reacts the
+# same way whatever the sampling interval is
+SMOOTHING = 5.0
+PROC_ROWS = 10
+ETH_P_ALL = 3
+PACKET_OUTGOING = 4
+ARPHRD_LOOPBACK = 772
+# link header length by ARPHRD_* type; tun and other raw-IP devices have none
+LINK_HEADERS = {1: 14, ARPHRD_LOOPBACK: 14}
+
+class Meter:
+    __slots__ = ("tx", "rx", "ring", "pos", "count")
+
+    def __init__(self, size):
+        self.tx = None
+        self.rx = None
+        self.ring = array("d", bytes(8 * size))
+        self.pos = 0
+        self.count = 0
+
+    def update(self, tx, rx, alpha):
+        if self.tx is None:
+            self.tx, self.rx = tx, rx
+        else:
+            self.tx += alpha * (tx - self.tx)
+            self.rx += alpha * (rx - self.rx)
+        ring = self.ring
+        ring[self.pos] = tx + rx
+        self.pos = (self.pos + 1) % len(ring)
+        if self.count < len(ring):
+            self.count += 1
+
+    def peak(self):
+        return max(self.ring[:self.count], default=0.0)
+
+    def p95(self):
+        if not self.count:
+            return 0.0
+        values = sorted(self.ring[:self.count])
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+class ProcessTraffic:
+    # nethogs-style attribution: frames are captured and charged to whichever
+    # process owns the local (proto, address, port); the socket table is
+    # refreshed on its own slower cadence because walking it is the
+    # expensive part
+    def __init__(self, window):
+        # an unbound packet socket sees every interface, Linux only
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        self.window = window
+        self.sockets = {}
+        self.names = {}
+        self.counts = {}
+        self.meters = {}
+        self.refresh()
+        threading.Thread(target=self.capture, daemon=True).start()
+
+    def refresh(self):
+        sockets = {}
+        for conn in psutil.net_connections(kind="inet"):
+            if conn.pid is None or not conn.laddr:
+                continue
+            proto = 6 if conn.type == socket.SOCK_STREAM else 17
+            ip = conn.laddr.ip
+            addr = None if ip in ("0.0.0.0", "::") else socket.inet_pton(conn.family, ip)
+            sockets[(proto, addr, conn.laddr.port)] = conn.pid
+        self.sockets = sockets
+
+    def owner(self, proto, addr, port):
+        sockets = self.sockets
+        return sockets.get((proto, addr, port)) or sockets.get((proto, None, port))
+
+    def capture(self):
+        recv = self.sock.recvfrom
+        while True:
+            try:
+                data, (_, _, pkttype, hatype, _) = recv(65535)
+            except OSError:
+                return
+            if hatype == ARPHRD_LOOPBACK and pkttype == PACKET_OUTGOING:
+                # loopback frames show up once per direction
+                continue
+            flow = parse_frame(data, LINK_HEADERS.get(hatype, 0))
+            if flow is None or (flow[0] != 6 and flow[0] != 17):
+                continue
+            proto, src, dst, sport, dport = flow
+            # a frame landing in the dict that sample() just swapped out is
+            # dropped; that is at most one frame per interval
+            counts = self.counts
+            pid = self.owner(proto, src, sport)
+            if pid:
+                counts.setdefault(pid, [0, 0])[0] += len(data)
+            pid = self.owner(proto, dst, dport)
+            if pid:
+                counts.setdefault(pid, [0, 0])[1] += len(data)
+
+    def sample(self, dt, alpha):
+        counts, self.counts = self.counts, {}
+        meters = self.meters
+        for pid, (tx, rx) in counts.items():
+            meter = meters.get(pid)
+            if meter is None:
+                meter = meters[pid] = Meter(self.window)
+            meter.update(tx / dt, rx / dt, alpha)
+        for pid in list(meters):
+            if pid in counts:
+                continue
+            meter = meters[pid]
+            meter.update(0.0, 0.0, alpha)
+            if meter.tx + meter.rx < 1:
+                del meters[pid]
+                self.names.pop(pid, None)
+
+    def name(self, pid):
+        name = self.names.get(pid)
+        if name is None:
+            try:
+                name = psutil.Process(pid).name()
+            except psutil.Error:
+                name = "?"
+            self.names[pid] = name
+        return name
+
+    def close(self):
+        self.sock.close()
+
+class BandwidthMonitor:
+    def __init__(self, window=60, procs=None):
+        self.window = window
+        self.procs = procs
+        self.meters = {}
+        self.prev = psutil.net_io_counters(pernic=True)
+        self.last = time.monotonic()
+
+    def sample(self):
+        now = time.monotonic()
+        dt = max(now - self.last, 1e-3)
+        self.last = now
+        alpha = 1 - math.exp(-dt / SMOOTHING)
+        curr = psutil.net_io_counters(pernic=True)
+        prev = self.prev
+        meters = self.meters
+        for iface, counters in curr.items():
+            before = prev.get(iface)
+            if before is None:
+                # interface appeared since the last sample, rates start next time
+                continue
+            meter = meters.get(iface)
+            if meter is None:
+                meter = meters[iface] = Meter(self.window)
+            tx = max(counters.bytes_sent - before.bytes_sent, 0) / dt
+            rx = max(counters.bytes_recv - before.bytes_recv, 0) / dt
+            meter.update(tx, rx, alpha)
+        for iface in list(meters):
+            if iface not in curr:
+                del meters[iface]
+        self.prev = curr
+        if self.procs:
+            self.procs.sample(dt, alpha)
+
+    def records(self):
+        # interface and process rows share one shape, so CSV gets one header
+        stamp = time.time()
+        rows = [{"time": stamp, "interface": iface, "pid": None, "process": None, "tx_bps": round(meter.tx),
+                 "rx_bps": round(meter.rx), "peak_bps": round(meter.peak()), "p95_bps": round(meter.p95())}
+                for iface, meter in sorted(self.meters.items())]
+        if self.procs:
+            busiest = sorted(self.procs.meters.items(), key=lambda item: item[1].tx + item[1].rx, reverse=True)
+            rows += [{"time": stamp, "interface": None, "pid": pid, "process": self.procs.name(pid),
+                      "tx_bps": round(meter.tx), "rx_bps": round(meter.rx), "peak_bps": round(meter.peak()),
+                      "p95_bps": round(meter.p95())} for pid, meter in busiest[:PROC_ROWS]]
+        return rows
+
+    def render(self):
+        table = Table(title="Bandwidth Usage by Interface")
+        table.add_column("Interface")
+        table.add_column("TX (KB/s)", justify="right")
+        table.add_column("RX (KB/s)", justify="right")
+        table.add_column("Peak (KB/s)", justify="right")
+        table.add_column("p95 (KB/s)", justify="right")
+        for iface, meter in sorted(self.meters.items()):
+            table.add_row(iface, f"{meter.tx / 1024:.2f}", f"{meter.rx / 1024:.2f}",
+                          f"{meter.peak() / 1024:.2f}", f"{meter.p95() / 1024:.2f}")
+        if not self.procs:
+            return table
+        procs = Table(title="Bandwidth Usage by Process")
+        procs.add_column("PID", justify="right")
+        procs.add_column("Process")
+        procs.add_column("TX (KB/s)", justify="right")
+        procs.add_column("RX (KB/s)", justify="right")
+        procs.add_column("Peak (KB/s)", justify="right")
+        busiest = sorted(self.procs.meters.items(), key=lambda item: item[1].tx + item[1].rx, reverse=True)
+        for pid, meter in busiest[:PROC_ROWS]:
+            procs.add_row(str(pid), self.procs.name(pid), f"{meter.tx / 1024:.2f}",
+                          f"{meter.rx / 1024:.2f}", f"{meter.peak() / 1024:.2f}")
+        return Group(table, procs)
+
+def show_bandwidth(watch=False, interval=1.0, window=60, procs=False, proc_interval=5.0):
     console = Console()
-    prev = psutil.net_io_counters(pernic=True)
-    time.sleep(1)
-    curr = psutil.net_io_counters(pernic=True)
-    table = Table(title="Bandwidth Usage by Interface")
-    table.add_column("Interface")
-    table.add_column("TX (KB/s)")
-    table.add_column("RX (KB/s)")
-    for iface in curr:
-        tx = (curr[iface].bytes_sent - prev[iface].bytes_sent) / 1024
-        rx = (curr[iface].bytes_recv - prev[iface].bytes_recv) / 1024
-        table.add_row(iface, f"{tx:.2f}", f"{rx:.2f}")
-    console.print(table)
\ No newline at end of file
+    interval = max(interval, 0.1)
+    traffic = None
+    if procs:
+        try:
+            traffic = ProcessTraffic(window)
+        except (OSError, AttributeError) as e:
+            status(f"⚠️ Per-process attribution needs packet capture rights ({e}); showing interfaces only.")
+    monitor = BandwidthMonitor(window, traffic)
+    live = None
+    try:
+        if not watch:
+            time.sleep(interval)
+            monitor.sample()
+            if structured():
+                return [emit(row) for row in monitor.records()]
+            console.print(monitor.render())
+            return
+        next_tick = time.monotonic() + interval
+        next_refresh = time.monotonic() + proc_interval
+        if not structured():
+            live = Live(monitor.render(), console=console, auto_refresh=False)
+            live.start()
+        while True:
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick += interval
+            monitor.sample()
+            if traffic and time.monotonic() >= next_refresh:
+                traffic.refresh()
+                next_refresh = time.monotonic() + proc_interval
+            if live:
+                live.update(monitor.render(), refresh=True)
+            else:
+                # one batch of rows per tick, streamed as it is sampled
+                for row in monitor.records():
+                    emit(row)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if live:
+            live.stop()
+        if traffic:
+            traffic.close()
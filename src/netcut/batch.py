@@ -0,0 +1,183 @@
+import io
+import json
+import shlex
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from netcut import output, reachability
+from netcut.main import build_parser, dispatch, output_mode
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# keep-alive connections kept per host in the pools every job shares
+POOL_SIZE = 32
+
+class JobOutput:
+    # stands in for sys.stdout/sys.stderr while a batch runs: whatever a job
+    # prints lands in that job's buffer. threads that belong to no job write
+    # to the real stderr, so stdout carries nothing but result lines
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def capture(self, buffer):
+        self.local.buffer = buffer
+
+    def target(self):
+        return getattr(self.local, "buffer", None) or self.fallback
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        self.target().flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+def parse_job(entry, number):
+    # a job is a command line ("check example.com --port 443"), an argv list,
+    # or {"id": ..., "args": <either of those>}
+    job_id = number
+    if isinstance(entry, dict):
+        job_id = entry.get("id", number)
+        entry = entry.get("args", "")
+    argv = shlex.split(entry) if isinstance(entry, str) else [str(arg) for arg in entry]
+    if argv[:1] == ["netcut"]:
+        argv = argv[1:]
+    return job_id, argv
+
+def jobs_in(data):
+    return data["jobs"] if isinstance(data, dict) else data or []
+
+def iter_entries(source):
+    # a JSON document (a list of jobs, or {"jobs": [...]}), YAML with the same
+    # layout, or one job per line. lines are read as they arrive, so an
+    # orchestrator can keep a pipe open and feed one long-running process
+    stream = sys.stdin if source == "-" else open(source)
+    try:
+        if source.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("YAML job files need the PyYAML package (pip install netcut[batch])")
+            yield from jobs_in(yaml.safe_load(stream))
+            return
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line[0] not in "[{":
+                yield line
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                # not a line of its own: the start of a multi-line document
+                yield from jobs_in(json.loads(line + stream.read()))
+                return
+            if isinstance(data, dict) and "jobs" in data or isinstance(data, list) and not all(
+                    isinstance(arg, str) for arg in data):
+                yield from jobs_in(data)
+            else:
+                yield data
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def records_of(output):
+    # jobs run with --json print one array, with --jsonl one JSON object per
+    # line; hand those back parsed instead of as text (CSV stays text)
+    if output.lstrip().startswith("["):
+        try:
+            records = json.loads(output)
+        except ValueError:
+            return None
+        return records if isinstance(records, list) else None
+    lines = [line for line in output.splitlines() if line.strip()]
+    try:
+        return [json.loads(line) for line in lines] if lines else None
+    except ValueError:
+        return None
+
+def run_job(parser, job_id, argv, stdout, stderr):
+    out, err = io.StringIO(), io.StringIO()
+    stdout.capture(out)
+    stderr.capture(err)
+    result = {"id": job_id, "command": argv[0] if argv else None, "argv": argv, "ok": True}
+    started = time.perf_counter()
+    try:
+        args = parser.parse_args(argv)
+        if args.command in (None, "batch"):
+            parser.error("a batch job needs a command other than batch")
+        # the job's own --json/--jsonl/--csv, scoped to this thread
+        with output.job(output_mode(args)):
+            value = dispatch(parser, args)
+        if value is not None:
+            result["result"] = value
+    except SystemExit as e:
+        # argparse errors and --help end in sys.exit()
+        result["ok"] = not e.code
+        if e.code:
+            result["error"] = err.getvalue().strip().splitlines()[-1] if err.getvalue().strip() else f"exit {e.code}"
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    finally:
+        stdout.capture(None)
+        stderr.capture(None)
+    result["elapsed"] = round(time.perf_counter() - started, 3)
+    text = out.getvalue()
+    records = records_of(text)
+    if records is not None:
+        result["records"] = records
+    elif text:
+        result["output"] = text
+    if err.getvalue():
+        result["stderr"] = err.getvalue()
+    return result
+
+def run_batch(source, concurrency=8):
+    parser = build_parser()
+    real_stdout, real_stderr = sys.stdout, sys.stderr
+    stdout, stderr = JobOutput(real_stderr), JobOutput(real_stderr)
+    lock = threading.Lock()
+    results = []
+
+    def emit(result):
+        with lock:
+            results.append(result)
+            real_stdout.write(json.dumps(result, default=str) + "\n")
+            real_stdout.flush()
+
+    # jobs share the imported modules, the resolver's cache and one set of
+    # HTTP keep-alive pools for as long as the batch runs
+    reachability.shared = reachability.make_session(POOL_SIZE, cls=reachability.SharedSession)
+    started = time.perf_counter()
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for number, entry in enumerate(iter_entries(source), 1):
+                try:
+                    job_id, argv = parse_job(entry, number)
+                except (ValueError, TypeError, AttributeError) as e:
+                    emit({"id": number, "argv": entry, "ok": False, "error": f"bad job: {e}"})
+                    continue
+                pool.submit(run_job, parser, job_id, argv, stdout, stderr).add_done_callback(
+                    lambda future: emit(future.result()))
+    except (OSError, ValueError, KeyError, RuntimeError) as e:
+        print(f"❌ Could not read jobs from {source}: {e}", file=real_stderr)
+        return results
+    finally:
+        sys.stdout, sys.stderr = real_stdout, real_stderr
+        session, reachability.shared = reachability.shared, None
+        session.close()
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"{'✅' if not failed else '⚠️'} {len(results)} jobs, {failed} failed in "
+          f"{time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return results
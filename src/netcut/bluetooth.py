@@ -1,37 +1,63 @@
+import re
 import subprocess
 import platform
+from dataclasses import dataclass
 
-def scan_bluetooth():
-    print("Scanning for Bluetooth devices...")
-    system = platform.system()
+from netcut.output import show_all, status
+
+ADDRESS = re.compile(r"([0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5})")
+# blueutil: address: 00-11-22-33-44-55, ..., name: "Phone", ...
+NAME = re.compile(r'name: "([^"]*)"')
+
+@dataclass(slots=True)
+class Device:
+    address: str
+    name: str | None = None
+    paired: bool = False
 
+def parse_devices(output, paired=False):
+    devices = []
+    for line in output.splitlines():
+        match = ADDRESS.search(line)
+        if not match:
+            continue
+        name = NAME.search(line)
+        if name:
+            name = name.group(1)
+        else:
+            # bluetoothctl: "Device AA:BB:CC:DD:EE:FF Name"
+            name = line[match.end():].strip() or None
+        devices.append(Device(match.group(1).upper().replace("-", ":"), name, paired))
+    return devices
+
+def find_devices():
+    system = platform.system()
     if system == "Darwin":
-        try:
-            output = subprocess.check_output(["blueutil", "--inquiry"], text=True)
-            lines = output.strip().splitlines()
-            if lines:
-                print("📡 Discovered Bluetooth devices:")
-                for line in lines:
-                    print(f"🔹 {line}")
-            else:
-                print("⚠️ No active devices found via inquiry. Checking paired devices...")
-                paired = subprocess.check_output(["blueutil", "--paired"], text=True).strip().splitlines()
-                if paired:
-                    print("🔗 Paired Bluetooth devices:")
-                    for line in paired:
-                        print(f"🔸 {line}")
-                else:
-                    print("❌ No Bluetooth devices found.")
-        except FileNotFoundError:
-            print("❌ 'blueutil' is not installed. Install it with: brew install blueutil")
-        except Exception as e:
-            print(f"Error: {e}")
+        devices = parse_devices(subprocess.check_output(["blueutil", "--inquiry"], text=True))
+        if not devices:
+            status("⚠️ No active devices found via inquiry. Checking paired devices...")
+            devices = parse_devices(subprocess.check_output(["blueutil", "--paired"], text=True), paired=True)
+        return devices
+    if system == "Linux":
+        return parse_devices(subprocess.getoutput("bluetoothctl scan on & sleep 5; bluetoothctl devices"))
+    raise RuntimeError("Unsupported platform.")
 
-    elif system == "Linux":
-        try:
-            output = subprocess.getoutput("bluetoothctl scan on & sleep 5; bluetoothctl devices")
-            print(output)
-        except Exception as e:
-            print(f"Error: {e}")
-    else:
-        print("Unsupported platform.")
\ No newline at end of file
+def render(devices):
+    if not devices:
+        print("❌ No Bluetooth devices found.")
+        return
+    print("🔗 Paired Bluetooth devices:" if devices[0].paired else "📡 Discovered Bluetooth devices:")
+    for device in devices:
+        print(f"{'🔸' if device.paired else '🔹'} {device.address} {device.name or ''}".rstrip())
+
+def scan_bluetooth():
+    status("Scanning for Bluetooth devices...")
+    try:
+        devices = find_devices()
+    except FileNotFoundError:
+        status("❌ 'blueutil' is not installed. Install it with: brew install blueutil")
+        return []
+    except Exception as e:
+        status(f"Error: {e}")
+        return []
+    return show_all(devices, render)
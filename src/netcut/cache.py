@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+import time
+
+CACHE_ROOT = os.path.expanduser("~/.netcut/cache")
+
+def cache_path(*parts):
+    path = os.path.join(CACHE_ROOT, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+def load_json(path, default=None):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path, data):
+    # write-then-rename so a crash never leaves a truncated cache behind
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+class TTLCache:
+    # key -> [stored_at, value] in one JSON file; entries older than max_age
+    # are dropped on load and never handed out
+    def __init__(self, path, max_age, size=100000):
+        self.path = path
+        self.max_age = max_age
+        self.size = size
+        cutoff = time.time() - max_age
+        self.entries = {key: entry for key, entry in load_json(path, {}).items() if entry[0] >= cutoff}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.hits = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time() - self.max_age:
+            return None
+        with self.lock:
+            self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = [time.time(), value]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        entries = self.entries
+        if len(entries) > self.size:
+            entries = dict(sorted(entries.items(), key=lambda item: item[1][0])[-self.size:])
+        save_json(self.path, entries)
@@ -1,14 +1,40 @@
-import socket
+from dataclasses import dataclass
+
 import requests
 
-def detect_cdn(domain):
+from netcut.output import show
+from netcut.resolver import resolve_host
+
+@dataclass(slots=True)
+class CDNResult:
+    domain: str
+    ip: str | None = None
+    server: str | None = None
+    via: str | None = None
+    cdn: str | None = None
+    error: str | None = None
+
+def detect(domain):
+    result = CDNResult(domain)
     try:
-        ip = socket.gethostbyname(domain)
-        r = requests.get(f"http://{domain}")
-        headers = r.headers
-        print("IP Address:", ip)
-        print("Server Header:", headers.get("Server", "N/A"))
-        print("Via:", headers.get("Via", "N/A"))
-        print("CDN Detected:", "Cloudflare" if "cf-ray" in headers else "Unknown")
+        result.ip = resolve_host(domain)
+        headers = requests.get(f"http://{domain}").headers
     except Exception as e:
-        print("Error:", e)
\ No newline at end of file
+        result.error = str(e)
+        return result
+    result.server = headers.get("Server")
+    result.via = headers.get("Via")
+    result.cdn = "Cloudflare" if "cf-ray" in headers else None
+    return result
+
+def render(result):
+    if result.error:
+        print("Error:", result.error)
+        return
+    print("IP Address:", result.ip)
+    print("Server Header:", result.server or "N/A")
+    print("Via:", result.via or "N/A")
+    print("CDN Detected:", result.cdn or "Unknown")
+
+def detect_cdn(domain):
+    return show(detect(domain), render)
@@ -1,14 +1,197 @@
+import itertools
+import os
+import select
 import socket
-from ping3 import ping
+import struct
+import threading
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from netcut.history import HistoryStore
+from netcut.output import emit, status
+from netcut.portscan import CLOSED, OPEN, ScanController, raise_fd_limit, read_targets, run_scan
+from netcut.inet import checksum
+from netcut.resolver import resolve_many
+
+ICMP_ECHO = 8
+ICMP_ECHO_REPLY = 0
+# one identifier per Pinger, so pingers running side by side in one process
+# (netcut batch) each see only their own replies
+IDENTS = itertools.count(os.getpid())
+
+class Target:
+    __slots__ = ("host", "ip", "icmp_sent", "icmp", "tcp_sent", "tcp", "tcp_states")
+
+    def __init__(self, host, ip):
+        self.host = host
+        self.ip = ip
+        self.icmp_sent = 0
+        # (probe number, rtt ms), so jitter follows send order
+        self.icmp = []
+        self.tcp_sent = 0
+        self.tcp = []
+        self.tcp_states = {}
+
+def summarize(sent, samples):
+    rtts = [rtt for _, rtt in sorted(samples)]
+    result = {"sent": sent, "received": len(rtts), "loss": round(100 * (1 - len(rtts) / sent), 1) if sent else None}
+    if rtts:
+        # RFC 3550 style: mean difference between consecutive round trips
+        jitter = sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (len(rtts) - 1) if len(rtts) > 1 else 0.0
+        result.update(min=round(min(rtts), 2), avg=round(sum(rtts) / len(rtts), 2), max=round(max(rtts), 2),
+                      jitter=round(jitter, 2))
+    return result
+
+class Pinger:
+    # one ICMP socket for every target; replies are matched on (source,
+    # sequence), and the sequence numbers are handed out globally so tens of
+    # thousands of probes can be in flight at once
+    def __init__(self):
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+        except PermissionError:
+            # unprivileged ICMP (net.ipv4.ping_group_range); the kernel owns
+            # the identifier and only hands us our own replies
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self.raw = False
+        self.sock.setblocking(False)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
+        self.ident = next(IDENTS) & 0xFFFF
+        self.seq = 0
+        self.pending = {}
+        self.timeout = 2.0
+
+    def close(self):
+        self.sock.close()
+
+    def send(self, target, number):
+        self.seq = (self.seq + 1) & 0xFFFF
+        header = struct.pack("!BBHHH", ICMP_ECHO, 0, 0, self.ident, self.seq)
+        body = b"netcut" + bytes(26)
+        packet = header[:2] + struct.pack("!H", checksum(header + body)) + header[4:] + body
+        target.icmp_sent += 1
+        self.pending[(target.ip, self.seq)] = (target, number, time.perf_counter())
+        try:
+            self.sock.sendto(packet, (target.ip, 0))
+        except OSError:
+            pass
+
+    def receive(self, timeout):
+        if not select.select([self.sock], [], [], max(0.0, timeout))[0]:
+            return
+        now = time.perf_counter()
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except BlockingIOError:
+                return
+            if self.raw:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8 or data[0] != ICMP_ECHO_REPLY:
+                continue
+            ident, seq = struct.unpack_from("!HH", data, 4)
+            if self.raw and ident != self.ident:
+                continue
+            probe = self.pending.pop((addr[0], seq), None)
+            if probe is None:
+                continue
+            target, number, sent = probe
+            rtt = now - sent
+            if rtt <= self.timeout:
+                target.icmp.append((number, rtt * 1000))
+
+    def run(self, targets, count=3, interval=1.0, timeout=2.0, rate=5000):
+        # probe k of every target goes out k * interval after the start,
+        # paced at `rate` packets/s, so a round over many hosts simply takes
+        # longer instead of bursting
+        self.timeout = timeout
+        gap = 1.0 / rate if rate else 0.0
+        start = next_send = time.perf_counter()
+        for number in range(count):
+            next_send = max(next_send, start + number * interval)
+            for target in targets:
+                while (wait := next_send - time.perf_counter()) > 0:
+                    self.receive(wait)
+                self.send(target, number)
+                next_send += gap
+            if not gap:
+                self.receive(0)
+        deadline = time.perf_counter() + timeout
+        while self.pending and (left := deadline - time.perf_counter()) > 0:
+            self.receive(left)
+        self.pending.clear()
+
+class RoundController(ScanController):
+    # keeps the Pinger's schedule for connects: probe k of every target may
+    # not leave before k * interval after the first one
+    def __init__(self, per_round, interval, concurrency, rate, timeout):
+        super().__init__(concurrency, rate, timeout)
+        self.per_round = max(1, per_round)
+        self.interval = interval
+        self.start = None
+        self.count = 0
+
+    def send_delay(self, now):
+        if self.start is None:
+            self.start = now
+        due = self.start + self.count // self.per_round * self.interval
+        return max(super().send_delay(now), due - now, 0.0)
+
+    def sent(self, now):
+        super().sent(now)
+        self.count += 1
+
+def tcp_probes(targets, port, count):
+    for number in range(count):
+        for target in targets:
+            family = socket.AF_INET6 if ":" in target.ip else socket.AF_INET
+            addr = (target.ip, port) if family == socket.AF_INET else (target.ip, port, 0, 0)
+            yield family, addr, port, target.ip, (target, number)
+
+def probe_tcp(targets, port, count=3, interval=1.0, timeout=2.0, rate=5000, concurrency=1000):
+    def on_result(probe, state, rtt):
+        target, number = probe[4]
+        target.tcp_sent += 1
+        target.tcp_states[state] = target.tcp_states.get(state, 0) + 1
+        if state == OPEN:
+            target.tcp.append((number, rtt * 1000))
+
+    # connects to the same host are spread out by the probe order already;
+    # per-host limits would only serialize the repeat probes
+    controller = RoundController(len(targets), interval, raise_fd_limit(concurrency), rate, timeout)
+    run_scan(tcp_probes(targets, port, count), controller, on_result)
+
+def probe_hosts(targets, port=80, count=3, interval=1.0, timeout=2.0, rate=5000, concurrency=1000, icmp=True, tcp=True):
+    thread = None
+    if icmp:
+        pinger = Pinger()
+        v4 = [target for target in targets if ":" not in target.ip]
+        thread = threading.Thread(target=pinger.run, args=(v4, count, interval, timeout, rate), daemon=True)
+        thread.start()
+    try:
+        if tcp and port:
+            probe_tcp(targets, port, count, interval, timeout, rate, concurrency)
+    finally:
+        if thread:
+            thread.join()
+            pinger.close()
 
 def icmp_ping(host, timeout=2):
+    ip = resolve_many([host])[0]
+    if ip is None or ":" in ip:
+        return False, None
+    target = Target(host, ip)
+    pinger = Pinger()
     try:
-        delay = ping(host, timeout=timeout)
-        if delay is None:
-            return False, None
-        return True, round(delay * 1000, 2)  # ms
-    except Exception:
+        pinger.run([target], 1, 0, timeout)
+    finally:
+        pinger.close()
+    if not target.icmp:
         return False, None
+    return True, round(target.icmp[0][1], 2)
 
 def tcp_check(host, port, timeout=2):
     try:
@@ -17,18 +200,101 @@ def tcp_check(host, port, timeout=2):
     except Exception:
         return False
 
-def check_host(host, port=80):
-    print(f"🔍 Checking Host: {host}")
-    
-    print("\n🌐 ICMP Ping:")
-    icmp_result, delay = icmp_ping(host)
-    if icmp_result:
-        print(f"✅ ICMP Ping Success - {delay} ms")
-    else:
-        print("❌ ICMP Ping Failed")
-
-    print(f"\n🔌 TCP Port {port} Check:")
-    if tcp_check(host, port):
-        print(f"✅ TCP Port {port} is OPEN")
-    else:
-        print(f"❌ TCP Port {port} is CLOSED or BLOCKED")
\ No newline at end of file
+def tcp_state(target):
+    for state in (OPEN, CLOSED):
+        if target.tcp_states.get(state):
+            return state
+    return "filtered" if target.tcp_sent else None
+
+def result_of(target, port):
+    icmp = summarize(target.icmp_sent, target.icmp)
+    tcp = summarize(target.tcp_sent, target.tcp)
+    return {"host": target.host, "ip": target.ip, "icmp": icmp if target.icmp_sent else None,
+            "tcp": {"port": port, "state": tcp_state(target), **tcp} if target.tcp_sent else None}
+
+def print_single(result):
+    print(f"🔍 Checking Host: {result['host']} ({result['ip']})")
+    icmp = result["icmp"]
+    if icmp:
+        print("\n🌐 ICMP Ping:")
+        if icmp["received"]:
+            print(f"✅ ICMP Ping Success - {icmp['received']}/{icmp['sent']} replies, "
+                  f"min/avg/max/jitter {icmp['min']}/{icmp['avg']}/{icmp['max']}/{icmp['jitter']} ms")
+        else:
+            print("❌ ICMP Ping Failed")
+    tcp = result["tcp"]
+    if tcp:
+        print(f"\n🔌 TCP Port {tcp['port']} Check:")
+        if tcp["state"] == OPEN:
+            print(f"✅ TCP Port {tcp['port']} is OPEN - {tcp['received']}/{tcp['sent']} connects, "
+                  f"min/avg/max/jitter {tcp['min']}/{tcp['avg']}/{tcp['max']}/{tcp['jitter']} ms")
+        else:
+            print(f"❌ TCP Port {tcp['port']} is CLOSED or BLOCKED")
+
+def render(results, port, elapsed):
+    table = Table(title=f"Checked {len(results)} hosts in {elapsed:.1f}s")
+    table.add_column("Host", style="bold cyan")
+    table.add_column("IP")
+    table.add_column("ICMP Loss %", justify="right")
+    table.add_column("Min/Avg/Max ms", justify="right")
+    table.add_column("Jitter", justify="right")
+    table.add_column(f"TCP {port}")
+    table.add_column("Connect ms", justify="right")
+    for r in results:
+        icmp, tcp = r["icmp"] or {}, r["tcp"] or {}
+        rtt = f"{icmp['min']:.1f}/{icmp['avg']:.1f}/{icmp['max']:.1f}" if icmp.get("received") else "-"
+        loss = icmp.get("loss")
+        color = "green" if loss == 0 else "red" if loss == 100 else "yellow"
+        state = tcp.get("state")
+        table.add_row(r["host"], r["ip"] or "-", f"[{color}]{loss:.0f}[/{color}]" if loss is not None else "-", rtt,
+                      f"{icmp['jitter']:.1f}" if icmp.get("received") else "-",
+                      {OPEN: "[green]open[/green]", CLOSED: "[red]closed[/red]"}.get(state, state or "-"),
+                      f"{tcp['avg']:.1f}" if tcp.get("received") else "-")
+    return table
+
+def check_host(hosts, port=80, record=False, file=None, count=3, interval=1.0, timeout=2.0, rate=5000,
+               concurrency=1000, icmp=True, tcp=True, jsonl=False):
+    if isinstance(hosts, str):
+        hosts = [hosts]
+    hosts = list(hosts or [])
+    if file:
+        hosts.extend(read_targets(file))
+    hosts = list(dict.fromkeys(hosts))
+    targets = []
+    results = []
+    for host, ip in zip(hosts, resolve_many(hosts)):
+        if ip is None:
+            results.append({"host": host, "ip": None, "icmp": None, "tcp": None, "error": "does not resolve"})
+        else:
+            targets.append(Target(host, ip))
+    start = time.perf_counter()
+    try:
+        probe_hosts(targets, port, max(1, count), interval, timeout, rate, concurrency, icmp, tcp)
+    except PermissionError:
+        # raised opening the ICMP socket, before any probe went out
+        status("⚠️ ICMP needs raw sockets or net.ipv4.ping_group_range (or root); checking TCP only")
+        probe_hosts(targets, port, max(1, count), interval, timeout, rate, concurrency, False, tcp)
+    elapsed = time.perf_counter() - start
+    results.extend(result_of(target, port) for target in targets)
+
+    if record:
+        store = HistoryStore()
+        now = time.time()
+        for r in results:
+            if r["icmp"]:
+                store.append(f"icmp:{r['host']}", now, r["icmp"]["received"] > 0, r["icmp"].get("avg"))
+            if r["tcp"]:
+                store.append(f"tcp:{r['host']}:{port}", now, r["tcp"]["state"] == OPEN, r["tcp"].get("avg"))
+        store.close()
+
+    if jsonl:
+        for r in results:
+            emit(r)
+    elif len(results) == 1:
+        if results[0]["ip"] is None:
+            print(f"❌ Could not resolve {results[0]['host']}")
+        else:
+            print_single(results[0])
+    elif results:
+        Console().print(render(results, port, elapsed))
+    return results
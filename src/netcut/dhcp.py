@@ -1,7 +1,71 @@
+from dataclasses import dataclass, field
+
+from netcut.output import show, status
+
+LEASE_FILE = "/var/lib/dhcp/dhclient.leases"
+
+@dataclass(slots=True)
+class Lease:
+    interface: str | None = None
+    address: str | None = None
+    server: str | None = None
+    routers: list = field(default_factory=list)
+    dns: list = field(default_factory=list)
+    lease_time: int | None = None
+    renew: str | None = None
+    expire: str | None = None
+
+def when(value):
+    # "2 2024/01/02 03:04:05" (weekday, UTC date and time) -> ISO 8601
+    parts = value.split()
+    return f"{parts[1].replace('/', '-')}T{parts[2]}Z" if len(parts) == 3 else value
+
+def parse_leases(text):
+    leases = []
+    lease = None
+    for line in text.splitlines():
+        line = line.strip().rstrip(";")
+        if line.startswith("lease {"):
+            lease = Lease()
+        elif line == "}" and lease:
+            leases.append(lease)
+            lease = None
+        elif lease:
+            key, _, value = line.partition(" ")
+            if key == "option":
+                key, _, value = value.partition(" ")
+            value = value.strip('"')
+            if key == "interface":
+                lease.interface = value
+            elif key == "fixed-address":
+                lease.address = value
+            elif key == "dhcp-server-identifier":
+                lease.server = value
+            elif key == "routers":
+                lease.routers = value.replace(",", " ").split()
+            elif key == "domain-name-servers":
+                lease.dns = value.replace(",", " ").split()
+            elif key == "dhcp-lease-time" and value.isdigit():
+                lease.lease_time = int(value)
+            elif key in ("renew", "expire"):
+                setattr(lease, key, when(value))
+    return leases
+
+def read_leases(path=LEASE_FILE):
+    with open(path) as f:
+        return parse_leases(f.read())
+
+def render(lease):
+    print(f"{lease.interface or '-'}: {lease.address or '-'} from {lease.server or '-'}, "
+          f"routers {', '.join(lease.routers) or '-'}, DNS {', '.join(lease.dns) or '-'}, "
+          f"renew {lease.renew or '-'}, expires {lease.expire or '-'}")
+
 def view_dhcp_leases():
     try:
-        with open("/var/lib/dhcp/dhclient.leases") as f:
-            leases = f.read()
-            print(leases)
+        leases = read_leases()
     except FileNotFoundError:
-        print("DHCP lease file not found.")
\ No newline at end of file
+        status("DHCP lease file not found.")
+        return []
+    for lease in leases:
+        show(lease, render)
+    return leases
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from array import array
+from collections import Counter
+
+from rich.console import Console
+from rich.table import Table
+
+from netcut.output import emit
+from netcut.resolver import Resolver, DNSError, RDTYPES, system_nameservers
+
+def iter_names(file):
+    with open(file) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+def percentile(values, q):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+class Comparison:
+    # resolves every name through every nameserver and keeps per-server
+    # counters, round-trip times and agreement with the majority answer
+    def __init__(self, servers, rdtype="A", timeout=3.0):
+        self.rdtype = rdtype
+        self.resolvers = {server: Resolver([server], timeout, timings=array("d")) for server in servers}
+        self.stats = {server: Counter() for server in servers}
+        self.names = 0
+
+    async def check(self, name):
+        results = await asyncio.gather(*(resolver.lookup(name, self.rdtype) for resolver in self.resolvers.values()),
+                                       return_exceptions=True)
+        self.names += 1
+        answers = {}
+        for server, result in zip(self.resolvers, results):
+            stats = self.stats[server]
+            if isinstance(result, BaseException):
+                stats["failed"] += 1
+                answers[server] = None
+                continue
+            rcode, records = result
+            stats["nxdomain" if rcode == 3 else "answered" if records else "empty"] += 1
+            answers[server] = frozenset(records)
+        valid = [answer for answer in answers.values() if answer is not None]
+        if len(self.resolvers) > 1 and valid:
+            # CDNs rotate addresses, so any overlap with the most common
+            # answer counts as agreement
+            majority = Counter(valid).most_common(1)[0][0]
+            for server, answer in answers.items():
+                if answer is not None:
+                    self.stats[server]["agree" if answer == majority or answer & majority else "disagree"] += 1
+        return answers
+
+    async def run(self, names, concurrency, on_result=None):
+        queue = asyncio.Queue(concurrency * 2)
+
+        async def worker():
+            while (name := await queue.get()) is not None:
+                answers = await self.check(name)
+                if on_result:
+                    on_result(name, answers)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for name in names:
+                await queue.put(name)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for resolver in self.resolvers.values():
+                resolver.close()
+
+    def summaries(self):
+        rows = []
+        for server, resolver in self.resolvers.items():
+            stats = self.stats[server]
+            timings = sorted(resolver.timings)
+            compared = stats["agree"] + stats["disagree"]
+            p50, p95, p99 = (None if v is None else round(v * 1000, 2)
+                             for v in (percentile(timings, q) for q in (0.5, 0.95, 0.99)))
+            rows.append({"server": server, "answered": stats["answered"], "nxdomain": stats["nxdomain"],
+                         "empty": stats["empty"], "failed": stats["failed"], "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                         "agreement": round(stats["agree"] / compared * 100, 1) if compared else None})
+        return rows
+
+    def render(self, title):
+        table = Table(title=title)
+        table.add_column("Nameserver", style="bold cyan")
+        table.add_column("Answered", justify="right")
+        table.add_column("NXDOMAIN", justify="right")
+        table.add_column("Empty", justify="right")
+        table.add_column("Failed", justify="right", style="red")
+        table.add_column("p50 ms", justify="right")
+        table.add_column("p95 ms", justify="right")
+        table.add_column("p99 ms", justify="right")
+        table.add_column("Agreement", justify="right", style="green")
+        for r in self.summaries():
+            table.add_row(r["server"], str(r["answered"]), str(r["nxdomain"]), str(r["empty"]), str(r["failed"]),
+                          *("-" if r[k] is None else f"{r[k]:.1f}" for k in ("p50_ms", "p95_ms", "p99_ms")),
+                          "-" if r["agreement"] is None else f"{r['agreement']:.1f}%")
+        return table
+
+def bulk_resolve(file, nameservers=None, rdtype="A", concurrency=500, jsonl=False, timeout=3.0):
+    console = Console()
+    rdtype = rdtype.upper()
+    if rdtype not in RDTYPES:
+        console.print(f"[bold red]❌ Record type must be one of {', '.join(RDTYPES)}[/bold red]")
+        return
+    servers = nameservers or system_nameservers()
+    if not servers:
+        console.print("[bold red]❌ No nameservers configured, pass --nameserver[/bold red]")
+        return
+    comparison = Comparison(servers, rdtype, timeout)
+
+    def report(name, answers):
+        record = {"name": name, "answers": {server: None if answer is None else sorted(answer)
+                                            for server, answer in answers.items()}}
+        emit(record)
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(comparison.run(iter_names(file), max(1, concurrency), report if jsonl else None))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, DNSError) as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    title = f"{comparison.names} names, {rdtype}, {elapsed:.1f}s ({comparison.names / elapsed:.0f} names/s)"
+    Console(stderr=jsonl).print(comparison.render(title))
@@ -1,7 +1,43 @@
-import dns.resolver
+import asyncio
 
-def test_dns_leak():
-    resolver = dns.resolver.Resolver()
-    print("Detected DNS Servers:")
-    for server in resolver.nameservers:
-        print(server)
\ No newline at end of file
+from rich.console import Console
+
+from netcut.dns_bulk import Comparison
+from netcut.output import emit, structured
+from netcut.resolver import system_nameservers
+
+REFERENCE = ["1.1.1.1", "8.8.8.8", "9.9.9.9"]
+PROBES = ["example.com", "wikipedia.org", "github.com", "cloudflare.com", "google.com", "amazon.com"]
+# answers with the address the authoritative server saw the query come from,
+# i.e. the resolver's egress rather than the address we sent the query to
+WHOAMI = "whoami.akamai.net"
+
+def test_dns_leak(reference=None):
+    console = Console()
+    system = system_nameservers()
+    if not structured():
+        print("Detected DNS Servers:")
+        for server in system:
+            print(server)
+    servers = system + [server for server in (reference or REFERENCE) if server not in system]
+    comparison = Comparison(servers)
+
+    async def run():
+        egress = await asyncio.gather(*(resolver.resolve(WHOAMI) for resolver in comparison.resolvers.values()),
+                                      return_exceptions=True)
+        await comparison.run(PROBES, len(PROBES))
+        return egress
+
+    egress = asyncio.run(run())
+    records = [{**summary, "role": "system" if server in system else "reference",
+                "egress": result if isinstance(result, list) else []}
+               for server, result, summary in zip(servers, egress, comparison.summaries())]
+    if structured():
+        for record in records:
+            emit(record)
+        return records
+    print("\nResolver egress (as seen by authoritative servers):")
+    for r in records:
+        print(f"  {r['server']:<20} {r['role']:<10} → {', '.join(r['egress']) or 'unknown'}")
+    console.print(comparison.render(f"Resolver comparison over {len(PROBES)} names"))
+    return records
@@ -1,23 +1,69 @@
 import subprocess
 import platform
+from dataclasses import dataclass
 
-def list_rules():
+from netcut.output import show_all, status
+
+@dataclass(slots=True)
+class Rule:
+    backend: str
+    rule: str
+    chain: str | None = None
+    policy: str | None = None
+    target: str | None = None
+    protocol: str | None = None
+    source: str | None = None
+    destination: str | None = None
+    options: str | None = None
+
+def parse_iptables(output):
+    # `iptables -L -n`: a "Chain NAME (policy P)" header, a column header,
+    # then target/prot/opt/source/destination and free-form match options
+    rules = []
+    chain = policy = None
+    for line in output.splitlines():
+        if line.startswith("Chain "):
+            parts = line.split()
+            chain = parts[1]
+            policy = parts[3].rstrip(")") if len(parts) > 3 and parts[2] == "(policy" else None
+            continue
+        fields = line.split(None, 5)
+        if len(fields) < 5 or fields[0] == "target":
+            continue
+        rules.append(Rule("iptables", line.strip(), chain, policy, fields[0], fields[1], fields[3], fields[4],
+                          fields[5].strip() if len(fields) > 5 else None))
+    return rules
+
+def parse_pf(output):
+    return [Rule("pf", line.strip()) for line in output.splitlines() if line.strip()]
+
+def read_rules():
     system = platform.system()
     if system == "Linux":
-        try:
-            output = subprocess.check_output(["sudo", "iptables", "-L", "-n"], text=True)
-            print(output)
-        except Exception as e:
-            print(f"Error listing rules: {e}")
-    elif system == "Darwin":
-        try:
-            output = subprocess.check_output(["sudo", "pfctl", "-sr"], text=True)
-            print("🔒 macOS Packet Filter Rules (pf):\n")
-            if not output.strip():
-                print("⚠️ No active firewall rules found.")
-            else:
-                print(output)
-        except Exception as e:
-            print(f"Error reading pf rules: {e}")
-    else:
-        print("Unsupported platform.")
\ No newline at end of file
+        return parse_iptables(subprocess.check_output(["sudo", "iptables", "-L", "-n"], text=True))
+    if system == "Darwin":
+        return parse_pf(subprocess.check_output(["sudo", "pfctl", "-sr"], text=True))
+    raise RuntimeError("Unsupported platform.")
+
+def render(rules):
+    if rules and rules[0].backend == "pf":
+        print("🔒 macOS Packet Filter Rules (pf):\n")
+    chain = None
+    for i, rule in enumerate(rules):
+        if rule.chain != chain:
+            chain = rule.chain
+            print(("\n" if i else "") + f"Chain {chain}" + (f" (policy {rule.policy})" if rule.policy else ""))
+        print(rule.rule)
+
+def list_rules():
+    try:
+        rules = read_rules()
+    except RuntimeError as e:
+        status(str(e))
+        return []
+    except Exception as e:
+        status(f"Error listing rules: {e}")
+        return []
+    if not rules:
+        status("⚠️ No active firewall rules found.")
+    return show_all(rules, render)
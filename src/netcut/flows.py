@@ -0,0 +1,229 @@
+import csv
+import json
+import socket
+import struct
+from array import array
+from collections import OrderedDict
+from heapq import nlargest
+
+from rich.table import Table
+
+IP_PROTOS = {1: "ICMP", 6: "TCP", 17: "UDP", 58: "ICMPv6", 132: "SCTP"}
+EXPORT_FIELDS = ("proto", "src", "sport", "dst", "dport", "packets", "bytes", "first", "last")
+PORTED = {6, 17, 132}
+PORTS = struct.Struct("!HH")
+
+def parse_frame(data, header, start=0, end=None):
+    # data may be a bytes frame or a whole mmap'd capture with the frame at
+    # [start, end); slicing either yields bytes, so flow keys stay hashable
+    end = len(data) if end is None else end
+    offset = start + header
+    if end < offset + 20:
+        return None
+    if header == 14:
+        ethertype = data[start + 12] << 8 | data[start + 13]
+        if ethertype == 0x8100:
+            ethertype = data[start + 16] << 8 | data[start + 17]
+            offset += 4
+            if end < offset + 20:
+                return None
+        if ethertype != 0x0800 and ethertype != 0x86DD:
+            return None
+    version = data[offset] >> 4
+    if version == 4:
+        proto = data[offset + 9]
+        src = data[offset + 12:offset + 16]
+        dst = data[offset + 16:offset + 20]
+        l4 = offset + (data[offset] & 0x0F) * 4
+        fragment = (data[offset + 6] & 0x1F) << 8 | data[offset + 7]
+    elif version == 6 and end >= offset + 40:
+        proto = data[offset + 6]
+        src = data[offset + 8:offset + 24]
+        dst = data[offset + 24:offset + 40]
+        l4 = offset + 40
+        fragment = 0
+    else:
+        return None
+    if proto in PORTED and not fragment and end >= l4 + 4:
+        sport, dport = PORTS.unpack_from(data, l4)
+    else:
+        sport = dport = 0
+    return proto, src, dst, sport, dport
+
+def format_ip(raw):
+    return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, raw)
+
+def format_addr(raw, port):
+    addr = format_ip(raw)
+    if not port:
+        return addr
+    return f"{addr}:{port}" if len(raw) == 4 else f"[{addr}]:{port}"
+
+class Flow:
+    __slots__ = ("key", "packets", "bytes", "first", "last", "second", "buckets", "window_bytes")
+
+    def __init__(self, key, ts, window):
+        self.key = key
+        self.packets = 0
+        self.bytes = 0
+        self.first = ts
+        self.last = ts
+        self.second = int(ts)
+        self.buckets = array("Q", bytes(8 * window))
+        self.window_bytes = 0
+
+    def add(self, length, ts):
+        self.packets += 1
+        self.bytes += length
+        self.last = ts
+        second = int(ts)
+        buckets = self.buckets
+        window = len(buckets)
+        if second < self.second:
+            # late packets are counted in the current second
+            second = self.second
+        elif second != self.second:
+            # clear the per-second slots we skipped over since the last packet
+            gap = min(second - self.second, window)
+            for s in range(second - gap + 1, second + 1):
+                slot = s % window
+                self.window_bytes -= buckets[slot]
+                buckets[slot] = 0
+            self.second = second
+        buckets[second % window] += length
+        self.window_bytes += length
+
+    def rate(self, now):
+        window = len(self.buckets)
+        age = int(now) - self.second
+        if age >= window:
+            return 0.0
+        total = self.window_bytes
+        for s in range(self.second - window + 1, self.second - window + 1 + age):
+            total -= self.buckets[s % window]
+        return total / window
+
+    def record(self):
+        proto, src, dst, sport, dport = self.key
+        return {"proto": IP_PROTOS.get(proto, str(proto)), "src": format_ip(src), "sport": sport,
+                "dst": format_ip(dst), "dport": dport, "packets": self.packets, "bytes": self.bytes,
+                "first": round(self.first, 6), "last": round(self.last, 6)}
+
+class FlowTable:
+    def __init__(self, max_flows=65536, idle_timeout=120, window=10, on_evict=None):
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.window = window
+        self.on_evict = on_evict
+        # insertion order doubles as last-seen order because every hit is
+        # moved to the end, so idle and LRU eviction both pop from the front
+        self.flows = OrderedDict()
+        self.packets = 0
+        self.bytes = 0
+        self.evicted = 0
+        self.now = 0.0
+        self.next_expire = 0.0
+
+    def __len__(self):
+        return len(self.flows)
+
+    def add(self, key, length, ts):
+        self.packets += 1
+        self.bytes += length
+        if ts > self.now:
+            self.now = ts
+        flows = self.flows
+        flow = flows.get(key)
+        if flow is None:
+            if len(flows) >= self.max_flows:
+                self.evict(flows.popitem(last=False)[1])
+            flow = flows[key] = Flow(key, ts, self.window)
+        else:
+            flows.move_to_end(key)
+        flow.add(length, ts)
+        if ts >= self.next_expire:
+            self.expire(ts)
+            self.next_expire = ts + 1
+
+    def merge(self, key, packets, size, first, last):
+        # folds in a partial aggregate from another table (offline chunks);
+        # the per-second window is not meaningful across chunks
+        self.packets += packets
+        self.bytes += size
+        if last > self.now:
+            self.now = last
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = Flow(key, first, self.window)
+        flow.packets += packets
+        flow.bytes += size
+        flow.first = min(flow.first, first)
+        flow.last = max(flow.last, last)
+
+    def partial(self):
+        return [(flow.key, flow.packets, flow.bytes, flow.first, flow.last) for flow in self.flows.values()]
+
+    def expire(self, now):
+        flows = self.flows
+        cutoff = now - self.idle_timeout
+        while flows:
+            flow = next(iter(flows.values()))
+            if flow.last >= cutoff:
+                break
+            self.evict(flows.popitem(last=False)[1])
+
+    def evict(self, flow):
+        self.evicted += 1
+        if self.on_evict:
+            self.on_evict(flow)
+
+    def snapshot(self):
+        # list() of a dict view runs without releasing the GIL, so a render
+        # thread gets a consistent copy while capture keeps mutating
+        return list(self.flows.values())
+
+    def top(self, n, by="bytes"):
+        flows = self.snapshot()
+        if by == "rate":
+            now = self.now
+            return [(flow, flow.rate(now)) for flow in nlargest(n, flows, key=lambda flow: flow.rate(now))]
+        return [(flow, None) for flow in nlargest(n, flows, key=lambda flow: flow.bytes)]
+
+    def drain(self):
+        while self.flows:
+            self.evict(self.flows.popitem(last=False)[1])
+
+def render_flows(table, rows=20, by="bytes", title=None):
+    view = Table(title=title, show_header=True, header_style="bold magenta")
+    view.add_column("Src")
+    view.add_column("Dst")
+    view.add_column("Proto")
+    view.add_column("Packets", justify="right")
+    view.add_column("Bytes", justify="right")
+    if by == "rate":
+        view.add_column(f"KB/s ({table.window}s)", justify="right")
+    for flow, rate in table.top(rows, by):
+        proto, src, dst, sport, dport = flow.key
+        row = [format_addr(src, sport), format_addr(dst, dport), IP_PROTOS.get(proto, str(proto)), str(flow.packets), str(flow.bytes)]
+        if by == "rate":
+            row.append(f"{rate / 1024:.1f}")
+        view.add_row(*row)
+    return view
+
+class FlowExporter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+        if path.endswith(".csv"):
+            self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, flow):
+        record = flow.record()
+        if self.writer:
+            self.writer.writerow(record)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
@@ -1,12 +1,326 @@
-import requests
+import csv
+import hashlib
+import json
+import os
 import socket
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+import requests
+from rich.console import Console
+from rich.table import Table
+
+from netcut.cache import cache_path, load_json, save_json
+from netcut.output import emit
+from netcut.resolver import resolve_many
+
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
+
+API_BATCH = "http://ip-api.com/batch"
+API_FIELDS = "status,message,country,regionName,city,isp,query"
+API_CHUNK = 100
+CACHE_SIZE = 100000
+CACHE_AGE = 30 * 86400
+FIELDS = ("country", "region", "city", "isp")
+# compiled index: header, records as JSON, then the range columns as raw
+# arrays; IPv6 bounds are split into high and low 64-bit halves
+INDEX_MAGIC = b"NCGEO\x00\x01\n"
+INDEX_HEADER = struct.Struct("<8s32sQQQ")
+LOW64 = (1 << 64) - 1
+
+def parse_ip(text):
+    # (version, integer) without going through ipaddress, which dominates
+    # the cost of a lookup otherwise
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, text), "big")
+    except OSError:
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, text), "big")
+    except OSError:
+        return None
+
+def parse_bound(text):
+    text = text.strip()
+    if text.isdigit():
+        value = int(text)
+        return (4 if value < 2 ** 32 else 6), value
+    return parse_ip(text)
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.digest()
+
+class RangeDatabase:
+    # sorted, non-overlapping [start, end] ranges per address family; a
+    # lookup is one bisect over the starts plus a bounds check on the end
+    def __init__(self):
+        self.records = []
+        self.v4 = (array("I"), array("I"), array("I"))
+        self.v6 = ([], [], array("I"))
+
+    @classmethod
+    def from_csv(cls, path):
+        # rows are start,end,country,region,city[,isp]; bounds are either
+        # integers (IP2Location style) or addresses (DB-IP style)
+        rows = {4: [], 6: []}
+        records = {}
+        with open(path, newline="") as f:
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                start, end = parse_bound(row[0]), parse_bound(row[1])
+                if start is None or end is None or start[0] != end[0]:
+                    continue
+                record = tuple((row[i].strip() or None) if i < len(row) else None for i in range(2, 6))
+                index = records.setdefault(record, len(records))
+                rows[start[0]].append((start[1], end[1], index))
+        db = cls()
+        db.records = list(records)
+        for version, table in ((4, db.v4), (6, db.v6)):
+            starts, ends, indexes = table
+            for start, end, index in sorted(rows[version]):
+                starts.append(start)
+                ends.append(end)
+                indexes.append(index)
+        return db
+
+    @classmethod
+    def load(cls, path):
+        # the parsed index is kept next to the other caches, one per CSV path,
+        # and rebuilt whenever the content changes; hashing a full city
+        # database takes a fraction of a second, parsing it many seconds
+        path = os.path.abspath(path)
+        digest = file_digest(path)
+        key = hashlib.sha256(path.encode()).hexdigest()[:16]
+        compiled = cache_path("geo", f"{os.path.basename(path)}.{key}.idx")
+        try:
+            db = cls.read_index(compiled, digest)
+        except (OSError, EOFError, ValueError, struct.error):
+            # missing, truncated or written by an older netcut
+            db = None
+        if db is None:
+            db = cls.from_csv(path)
+            db.write_index(compiled, digest)
+        return db
+
+    @classmethod
+    def read_index(cls, path, digest):
+        with open(path, "rb") as f:
+            magic, stored, v4, v6, size = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or stored != digest:
+                return None
+            db = cls()
+            db.records = [tuple(record) for record in json.loads(f.read(size))]
+            for column in db.v4:
+                column.fromfile(f, v4)
+            halves = [array("Q") for _ in range(4)]
+            for column in (*halves, db.v6[2]):
+                column.fromfile(f, v6)
+        starts = [high << 64 | low for high, low in zip(halves[0], halves[1])]
+        ends = [high << 64 | low for high, low in zip(halves[2], halves[3])]
+        db.v6 = (starts, ends, db.v6[2])
+        return db
+
+    def write_index(self, path, digest):
+        records = json.dumps(self.records).encode()
+        halves = [array("Q", (value >> shift & LOW64 for value in column)) for column in self.v6[:2] for shift in (64, 0)]
+        with open(path + ".tmp", "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, digest, len(self.v4[0]), len(self.v6[0]), len(records)))
+            f.write(records)
+            for column in (*self.v4, *halves, self.v6[2]):
+                column.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    def __len__(self):
+        return len(self.v4[0]) + len(self.v6[0])
+
+    def lookup(self, ip):
+        parsed = parse_ip(ip)
+        if parsed is None:
+            return None
+        starts, ends, indexes = self.v4 if parsed[0] == 4 else self.v6
+        i = bisect_right(starts, parsed[1]) - 1
+        if i < 0 or ends[i] < parsed[1]:
+            return None
+        return self.records[indexes[i]]
+
+class MMDBDatabase:
+    def __init__(self, path):
+        if maxminddb is None:
+            raise RuntimeError("reading .mmdb files needs the maxminddb package (pip install maxminddb)")
+        self.reader = maxminddb.open_database(path)
+
+    def __len__(self):
+        return self.reader.metadata().node_count
+
+    def lookup(self, ip):
+        try:
+            data = self.reader.get(ip)
+        except ValueError:
+            return None
+        if not data:
+            return None
+        name = lambda entry: (entry or {}).get("names", {}).get("en")
+        subdivisions = data.get("subdivisions") or [None]
+        return (name(data.get("country")), name(subdivisions[0]), name(data.get("city")),
+                data.get("autonomous_system_organization") or data.get("isp"))
+
+def open_database(path):
+    if path.endswith(".mmdb"):
+        return MMDBDatabase(path)
+    return RangeDatabase.load(path)
+
+class GeoCache:
+    # persistent LRU in front of the hosted API, bounded in size and age
+    def __init__(self, path=None, size=CACHE_SIZE, max_age=CACHE_AGE):
+        self.path = path or cache_path("geo.json")
+        self.size = size
+        cutoff = time.time() - max_age
+        self.entries = OrderedDict((ip, entry) for ip, entry in load_json(self.path, []) if entry[0] >= cutoff)
+        self.dirty = False
+
+    def get(self, ip):
+        entry = self.entries.get(ip)
+        if entry is None:
+            return None
+        # recency only reaches disk with the next put; a run made entirely
+        # of hits leaves the file alone
+        self.entries.move_to_end(ip)
+        return tuple(entry[1])
+
+    def put(self, ip, record):
+        self.entries[ip] = (time.time(), record)
+        self.entries.move_to_end(ip)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            save_json(self.path, list(self.entries.items()))
+
+def query_api(ips, session, console):
+    # ip-api's batch endpoint takes 100 addresses per request and reports
+    # its remaining quota in X-Rl / X-Ttl, so we wait instead of getting 429s
+    for i in range(0, len(ips), API_CHUNK):
+        chunk = ips[i:i + API_CHUNK]
+        response = session.post(API_BATCH, params={"fields": API_FIELDS}, json=chunk, timeout=10)
+        if response.status_code == 429:
+            wait = int(response.headers.get("X-Ttl", 60))
+            console.print(f"[yellow]⏳ ip-api rate limit reached, waiting {wait}s[/yellow]")
+            time.sleep(wait)
+            response = session.post(API_BATCH, params={"fields": API_FIELDS}, json=chunk, timeout=10)
+        response.raise_for_status()
+        for item in response.json():
+            if item.get("status") == "success":
+                yield item["query"], (item.get("country"), item.get("regionName"), item.get("city"), item.get("isp"))
+        if response.headers.get("X-Rl") == "0" and i + API_CHUNK < len(ips):
+            wait = int(response.headers.get("X-Ttl", 60))
+            console.print(f"[yellow]⏳ ip-api quota used up, waiting {wait}s[/yellow]")
+            time.sleep(wait)
+
+def iter_hosts(hosts, file):
+    yield from hosts
+    if file:
+        f = sys.stdin if file == "-" else open(file)
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def geo_lookup(hosts, file=None, db=None, offline=False, jsonl=False, concurrency=64):
+    console = Console(stderr=jsonl)
+    hosts = list(dict.fromkeys(iter_hosts(hosts, file)))
+    if not hosts:
+        console.print("[bold red]❌ No hosts given[/bold red]")
+        return
+    db = db or os.environ.get("NETCUT_GEO_DB")
+    database = None
+    if db:
+        try:
+            database = open_database(db)
+        except (OSError, RuntimeError, ValueError) as e:
+            console.print(f"[bold red]❌ Cannot open geo database {db}: {e}[/bold red]")
+            return
+
+    ips = {}
+    names = []
+    for host in hosts:
+        if parse_ip(host) is None:
+            names.append(host)
+        else:
+            ips[host] = host
+    if names:
+        ips.update(zip(names, resolve_many(names, max(1, concurrency))))
+
+    results = {}
+    missing = []
+    cache = GeoCache()
+    for ip in set(ip for ip in ips.values() if ip):
+        record = database.lookup(ip) if database else None
+        if record is not None:
+            results[ip] = (record, "db")
+            continue
+        record = cache.get(ip)
+        if record is not None:
+            results[ip] = (record, "cache")
+        else:
+            missing.append(ip)
+    if missing and not offline:
+        try:
+            with requests.Session() as session:
+                for ip, record in query_api(missing, session, console):
+                    cache.put(ip, record)
+                    results[ip] = (record, "api")
+        except (requests.RequestException, ValueError) as e:
+            console.print(f"[yellow]⚠️ ip-api lookup failed: {e}[/yellow]")
+    cache.save()
 
-def geo_lookup(host):
-    ip = socket.gethostbyname(host)
-    response = requests.get(f"http://ip-api.com/json/{ip}").json()
-    
-    print(f"[{host}] -> {ip}")
-    print("Country:", response.get("country"))
-    print("Region:", response.get("regionName"))
-    print("City:", response.get("city"))
-    print("ISP:", response.get("isp"))
\ No newline at end of file
+    if jsonl:
+        records = []
+        for host in hosts:
+            ip = ips[host]
+            record, source = results.get(ip, ((None,) * 4, None))
+            records.append(emit({"host": host, "ip": ip, **dict(zip(FIELDS, record)), "source": source}))
+        return records
+    if len(hosts) == 1:
+        host = hosts[0]
+        ip = ips[host]
+        if ip is None:
+            print(f"[{host}] -> could not resolve")
+            return
+        record = results.get(ip, ((None,) * 4, None))[0]
+        print(f"[{host}] -> {ip}")
+        print("Country:", record[0])
+        print("Region:", record[1])
+        print("City:", record[2])
+        print("ISP:", record[3])
+        return
+    table = Table(title=f"Geo lookup ({len(hosts)} hosts)")
+    table.add_column("Host", style="bold cyan")
+    table.add_column("IP")
+    table.add_column("Country")
+    table.add_column("Region")
+    table.add_column("City")
+    table.add_column("ISP")
+    table.add_column("Source", style="dim")
+    for host in hosts:
+        ip = ips[host]
+        record, source = results.get(ip, ((None,) * 4, None))
+        table.add_row(host, ip or "-", *(value or "-" for value in record), source or "-")
+    console.print(table)
@@ -0,0 +1,403 @@
+import bisect
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+from array import array
+
+DEFAULT_ROOT = os.path.expanduser("~/.netcut/history")
+
+# one flat file per column keeps samples compact (13 bytes each) and lets
+# readers mmap a column and bisect timestamps without parsing anything
+COLUMNS = (("ts", "d"), ("up", "B"), ("lat", "f"))
+NAN = float("nan")
+
+# rollups are fixed-size records per aligned bucket, kept next to the raw
+# samples and updated in place as samples arrive
+RESOLUTIONS = (86400, 3600, 60)
+RETENTION = {"raw": 7 * 86400, 60: 30 * 86400, 3600: 400 * 86400, 86400: None}
+
+# latency histogram: log buckets from 0.05 ms growing by 25%, the last one
+# catching everything above ~60 s; percentiles are accurate to a bucket
+HIST_BASE = 0.05
+HIST_GROWTH = 1.25
+HIST_BUCKETS = 64
+LOG_GROWTH = math.log(HIST_GROWTH)
+
+ROLLUP = struct.Struct(f"<qIIIdffdddf{HIST_BUCKETS}I")
+KEY = struct.Struct("<q")
+START, COUNT, UP, LAT_COUNT, LAT_SUM, LAT_MIN, LAT_MAX, FIRST_UP, DOWN_SINCE, LAST, MAX_DOWN = range(11)
+HIST = 11
+
+def series_key(name):
+    # the readable part is for people browsing the directory; the digest
+    # keeps names that sanitize alike ("a:b", "a_b") in separate series
+    readable = re.sub(r"[^A-Za-z0-9._-]", "_", name)[:48]
+    return f"{readable}-{hashlib.sha256(name.encode()).hexdigest()[:16]}"
+
+def map_column(path, code):
+    itemsize = array(code).itemsize
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return None, memoryview(b"").cast(code)
+    size -= size % itemsize
+    if not size:
+        return None, memoryview(b"").cast(code)
+    with open(path, "rb") as f:
+        m = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    return m, memoryview(m).cast(code)
+
+def hist_index(latency):
+    if latency <= HIST_BASE:
+        return 0
+    return min(HIST_BUCKETS - 1, int(math.log(latency / HIST_BASE) / LOG_GROWTH) + 1)
+
+def hist_value(index):
+    if index == 0:
+        return HIST_BASE
+    return HIST_BASE * HIST_GROWTH ** (index - 0.5)
+
+def new_bucket(start):
+    return [start, 0, 0, 0, 0.0, math.inf, 0.0, NAN, NAN, NAN, 0.0] + [0] * HIST_BUCKETS
+
+def fold_sample(bucket, ts, up, latency):
+    bucket[COUNT] += 1
+    bucket[LAST] = ts
+    if latency == latency:
+        bucket[LAT_COUNT] += 1
+        bucket[LAT_SUM] += latency
+        bucket[LAT_MIN] = min(bucket[LAT_MIN], latency)
+        bucket[LAT_MAX] = max(bucket[LAT_MAX], latency)
+        bucket[HIST + hist_index(latency)] += 1
+    if up:
+        bucket[UP] += 1
+        if bucket[DOWN_SINCE] == bucket[DOWN_SINCE]:
+            bucket[MAX_DOWN] = max(bucket[MAX_DOWN], ts - bucket[DOWN_SINCE])
+            bucket[DOWN_SINCE] = NAN
+        if bucket[FIRST_UP] != bucket[FIRST_UP]:
+            bucket[FIRST_UP] = ts
+    elif bucket[DOWN_SINCE] != bucket[DOWN_SINCE]:
+        bucket[DOWN_SINCE] = ts
+
+class Summary:
+    def __init__(self):
+        self.count = 0
+        self.up = 0
+        self.lat_count = 0
+        self.lat_sum = 0.0
+        self.lat_min = math.inf
+        self.lat_max = 0.0
+        self.hist = [0] * HIST_BUCKETS
+        self.longest = 0.0
+        self.down_since = None
+        self.last = None
+
+    def add_bucket(self, bucket):
+        # buckets must arrive in time order so down runs can span them
+        if not bucket[COUNT]:
+            return
+        self.count += bucket[COUNT]
+        self.up += bucket[UP]
+        self.lat_count += bucket[LAT_COUNT]
+        self.lat_sum += bucket[LAT_SUM]
+        if bucket[LAT_COUNT]:
+            self.lat_min = min(self.lat_min, bucket[LAT_MIN])
+            self.lat_max = max(self.lat_max, bucket[LAT_MAX])
+            hist = self.hist
+            for i in range(HIST_BUCKETS):
+                hist[i] += bucket[HIST + i]
+        first_up, down_since = bucket[FIRST_UP], bucket[DOWN_SINCE]
+        if self.down_since is not None and first_up == first_up:
+            self.longest = max(self.longest, first_up - self.down_since)
+            self.down_since = None
+        self.longest = max(self.longest, bucket[MAX_DOWN])
+        if first_up == first_up:
+            self.down_since = down_since if down_since == down_since else None
+        elif self.down_since is None:
+            self.down_since = down_since
+        self.last = bucket[LAST]
+
+    def add_samples(self, ts, up, lat):
+        if ts:
+            bucket = new_bucket(0)
+            for t, u, l in zip(ts, up, lat):
+                fold_sample(bucket, t, u, l)
+            self.add_bucket(bucket)
+
+    def uptime(self):
+        return 100.0 * self.up / self.count if self.count else None
+
+    def mean(self):
+        return self.lat_sum / self.lat_count if self.lat_count else None
+
+    def longest_downtime(self):
+        if self.down_since is not None:
+            return max(self.longest, self.last - self.down_since)
+        return self.longest
+
+    def percentile(self, p):
+        if not self.lat_count:
+            return None
+        rank = p / 100 * self.lat_count
+        seen = 0
+        for i, n in enumerate(self.hist):
+            seen += n
+            if n and seen >= rank:
+                return min(self.lat_max, max(self.lat_min, hist_value(i)))
+        return self.lat_max
+
+class RollupKeys:
+    def __init__(self, buf, n):
+        self.buf = buf
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return KEY.unpack_from(self.buf, i * ROLLUP.size)[0]
+
+class Series:
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.files = {}
+        self.rollups = {}
+        self.pending = {}
+
+    def column_path(self, col):
+        return os.path.join(self.path, col + ".bin")
+
+    def rollup_path(self, res):
+        return os.path.join(self.path, f"rollup-{res}.bin")
+
+    def open(self):
+        if self.files:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        label = os.path.join(self.path, "name")
+        if not os.path.exists(label):
+            with open(label, "w") as f:
+                f.write(self.name)
+        # a crash between column writes leaves ragged files; cut them back
+        # to the last complete sample before appending again
+        counts = []
+        for col, code in COLUMNS:
+            path = self.column_path(col)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // array(code).itemsize)
+        n = min(counts)
+        for col, code in COLUMNS:
+            f = open(self.column_path(col), "ab")
+            f.truncate(n * array(code).itemsize)
+            self.files[col] = f
+        rebuild = []
+        for res in RESOLUTIONS:
+            path = self.rollup_path(res)
+            if not os.path.exists(path):
+                open(path, "wb").close()
+                rebuild.append(res)
+            f = open(path, "r+b")
+            size = os.fstat(f.fileno()).st_size
+            records = size // ROLLUP.size
+            f.truncate(records * ROLLUP.size)
+            self.rollups[res] = f
+            if records:
+                f.seek((records - 1) * ROLLUP.size)
+                self.pending[res] = (records - 1, list(ROLLUP.unpack(f.read(ROLLUP.size))))
+        if rebuild and n:
+            # series written before rollups existed are backfilled once
+            ts, up, lat = self.read()
+            for t, u, l in zip(ts, up, lat):
+                self.fold(t, u, l, rebuild)
+
+    def fold(self, ts, up, latency, resolutions=RESOLUTIONS):
+        for res in resolutions:
+            start = int(ts // res * res)
+            pos, bucket = self.pending.get(res, (-1, None))
+            if bucket is None or start > bucket[START]:
+                pos, bucket = pos + 1, new_bucket(start)
+            elif start < bucket[START]:
+                # late samples stay in the raw columns only; rewriting
+                # closed buckets would break the append-only layout
+                continue
+            fold_sample(bucket, ts, up, latency)
+            self.pending[res] = (pos, bucket)
+            f = self.rollups[res]
+            f.seek(pos * ROLLUP.size)
+            f.write(ROLLUP.pack(*bucket))
+
+    def append(self, ts, up, latency):
+        self.open()
+        values = (ts, 1 if up else 0, NAN if latency is None else latency)
+        for (col, code), value in zip(COLUMNS, values):
+            self.files[col].write(array(code, [value]).tobytes())
+        self.fold(*values)
+        for f in self.files.values():
+            f.flush()
+        for f in self.rollups.values():
+            f.flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        for f in self.rollups.values():
+            f.close()
+        self.files = {}
+        self.rollups = {}
+        self.pending = {}
+
+    def read(self, start=None, end=None):
+        maps = [map_column(self.column_path(col), code) for col, code in COLUMNS]
+        try:
+            views = [view for _, view in maps]
+            n = min(len(view) for view in views)
+            ts = views[0]
+            lo = 0 if start is None else bisect.bisect_left(ts, start, 0, n)
+            hi = n if end is None else bisect.bisect_left(ts, end, lo, n)
+            out = []
+            for (_, code), view in zip(COLUMNS, views):
+                column = array(code)
+                with view[lo:hi] as part, part.cast("B") as raw:
+                    column.frombytes(raw)
+                out.append(column)
+            return tuple(out)
+        finally:
+            for m, view in maps:
+                view.release()
+                if m is not None:
+                    m.close()
+
+    def read_rollups(self, res, start, end, summary):
+        path = self.rollup_path(res)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        n = size // ROLLUP.size
+        if not n:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), n * ROLLUP.size, access=mmap.ACCESS_READ) as m:
+            keys = RollupKeys(m, n)
+            lo = bisect.bisect_left(keys, start)
+            hi = bisect.bisect_left(keys, end, lo)
+            with memoryview(m) as view, view[lo * ROLLUP.size:hi * ROLLUP.size] as part:
+                for record in ROLLUP.iter_unpack(part):
+                    summary.add_bucket(record)
+
+    def summary(self, start=None, end=None):
+        # cover the range with the coarsest aligned buckets that fit and
+        # fall back to finer ones (and finally raw samples) at the edges
+        last = self.last_ts()
+        summary = Summary()
+        if last is None:
+            return summary
+        start = 0 if start is None else start
+        end = last + 1 if end is None else end
+
+        def cover(lo, hi, level):
+            if lo >= hi:
+                return
+            if level == len(RESOLUTIONS):
+                summary.add_samples(*self.read(lo, hi))
+                return
+            res = RESOLUTIONS[level]
+            a = -(-lo // res) * res
+            b = hi // res * res
+            if a >= b:
+                cover(lo, hi, level + 1)
+                return
+            cover(lo, a, level + 1)
+            self.read_rollups(res, a, b, summary)
+            cover(b, hi, level + 1)
+
+        cover(int(start), math.ceil(end), 0)
+        return summary
+
+    def latest(self):
+        ts, up, lat = self.read(self.last_ts())
+        if not ts:
+            return None
+        return ts[-1], bool(up[-1]), None if lat[-1] != lat[-1] else lat[-1]
+
+    def last_ts(self):
+        m, view = map_column(self.column_path("ts"), "d")
+        try:
+            return view[-1] if len(view) else None
+        finally:
+            view.release()
+            if m is not None:
+                m.close()
+
+    def compact(self, now):
+        # drop data past its retention; files are only rewritten once a
+        # quarter of them has expired so the cost is amortised
+        self.close()
+        m, view = map_column(self.column_path("ts"), "d")
+        try:
+            n = len(view)
+            drop = bisect.bisect_left(view, now - RETENTION["raw"])
+        finally:
+            view.release()
+            if m is not None:
+                m.close()
+        if drop and drop * 4 >= n:
+            for col, code in COLUMNS:
+                rewrite_from(self.column_path(col), drop * array(code).itemsize)
+        for res in RESOLUTIONS:
+            path = self.rollup_path(res)
+            n = os.path.getsize(path) // ROLLUP.size if os.path.exists(path) else 0
+            if RETENTION[res] is None or not n:
+                continue
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), n * ROLLUP.size, access=mmap.ACCESS_READ) as m:
+                drop = bisect.bisect_left(RollupKeys(m, n), now - RETENTION[res])
+            if drop and drop * 4 >= n:
+                rewrite_from(path, drop * ROLLUP.size)
+
+def rewrite_from(path, offset):
+    tmp = path + ".tmp"
+    with open(path, "rb") as src, open(tmp, "wb") as dst:
+        src.seek(offset)
+        while chunk := src.read(1 << 20):
+            dst.write(chunk)
+    os.replace(tmp, path)
+
+def parse_duration(text):
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+    text = text.strip().lower()
+    if text[-1:] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+class HistoryStore:
+    def __init__(self, root=None):
+        self.root = root or DEFAULT_ROOT
+        self.series = {}
+
+    def get(self, name):
+        key = series_key(name)
+        if key not in self.series:
+            self.series[key] = Series(os.path.join(self.root, key), name)
+        return self.series[key]
+
+    def append(self, name, ts, up, latency):
+        self.get(name).append(ts, up, latency)
+
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        names = []
+        for key in sorted(os.listdir(self.root)):
+            label = os.path.join(self.root, key, "name")
+            if os.path.isfile(label):
+                with open(label) as f:
+                    names.append(f.read().strip())
+        return names
+
+    def compact(self, now):
+        for name in self.names():
+            self.get(name).compact(now)
+
+    def close(self):
+        for series in self.series.values():
+            series.close()
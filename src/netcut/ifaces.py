@@ -0,0 +1,68 @@
+import socket
+import threading
+import time
+
+import psutil
+
+# short enough that nothing displayed is noticeably stale, long enough that
+# several renders or an exporter polling in a loop share one collection
+TTL = 1.0
+COUNTERS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errin", "errout", "dropin", "dropout")
+
+class Interface:
+    __slots__ = ("name", "ipv4", "ipv6", "mac", "up", "speed", "mtu") + COUNTERS
+
+    def __init__(self, name):
+        self.name = name
+        self.ipv4 = []
+        self.ipv6 = []
+        self.mac = None
+        self.up = None
+        self.speed = None
+        self.mtu = None
+        for field in COUNTERS:
+            setattr(self, field, None)
+
+    @property
+    def ip(self):
+        return self.ipv4[0] if self.ipv4 else None
+
+    def record(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+cache = None
+cached_at = 0.0
+lock = threading.Lock()
+
+def collect():
+    # one call per psutil table; every table is keyed by name so the merge
+    # is a dict lookup per interface rather than a rescan
+    interfaces = {}
+    for name, addrs in psutil.net_if_addrs().items():
+        iface = interfaces[name] = Interface(name)
+        for addr in addrs:
+            if addr.family == socket.AF_INET:
+                iface.ipv4.append(addr.address)
+            elif addr.family == socket.AF_INET6:
+                iface.ipv6.append(addr.address.split("%", 1)[0])
+            elif addr.family == psutil.AF_LINK:
+                iface.mac = addr.address
+    for name, stats in psutil.net_if_stats().items():
+        iface = interfaces.get(name) or interfaces.setdefault(name, Interface(name))
+        iface.up = stats.isup
+        iface.speed = stats.speed or None
+        iface.mtu = stats.mtu
+    for name, counters in psutil.net_io_counters(pernic=True).items():
+        iface = interfaces.get(name) or interfaces.setdefault(name, Interface(name))
+        for field in COUNTERS:
+            setattr(iface, field, getattr(counters, field))
+    return interfaces
+
+def snapshot(ttl=TTL):
+    global cache, cached_at
+    with lock:
+        now = time.monotonic()
+        if cache is None or now - cached_at >= ttl:
+            cache = collect()
+            cached_at = now
+        return cache
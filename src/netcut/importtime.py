@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+from netcut.main import COMMANDS
+
+# import budget in ms per lightweight command: netcut.main plus the command
+# module with everything it pulls in, best of RUNS cold interpreters. the
+# heavyweights (scapy, requests, dnspython...) must not show up at all
+BUDGETS = {"--help": 30, "dhcp": 40, "firewall": 50, "statuspage": 50, "bt": 50, "interfaces": 80,
+           "arp": 150, "stats": 200}
+HEAVY = ("scapy", "requests", "dns", "bs4", "speedtest", "cryptography", "maxminddb")
+RUNS = 3
+
+def measure(command):
+    code = "import netcut.main"
+    if command in COMMANDS:
+        code += f"; import {COMMANDS[command]}"
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    total, modules = 0, set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip().split(".")[0])
+        # top-level netcut entries; interpreter startup and site hooks are
+        # not ours to budget
+        if name.startswith(" netcut"):
+            total += int(cumulative)
+    return total / 1000, modules
+
+def main():
+    failed = False
+    for command, budget in BUDGETS.items():
+        ms, modules = min(measure(command) for _ in range(RUNS))
+        heavy = sorted(modules.intersection(HEAVY))
+        ok = ms <= budget and not heavy
+        failed |= not ok
+        note = f" imports {', '.join(heavy)}" if heavy else ""
+        print(f"{'✅' if ok else '❌'} netcut {command:<12} {ms:7.1f} ms (budget {budget} ms){note}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import struct
+
+def checksum(data):
+    # RFC 1071 internet checksum, shared by the ICMP, UDP and TCP builders
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
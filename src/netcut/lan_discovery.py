@@ -1,27 +1,62 @@
+import re
 import subprocess
 import platform
+from dataclasses import dataclass
+
+from netcut.output import show_all, status
+
+@dataclass(slots=True)
+class Service:
+    name: str
+    type: str
+    domain: str
+    interface: str | None = None
+    protocol: str | None = None
+
+def parse_avahi(output):
+    # `avahi-browse -p`: "+;eth0;IPv4;name;_type._tcp;local", with decimal
+    # \DDD escapes in the name
+    services = []
+    for line in output.splitlines():
+        fields = line.split(";")
+        if len(fields) >= 6 and fields[0] == "+":
+            name = re.sub(r"\\(\d{3})", lambda m: chr(int(m.group(1))), fields[3])
+            services.append(Service(name, fields[4], fields[5], fields[1], fields[2]))
+    return services
+
+def parse_dns_sd(output):
+    # "Timestamp A/R Flags if Domain Service Type Instance Name"
+    services = []
+    for line in output.splitlines():
+        fields = line.split(None, 6)
+        if len(fields) == 7 and fields[1] == "Add":
+            services.append(Service(fields[6], fields[5], fields[4], fields[3]))
+    return services
+
+def render(services):
+    for s in services:
+        print(f"  • {s.name} ({s.type}) on {s.interface or '-'}{'/' + s.protocol if s.protocol else ''}, {s.domain}")
 
 def discover_lan_services():
     system = platform.system()
     if system == "Linux":
-        try:
-            print("🔍 Running: avahi-browse -a -t")
-            output = subprocess.check_output(["avahi-browse", "-a", "-t"], text=True)
-            print(output)
-            print("✅ avahi-browse completed.")
-        except FileNotFoundError:
-            print("❌ avahi-browse not found. Install with: sudo apt install avahi-utils")
-        except Exception as e:
-            print(f"Error: {e}")
+        command, parse, missing = ["avahi-browse", "-a", "-t", "-p"], parse_avahi, \
+            "❌ avahi-browse not found. Install with: sudo apt install avahi-utils"
     elif system == "Darwin":
-        try:
-            print("🔍 Running: dns-sd -B _services._dns-sd._udp")
-            output = subprocess.check_output(["dns-sd", "-B", "_services._dns-sd._udp"], text=True)
-            print(output)
-            print("✅ dns-sd completed.")
-        except FileNotFoundError:
-            print("❌ dns-sd not found on this system.")
-        except Exception as e:
-            print(f"Error: {e}")
+        command, parse, missing = ["dns-sd", "-B", "_services._dns-sd._udp"], parse_dns_sd, \
+            "❌ dns-sd not found on this system."
     else:
-        print("Unsupported platform for LAN discovery.")
\ No newline at end of file
+        status("Unsupported platform for LAN discovery.")
+        return []
+    try:
+        status(f"🔍 Running: {' '.join(command)}")
+        services = parse(subprocess.check_output(command, text=True))
+    except FileNotFoundError:
+        status(missing)
+        return []
+    except Exception as e:
+        status(f"Error: {e}")
+        return []
+    show_all(services, render)
+    status(f"✅ {command[0]} completed, {len(services)} services.")
+    return services
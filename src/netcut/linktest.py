@@ -0,0 +1,514 @@
+import errno
+import json
+import os
+import socket
+import statistics
+import struct
+import tempfile
+import threading
+import time
+import uuid
+
+PORT = 5201
+TCP_LENGTH = 128 * 1024
+UDP_LENGTH = 1400
+PINGS = 5
+PING_EVERY = 0.2
+UDP_GRACE = 0.25
+WAIT = 10
+# every connection opens with magic, session id and stream index
+HELLO = struct.Struct("!4s16sI")
+# every UDP datagram starts with session id, stream index, sequence and
+# the sender's wall clock
+DATAGRAM = struct.Struct("!16sIQd")
+
+class Meter:
+    # one per sending or receiving thread so counts never race; samplers
+    # only ever read them
+    __slots__ = ("bytes", "packets", "expected", "jitter", "transit", "last")
+
+    def __init__(self):
+        self.bytes = self.packets = self.expected = 0
+        self.jitter = 0.0
+        self.transit = self.last = None
+
+def totals(meters):
+    jitters = [m.jitter for m in meters if m.packets]
+    return {"bytes": sum(m.bytes for m in meters), "packets": sum(m.packets for m in meters),
+            "lost": sum(max(m.expected - m.packets, 0) for m in meters),
+            "jitter_ms": round(statistics.fmean(jitters) * 1000, 3) if jitters else None}
+
+def seconds(meters, started, ended):
+    # UDP has no end of stream: the test ran until the last datagram, not
+    # until the receiver gave up waiting for more
+    arrivals = [m.last for m in meters if m.last is not None]
+    return round((max(arrivals) if arrivals else ended) - started, 3)
+
+def sample(meters, interval, stop, report):
+    started = previous = time.monotonic()
+    last = totals(meters)
+    tick = 1
+    while True:
+        stopped = stop.wait(max(0.0, started + tick * interval - time.monotonic()))
+        now = time.monotonic()
+        current = totals(meters)
+        # a short tail after the last tick still counts in the totals but is
+        # not worth a line of its own
+        if not stopped or current["bytes"] > last["bytes"] and now - previous > interval / 10:
+            report({"start": round(previous - started, 3), "end": round(now - started, 3),
+                    "bytes": current["bytes"] - last["bytes"], "packets": current["packets"] - last["packets"],
+                    "lost": current["lost"] - last["lost"], "jitter_ms": current["jitter_ms"]})
+        if stopped:
+            return
+        previous, last = now, current
+        tick += 1
+
+def payload(length):
+    # a file holding one buffer of random bytes: os.sendfile hands it to the
+    # socket straight from the page cache, never copying through Python
+    data = os.urandom(length)
+    source = tempfile.TemporaryFile()
+    source.write(data)
+    source.flush()
+    return source, memoryview(data)
+
+def send_tcp(sock, source, length, deadline, meter):
+    sock.settimeout(None)
+    try:
+        if hasattr(os, "sendfile"):
+            out, fd = sock.fileno(), source[0].fileno()
+            while time.monotonic() < deadline:
+                meter.bytes += os.sendfile(out, fd, 0, length)
+        else:
+            view = source[1]
+            while time.monotonic() < deadline:
+                meter.bytes += sock.send(view)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+def receive_tcp(sock, length, meter):
+    # one preallocated buffer per stream, refilled in place by recv_into
+    buffer = bytearray(length)
+    sock.settimeout(None)
+    try:
+        while True:
+            n = sock.recv_into(buffer)
+            if not n:
+                break
+            meter.bytes += n
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+def send_udp(sock, address, session, stream, rate, length, deadline, meter):
+    # rate is bytes/s for this stream; datagrams go out in bursts whenever
+    # the stream falls behind schedule
+    buffer = bytearray(max(length, DATAGRAM.size))
+    started = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        due = started + meter.bytes / rate
+        if due > now:
+            time.sleep(min(due, deadline) - now)
+            continue
+        meter.last = time.time()
+        DATAGRAM.pack_into(buffer, 0, session, stream, meter.packets, meter.last)
+        try:
+            sock.sendto(buffer, address)
+        except socket.timeout:
+            continue
+        except OSError as e:
+            if e.errno in (errno.ENOBUFS, errno.EAGAIN):
+                time.sleep(0.001)
+                continue
+            break
+        meter.bytes += len(buffer)
+        meter.packets += 1
+        meter.expected = meter.packets
+
+def receive_udp(sock, session, meters, stop):
+    buffer = bytearray(65536)
+    sock.settimeout(0.1)
+    while not stop.is_set():
+        try:
+            n = sock.recv_into(buffer)
+        except socket.timeout:
+            continue
+        except OSError:
+            break
+        if n <= DATAGRAM.size:
+            continue
+        sid, stream, sequence, sent = DATAGRAM.unpack_from(buffer)
+        if sid != session or stream >= len(meters):
+            continue
+        meter = meters[stream]
+        meter.bytes += n
+        meter.packets += 1
+        if sequence >= meter.expected:
+            meter.expected = sequence + 1
+        # RFC 3550 interarrival jitter; the clock offset between hosts cancels
+        meter.last = time.time()
+        transit = meter.last - sent
+        if meter.transit is not None:
+            meter.jitter += (abs(transit - meter.transit) - meter.jitter) / 16
+        meter.transit = transit
+
+def receive_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed during handshake")
+        data += chunk
+    return data
+
+class Control:
+    # newline-delimited JSON; pongs and pushed intervals come from different
+    # threads, so writes are serialized
+    __slots__ = ("sock", "reader", "lock")
+
+    def __init__(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.lock = threading.Lock()
+
+    def send(self, **message):
+        with self.lock:
+            self.sock.sendall(json.dumps(message).encode() + b"\n")
+
+    def receive(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("control connection closed")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+class Session:
+    __slots__ = ("id", "test", "streams", "ready", "lock")
+
+    def __init__(self, test):
+        self.id = uuid.uuid4().bytes
+        self.test = test
+        self.streams = [None] * test["streams"]
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    def attach(self, stream, sock):
+        with self.lock:
+            if stream >= len(self.streams) or self.streams[stream] is not None:
+                return False
+            self.streams[stream] = sock
+            if all(self.streams):
+                self.ready.set()
+        return True
+
+def push(control, interval):
+    try:
+        control.send(type="interval", **interval)
+    except OSError:
+        pass
+
+def bitrate(test):
+    # bytes/s per stream
+    return test["mbps"] * 1_000_000 / 8 / test["streams"]
+
+class Server:
+    def __init__(self, host="", port=PORT):
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(128)
+        self.port = self.listener.getsockname()[1]
+        self.udp = socket.socket(family, socket.SOCK_DGRAM)
+        self.udp.bind((host, self.port))
+        self.sessions = {}
+        self.busy = threading.Lock()
+
+    def serve(self, on_result, once=False):
+        done = threading.Event()
+        self.listener.settimeout(0.5)
+        try:
+            while not done.is_set():
+                try:
+                    sock, address = self.listener.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self.handle, args=(sock, address, on_result, once and done),
+                                 daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self.listener.close()
+        self.udp.close()
+
+    def handle(self, sock, address, on_result, done):
+        try:
+            sock.settimeout(WAIT)
+            magic, sid, stream = HELLO.unpack(receive_exactly(sock, HELLO.size))
+        except (OSError, struct.error):
+            sock.close()
+            return
+        if magic == b"DATA":
+            session = self.sessions.get(sid)
+            if not session or not session.attach(stream, sock):
+                sock.close()
+            return
+        if magic != b"CTRL":
+            sock.close()
+            return
+        control = Control(sock)
+        try:
+            result = self.run(control, address)
+            if result:
+                on_result(result)
+                if done:
+                    done.set()
+        except (OSError, ValueError, KeyError) as e:
+            on_result({"client": address[0], "error": str(e)})
+        finally:
+            control.close()
+
+    def run(self, control, address):
+        message = control.receive()
+        while message["type"] == "ping":
+            control.send(type="pong", t=message["t"])
+            message = control.receive()
+        if not self.busy.acquire(blocking=False):
+            control.send(type="error", error="server busy with another test")
+            return None
+        session = Session(message)
+        self.sessions[session.id] = session
+        try:
+            return self.run_session(control, session, address)
+        finally:
+            del self.sessions[session.id]
+            for sock in session.streams:
+                if sock:
+                    sock.close()
+            self.busy.release()
+
+    def run_session(self, control, session, address):
+        test = session.test
+        control.send(type="accept", session=session.id.hex())
+        udp_clients = None
+        if test["protocol"] == "tcp":
+            if not session.ready.wait(WAIT):
+                raise ConnectionError("data streams never connected")
+        elif test["reverse"]:
+            udp_clients = self.udp_hellos(session)
+        meters = [Meter() for _ in range(test["streams"])]
+        stop = threading.Event()
+        workers = []
+        source = None
+        if test["reverse"]:
+            deadline = time.monotonic() + test["duration"]
+            if test["protocol"] == "tcp":
+                source = payload(test["length"])
+                workers = [threading.Thread(target=send_tcp, args=(sock, source, test["length"], deadline, meter))
+                           for sock, meter in zip(session.streams, meters)]
+            else:
+                rate = bitrate(test)
+                workers = [threading.Thread(target=send_udp, args=(self.udp, client, session.id, i, rate,
+                                                                   test["length"], deadline, meter))
+                           for i, (client, meter) in enumerate(zip(udp_clients, meters))]
+        else:
+            if test["protocol"] == "tcp":
+                workers = [threading.Thread(target=receive_tcp, args=(sock, test["length"], meter))
+                           for sock, meter in zip(session.streams, meters)]
+            else:
+                workers = [threading.Thread(target=receive_udp, args=(self.udp, session.id, meters, stop))]
+            # the receiving side measures; its intervals go back to the client
+            workers.append(threading.Thread(target=sample, args=(meters, test["interval"], stop,
+                                                                 lambda interval: push(control, interval))))
+        started = time.time()
+        control.send(type="start")
+        for worker in workers:
+            worker.start()
+        try:
+            message = control.receive()
+            while message["type"] == "ping":
+                control.send(type="pong", t=message["t"])
+                message = control.receive()
+            if test["protocol"] == "udp" and not test["reverse"]:
+                time.sleep(UDP_GRACE)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            if source:
+                source[0].close()
+        result = {"client": address[0], "protocol": test["protocol"],
+                  "direction": "download" if test["reverse"] else "upload", "streams": test["streams"],
+                  "seconds": seconds(meters, started, time.time()), **totals(meters)}
+        control.send(type="result", **result)
+        return result
+
+    def udp_hellos(self, session):
+        # a reversed UDP test learns where to send from one datagram per
+        # client socket; the client repeats them until the test starts
+        clients = [None] * len(session.streams)
+        deadline = time.monotonic() + WAIT
+        self.udp.settimeout(0.1)
+        while not all(clients):
+            if time.monotonic() > deadline:
+                raise ConnectionError("UDP streams never said hello")
+            try:
+                data, client = self.udp.recvfrom(DATAGRAM.size)
+            except socket.timeout:
+                continue
+            if len(data) < DATAGRAM.size:
+                # a stray datagram, or one from something else entirely
+                continue
+            sid, stream, _, _ = DATAGRAM.unpack_from(data)
+            if sid == session.id and stream < len(clients):
+                clients[stream] = client
+        return clients
+
+def median_ms(samples):
+    return round(statistics.median(samples) * 1000, 3) if samples else None
+
+def run_test(host, port=PORT, protocol="tcp", reverse=False, streams=4, duration=10.0, interval=1.0, mbps=100.0,
+             length=None, on_interval=None):
+    length = length or (UDP_LENGTH if protocol == "udp" else TCP_LENGTH)
+    test = {"type": "test", "protocol": protocol, "reverse": reverse, "streams": streams, "duration": duration,
+            "interval": interval, "mbps": mbps, "length": length}
+    address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0]
+    family, target = address[0], address[4]
+    control = Control(socket.create_connection(target[:2], timeout=WAIT))
+    sockets = []
+    try:
+        control.sock.sendall(HELLO.pack(b"CTRL", bytes(16), 0))
+        idle = []
+        for _ in range(PINGS):
+            sent = time.monotonic()
+            control.send(type="ping", t=sent)
+            control.receive()
+            idle.append(time.monotonic() - sent)
+        control.send(**test)
+        reply = control.receive()
+        if reply["type"] == "error":
+            raise ConnectionError(reply["error"])
+        session = bytes.fromhex(reply["session"])
+        if protocol == "tcp":
+            for i in range(streams):
+                sock = socket.create_connection(target[:2], timeout=WAIT)
+                sockets.append(sock)
+                sock.sendall(HELLO.pack(b"DATA", session, i))
+        else:
+            sockets = [socket.socket(family, socket.SOCK_DGRAM) for _ in range(streams)]
+        return drive(control, sockets, target[:2], session, test, idle, on_interval or (lambda interval: None))
+    finally:
+        for sock in sockets:
+            sock.close()
+        control.close()
+
+def drive(control, sockets, target, session, test, idle, on_interval):
+    protocol, reverse = test["protocol"], test["reverse"]
+    started = threading.Event()
+    finished = threading.Event()
+    stop = threading.Event()
+    loaded, pending = [], []
+    result = {}
+
+    def report(interval):
+        # latency for an interval is whatever pings came back during it
+        rtts = pending[:]
+        del pending[:len(rtts)]
+        on_interval({**interval, "latency_ms": median_ms(rtts),
+                     "latency_max_ms": round(max(rtts) * 1000, 3) if rtts else None})
+
+    def read():
+        try:
+            while True:
+                message = control.receive()
+                match message["type"]:
+                    case "start": started.set()
+                    case "pong":
+                        rtt = time.monotonic() - message["t"]
+                        loaded.append(rtt)
+                        pending.append(rtt)
+                    case "interval":
+                        message.pop("type")
+                        report(message)
+                    case "result":
+                        result.update(message)
+                        break
+                    case "error":
+                        result["error"] = message["error"]
+                        break
+        except (OSError, ValueError) as e:
+            result.setdefault("error", str(e))
+        finished.set()
+        started.set()
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    if protocol == "udp" and reverse:
+        # one hello datagram per socket, repeated until the server starts
+        deadline = time.monotonic() + WAIT
+        while not started.wait(0.1) and time.monotonic() < deadline:
+            for i, sock in enumerate(sockets):
+                sock.sendto(DATAGRAM.pack(session, i, 0, 0.0), target)
+    if not started.wait(WAIT):
+        raise ConnectionError("server never started the test")
+    if "error" in result:
+        raise ConnectionError(result["error"])
+    begun = time.time()
+    deadline = time.monotonic() + test["duration"]
+    meters = [Meter() for _ in sockets]
+    source = None
+    if reverse:
+        if protocol == "tcp":
+            workers = [threading.Thread(target=receive_tcp, args=(sock, test["length"], meter))
+                       for sock, meter in zip(sockets, meters)]
+        else:
+            # each socket only ever sees its own stream, so each meter
+            # still has a single writer
+            workers = [threading.Thread(target=receive_udp, args=(sock, session, meters, stop)) for sock in sockets]
+        sampler = threading.Thread(target=sample, args=(meters, test["interval"], stop, report))
+        sampler.start()
+    elif protocol == "tcp":
+        source = payload(test["length"])
+        workers = [threading.Thread(target=send_tcp, args=(sock, source, test["length"], deadline, meter))
+                   for sock, meter in zip(sockets, meters)]
+    else:
+        rate = bitrate(test)
+        workers = [threading.Thread(target=send_udp, args=(sock, target, session, i, rate, test["length"], deadline,
+                                                           meter))
+                   for i, (sock, meter) in enumerate(zip(sockets, meters))]
+    for worker in workers:
+        worker.start()
+    while not finished.is_set() and time.monotonic() < deadline:
+        control.send(type="ping", t=time.monotonic())
+        finished.wait(min(PING_EVERY, max(0.0, deadline - time.monotonic())))
+    if reverse and protocol == "udp":
+        time.sleep(UDP_GRACE)
+        stop.set()
+    for worker in workers:
+        worker.join()
+    ended = time.time()
+    if source:
+        source[0].close()
+    if reverse:
+        stop.set()
+        sampler.join()
+    control.send(type="done")
+    finished.wait(WAIT)
+    if "error" in result:
+        raise ConnectionError(result["error"])
+    if reverse:
+        result.update(totals(meters), seconds=seconds(meters, begun, ended))
+    result.update(idle_latency_ms=median_ms(idle), latency_ms=median_ms(loaded),
+                  latency_max_ms=round(max(loaded) * 1000, 3) if loaded else None)
+    return result
@@ -1,112 +1,360 @@
 import argparse
-from netcut.stats import display_stats
-from netcut.geo import geo_lookup
-from netcut.check import check_host
-from netcut.statuspage import generate_status_page
-from netcut.bandwidth import show_bandwidth
-from netcut.packets import sniff_packets
-from netcut.portscan import scan_ports
-from netcut.arp import view_arp_table
-from netcut.firewall import list_rules
-from netcut.interfaces import show_interfaces
-from netcut.ssl_viewer import view_cert
-from netcut.subdomains import enumerate_subdomains
-from netcut.cdn_detect import detect_cdn
-from netcut.tech_stack import fingerprint_tech
-from netcut.api_monitor import monitor_api
-from netcut.wifi_heatmap import export_wifi_heatmap
-from netcut.bluetooth import scan_bluetooth
-from netcut.dhcp import view_dhcp_leases
-from netcut.lan_discovery import discover_lan_services
-from netcut.proxy_check import check_proxy
-from netcut.dnsleak import test_dns_leak
-from netcut.traceroute import visualize_traceroute
-from netcut.mitm_detect import detect_mitm
-from netcut.speedtest_cli import run_speedtest
-from netcut.reachability import check_reachability
-from netcut.whois_lookup import perform_whois
-from netcut.tunnel_check import detect_tunnel_leak
+import importlib
+import os
+import sys
 
-def main():
+from netcut import output
+
+COMMANDS = {
+    "stats": "netcut.stats",
+    "geo": "netcut.geo",
+    "check": "netcut.check",
+    "statuspage": "netcut.statuspage",
+    "monitor": "netcut.monitor",
+    "bandwidth": "netcut.bandwidth",
+    "sniffer": "netcut.packets",
+    "scan": "netcut.portscan",
+    "arp": "netcut.arp",
+    "firewall": "netcut.firewall",
+    "interfaces": "netcut.interfaces",
+    "ssl": "netcut.ssl_viewer",
+    "subdomains": "netcut.subdomains",
+    "cdn": "netcut.cdn_detect",
+    "tech": "netcut.tech_stack",
+    "api": "netcut.api_monitor",
+    "wifi": "netcut.wifi_heatmap",
+    "bt": "netcut.bluetooth",
+    "dhcp": "netcut.dhcp",
+    "lan": "netcut.lan_discovery",
+    "proxy": "netcut.proxy_check",
+    "dnsleak": "netcut.dnsleak",
+    "dns": "netcut.dns_bulk",
+    "trace": "netcut.traceroute",
+    "mitm-detect": "netcut.mitm_detect",
+    "speedtest": "netcut.speedtest_cli",
+    "reachability": "netcut.reachability",
+    "whois": "netcut.whois_lookup",
+    "tunnel-check": "netcut.tunnel_check",
+    "batch": "netcut.batch",
+}
+
+def handler(command, name):
+    # command modules are imported only when their subcommand runs; several
+    # of them pull in scapy, requests or dnspython, which together take over
+    # a second to import
+    return getattr(importlib.import_module(COMMANDS[command]), name)
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Netcut Network Toolkit")
+    formats = parser.add_mutually_exclusive_group()
+    formats.add_argument("--json", dest="format", action="store_const", const="json",
+                         help="write results as one JSON array")
+    formats.add_argument("--jsonl", dest="format", action="store_const", const="jsonl",
+                         help="write results as JSON lines, one record per line")
+    formats.add_argument("--csv", dest="format", action="store_const", const="csv",
+                         help="write results as CSV, one record per row")
     sub = parser.add_subparsers(dest="command")
 
-    sub.add_parser("stats")
+    stats = sub.add_parser("stats")
+    stats.add_argument("--history", action="store_true")
+    stats.add_argument("--since")
+    stats.add_argument("--service", action="append")
+    stats.add_argument("--store")
+    stats.add_argument("--json", action="store_true")
     geo = sub.add_parser("geo")
-    geo.add_argument("host")
+    geo.add_argument("hosts", nargs="*")
+    geo.add_argument("--file")
+    geo.add_argument("--db")
+    geo.add_argument("--offline", action="store_true")
+    geo.add_argument("--jsonl", action="store_true")
+    geo.add_argument("--concurrency", type=int, default=64)
     check = sub.add_parser("check")
-    check.add_argument("host")
+    check.add_argument("hosts", nargs="*")
+    check.add_argument("--file")
+    check.add_argument("--port", type=int, default=80)
+    check.add_argument("--record", action="store_true")
+    check.add_argument("--count", type=int, default=3)
+    check.add_argument("--interval", type=float, default=1.0)
+    check.add_argument("--timeout", type=float, default=2.0)
+    check.add_argument("--rate", type=int, default=5000)
+    check.add_argument("--concurrency", type=int, default=1000)
+    check.add_argument("--no-icmp", action="store_true")
+    check.add_argument("--no-tcp", action="store_true")
+    check.add_argument("--jsonl", action="store_true")
     sub.add_parser("statuspage")
-    sub.add_parser("bandwidth")
+    monitor = sub.add_parser("monitor")
+    monitor.add_argument("config")
+    monitor.add_argument("--output", default="status.html")
+    monitor.add_argument("--store")
+    bandwidth = sub.add_parser("bandwidth")
+    bandwidth.add_argument("--watch", action="store_true")
+    bandwidth.add_argument("--interval", type=float, default=1.0)
+    bandwidth.add_argument("--window", type=int, default=60)
+    bandwidth.add_argument("--procs", action="store_true")
+    bandwidth.add_argument("--proc-interval", type=float, default=5.0)
     sniffer = sub.add_parser("sniffer")
     sniffer.add_argument("--port", type=int)
+    sniffer.add_argument("--proto")
+    sniffer.add_argument("--src")
+    sniffer.add_argument("--dst")
+    sniffer.add_argument("--iface")
+    sniffer.add_argument("--fast", action="store_true")
+    sniffer.add_argument("--flows", action="store_true")
+    sniffer.add_argument("--top", type=int, default=20)
+    sniffer.add_argument("--window", type=int, default=10)
+    sniffer.add_argument("--max-flows", type=int, default=65536)
+    sniffer.add_argument("--idle", type=float, default=120)
+    sniffer.add_argument("--export")
+    sniffer.add_argument("--read")
+    sniffer.add_argument("--workers", type=int, default=1)
     scan = sub.add_parser("scan")
-    scan.add_argument("host")
+    scan.add_argument("targets", nargs="*")
+    scan.add_argument("--file")
+    scan.add_argument("--ports")
     scan.add_argument("--fast", action="store_true")
-    sub.add_parser("arp")
+    scan.add_argument("--concurrency", type=int, default=1000)
+    scan.add_argument("--rate", type=float)
+    scan.add_argument("--timeout", type=float)
+    scan.add_argument("--per-host", type=int, default=256)
+    scan.add_argument("--jsonl", action="store_true")
+    arp = sub.add_parser("arp")
+    arp.add_argument("--watch", action="store_true")
+    arp.add_argument("--interval", type=float, default=2.0)
     fw = sub.add_parser("firewall")
     fw.add_argument("--list", action="store_true")
     fw.add_argument("--add")
     fw.add_argument("--remove")
-    sub.add_parser("interfaces")
+    interfaces = sub.add_parser("interfaces")
+    interfaces.add_argument("--json", action="store_true")
     ssl = sub.add_parser("ssl")
-    ssl.add_argument("host")
+    ssl.add_argument("host", nargs="?")
+    ssl.add_argument("--file")
+    ssl.add_argument("--port", type=int, default=443)
+    ssl.add_argument("--sni")
+    ssl.add_argument("--concurrency", type=int, default=64)
+    ssl.add_argument("--timeout", type=float, default=5.0)
+    ssl.add_argument("--jsonl", action="store_true")
     subdomains = sub.add_parser("subdomains")
     subdomains.add_argument("domain")
+    subdomains.add_argument("--no-resolve", action="store_true")
+    subdomains.add_argument("--concurrency", type=int, default=100)
+    subdomains.add_argument("--nameserver")
+    subdomains.add_argument("--refresh", action="store_true")
+    subdomains.add_argument("--ct-url", default="https://api.certspotter.com/v1/issuances")
     cdn = sub.add_parser("cdn")
     cdn.add_argument("domain")
     tech = sub.add_parser("tech")
-    tech.add_argument("url")
+    tech.add_argument("url", nargs="?")
+    tech.add_argument("--file")
+    tech.add_argument("--concurrency", type=int, default=32)
+    tech.add_argument("--timeout", type=float, default=10.0)
+    tech.add_argument("--max-bytes", type=int, default=256 * 1024)
+    tech.add_argument("--jsonl", action="store_true")
     api = sub.add_parser("api")
     api.add_argument("url")
     api.add_argument("--headers")
+    api.add_argument("--record", action="store_true")
+    api.add_argument("--method", default="GET")
+    api.add_argument("--data")
+    api.add_argument("--data-file")
+    api.add_argument("--requests", type=int)
+    api.add_argument("--concurrency", type=int, default=10)
+    api.add_argument("--duration", type=float)
+    api.add_argument("--rate", type=float)
+    api.add_argument("--timeout", type=float, default=10.0)
+    api.add_argument("--insecure", action="store_true")
+    api.add_argument("--jsonl", action="store_true")
     sub.add_parser("wifi")
     sub.add_parser("bt")
     sub.add_parser("dhcp")
     sub.add_parser("lan")
     proxy = sub.add_parser("proxy")
-    proxy.add_argument("proxy")
-    sub.add_parser("dnsleak")
+    proxy.add_argument("proxy", nargs="?")
+    proxy.add_argument("--file")
+    proxy.add_argument("--url", default="http://httpbin.org/ip")
+    proxy.add_argument("--download")
+    proxy.add_argument("--concurrency", type=int, default=100)
+    proxy.add_argument("--timeout", type=float, default=5.0)
+    proxy.add_argument("--output")
+    proxy.add_argument("--jsonl", action="store_true")
+    proxy.add_argument("--watch", action="store_true")
+    proxy.add_argument("--interval", type=float, default=60.0)
+    proxy.add_argument("--insecure", action="store_true")
+    dnsleak = sub.add_parser("dnsleak")
+    dnsleak.add_argument("--reference", action="append")
+    dns = sub.add_parser("dns")
+    dns_sub = dns.add_subparsers(dest="dns_command", required=True)
+    bulk = dns_sub.add_parser("bulk")
+    bulk.add_argument("file")
+    bulk.add_argument("--nameserver", action="append")
+    bulk.add_argument("--type", default="A")
+    bulk.add_argument("--concurrency", type=int, default=500)
+    bulk.add_argument("--timeout", type=float, default=3.0)
+    bulk.add_argument("--jsonl", action="store_true")
     trace = sub.add_parser("trace")
-    trace.add_argument("host")
-    sub.add_parser("mitm-detect")
-    sub.add_parser("speedtest")
+    trace.add_argument("hosts", nargs="*")
+    trace.add_argument("--file")
+    trace.add_argument("--proto", default="udp", choices=["udp", "icmp", "tcp"])
+    trace.add_argument("--port", type=int)
+    trace.add_argument("--max-hops", type=int, default=30)
+    trace.add_argument("--queries", type=int, default=3)
+    trace.add_argument("--timeout", type=float, default=1.0)
+    trace.add_argument("--rate", type=int, default=5000)
+    trace.add_argument("--no-paris", action="store_true")
+    trace.add_argument("--jsonl", action="store_true")
+    mitm = sub.add_parser("mitm-detect")
+    mitm.add_argument("--watch", action="store_true")
+    mitm.add_argument("--interval", type=float, default=2.0)
+    speedtest = sub.add_parser("speedtest")
+    speedtest.add_argument("--server", action="store_true")
+    speedtest.add_argument("--client")
+    speedtest.add_argument("--bind", default="")
+    speedtest.add_argument("--port", type=int, default=5201)
+    speedtest.add_argument("--once", action="store_true")
+    speedtest.add_argument("--udp", action="store_true")
+    speedtest.add_argument("--reverse", action="store_true")
+    speedtest.add_argument("--streams", type=int, default=4)
+    speedtest.add_argument("--duration", type=float, default=10.0)
+    speedtest.add_argument("--interval", type=float, default=1.0)
+    speedtest.add_argument("--mbps", type=float, default=100.0)
+    speedtest.add_argument("--length", type=int)
     reachability = sub.add_parser("reachability")
     reachability.add_argument("file")
+    reachability.add_argument("--concurrency", type=int, default=16)
+    reachability.add_argument("--per-host", type=int, default=4)
+    reachability.add_argument("--timeout", type=float, default=3)
+    reachability.add_argument("--jsonl", action="store_true")
+    reachability.add_argument("--record", action="store_true")
     whois = sub.add_parser("whois")
-    whois.add_argument("domain")
+    whois.add_argument("domains", nargs="*")
+    whois.add_argument("--file")
+    whois.add_argument("--concurrency", type=int, default=32)
+    whois.add_argument("--rate", type=float, default=2.0)
+    whois.add_argument("--timeout", type=float, default=10.0)
+    whois.add_argument("--rdap", action="store_true")
+    whois.add_argument("--server")
+    whois.add_argument("--refresh", action="store_true")
     sub.add_parser("tunnel-check")
+    batch = sub.add_parser("batch")
+    batch.add_argument("jobs", help="JSON/YAML job file, or - to read jobs from stdin")
+    batch.add_argument("--concurrency", type=int, default=8)
 
-    args = parser.parse_args()
+    return parser
 
+def dispatch(parser, args):
+    # returns whatever the handler returns, so batch jobs can report it
     match args.command:
-        case "stats": display_stats()
-        case "geo": geo_lookup(args.host)
-        case "check": check_host(args.host)
-        case "statuspage": generate_status_page()
-        case "bandwidth": show_bandwidth()
-        case "sniffer": sniff_packets(args.port)
-        case "scan": scan_ports(args.host, args.fast)
-        case "arp": view_arp_table()
-        case "firewall": list_rules()
-        case "interfaces": show_interfaces()
-        case "ssl": view_cert(args.host)
-        case "subdomains": enumerate_subdomains(args.domain)
-        case "cdn": detect_cdn(args.domain)
-        case "tech": fingerprint_tech(args.url)
-        case "api": monitor_api(args.url, args.headers)
-        case "wifi": export_wifi_heatmap()
-        case "bt": scan_bluetooth()
-        case "dhcp": view_dhcp_leases()
-        case "lan": discover_lan_services()
-        case "proxy": check_proxy(args.proxy)
-        case "dnsleak": test_dns_leak()
-        case "trace": visualize_traceroute(args.host)
-        case "mitm-detect": detect_mitm()
-        case "speedtest": run_speedtest()
-        case "reachability": check_reachability(args.file)
-        case "whois": perform_whois(args.domain)
-        case "tunnel-check": detect_tunnel_leak()
+        case "stats" if args.history: return handler("stats", "display_history")(args.since, args.service, args.store)
+        case "stats": return handler("stats", "display_stats")(args.json)
+        case "geo":
+            return handler("geo", "geo_lookup")(args.hosts, args.file, args.db, args.offline, args.jsonl, args.concurrency)
+        case "check" if args.hosts or args.file:
+            return handler("check", "check_host")(args.hosts, args.port, args.record, args.file, args.count, args.interval,
+                                                  args.timeout, args.rate, args.concurrency, not args.no_icmp,
+                                                  not args.no_tcp, args.jsonl)
+        case "check": parser.error("check needs a host or --file")
+        case "statuspage": return handler("statuspage", "generate_status_page")()
+        case "monitor": return handler("monitor", "run_monitor")(args.config, args.output, args.store)
+        case "bandwidth":
+            return handler("bandwidth", "show_bandwidth")(args.watch, args.interval, args.window, args.procs,
+                                                          args.proc_interval)
+        case "sniffer" if args.read:
+            return handler("sniffer", "analyze_capture")(args.read, args.port, args.proto, args.src, args.dst, args.workers,
+                                                         args.top, args.window, args.export, args.max_flows, args.idle)
+        case "sniffer":
+            return handler("sniffer", "sniff_packets")(args.port, args.proto, args.src, args.dst, args.iface, args.fast, 4,
+                                                       args.flows, args.top, args.window, args.export, args.max_flows,
+                                                       args.idle)
+        case "scan":
+            return handler("scan", "scan_ports")(args.targets, args.fast, args.concurrency, args.rate, args.timeout,
+                                                 args.ports, args.per_host, args.jsonl, args.file)
+        case "arp": return handler("arp", "view_arp_table")(args.watch, args.interval)
+        case "firewall": return handler("firewall", "list_rules")()
+        case "interfaces": return handler("interfaces", "show_interfaces")(args.json)
+        case "ssl" if args.file:
+            return handler("ssl", "inventory")(args.file, args.port, args.concurrency, args.timeout, args.jsonl)
+        case "ssl" if args.host: return handler("ssl", "view_cert")(args.host, args.port, args.sni, args.timeout)
+        case "ssl": parser.error("ssl needs a host or --file")
+        case "subdomains":
+            return handler("subdomains", "enumerate_subdomains")(args.domain, not args.no_resolve, args.concurrency,
+                                                                 args.nameserver, args.refresh, args.ct_url)
+        case "cdn": return handler("cdn", "detect_cdn")(args.domain)
+        case "tech" if args.url or args.file:
+            return handler("tech", "fingerprint_tech")(args.url, args.file, args.concurrency, args.timeout, args.max_bytes,
+                                                       args.jsonl)
+        case "tech": parser.error("tech needs a URL or --file")
+        case "api":
+            body = handler("api", "read_body")(args.data, args.data_file)
+            if args.requests or args.duration or args.rate:
+                return handler("api", "benchmark_api")(args.url, args.headers, args.method.upper(), body, args.requests,
+                                                       args.concurrency, args.duration, args.rate, args.timeout,
+                                                       args.insecure, args.record, args.jsonl)
+            return handler("api", "monitor_api")(args.url, args.headers, args.record, args.method.upper(), body,
+                                                 args.timeout)
+        case "wifi": return handler("wifi", "export_wifi_heatmap")()
+        case "bt": return handler("bt", "scan_bluetooth")()
+        case "dhcp": return handler("dhcp", "view_dhcp_leases")()
+        case "lan": return handler("lan", "discover_lan_services")()
+        case "proxy" if args.file and args.watch:
+            return handler("proxy", "watch_proxies")(args.file, args.url, args.download, args.concurrency, args.timeout,
+                                                     args.output, args.interval, args.insecure)
+        case "proxy" if args.file:
+            return handler("proxy", "check_proxies")(args.file, args.url, args.download, args.concurrency, args.timeout,
+                                                     args.output, args.jsonl, args.insecure)
+        case "proxy" if args.proxy:
+            return handler("proxy", "check_proxy")(args.proxy, args.url, args.timeout, args.insecure)
+        case "proxy": parser.error("proxy needs a proxy URL or --file")
+        case "dnsleak": return handler("dnsleak", "test_dns_leak")(args.reference)
+        case "dns" if args.dns_command == "bulk":
+            return handler("dns", "bulk_resolve")(args.file, args.nameserver, args.type, args.concurrency, args.jsonl,
+                                                  args.timeout)
+        case "trace":
+            return handler("trace", "visualize_traceroute")(args.hosts, args.file, args.proto, args.port, args.max_hops,
+                                                            args.queries, args.timeout, args.rate, not args.no_paris,
+                                                            args.jsonl)
+        case "mitm-detect": return handler("mitm-detect", "detect_mitm")(args.watch, args.interval)
+        case "speedtest" if args.server:
+            return handler("speedtest", "serve_speedtest")(args.bind, args.port, args.once)
+        case "speedtest" if args.client:
+            return handler("speedtest", "run_client")(args.client, args.port, args.udp, args.reverse,
+                                                      max(1, args.streams), args.duration, args.interval, args.mbps,
+                                                      args.length)
+        case "speedtest": return handler("speedtest", "run_speedtest")()
+        case "reachability":
+            return handler("reachability", "check_reachability")(args.file, args.concurrency, args.per_host, args.jsonl,
+                                                                 args.timeout, args.record)
+        case "whois" if args.file or len(args.domains) > 1:
+            return handler("whois", "bulk_whois")(args.domains, args.file, args.concurrency, args.rate, args.timeout,
+                                                  args.rdap, args.server, args.refresh)
+        case "whois" if args.domains:
+            return handler("whois", "perform_whois")(args.domains[0], args.timeout, args.rdap, args.server, args.refresh)
+        case "whois": parser.error("whois needs a domain or --file")
+        case "tunnel-check": return handler("tunnel-check", "detect_tunnel_leak")()
+        case "batch": return handler("batch", "run_batch")(args.jobs, args.concurrency)
+
+def output_mode(args):
+    # a command's own --json/--jsonl means the same as the global flag;
+    # either way the command takes its record-producing path and emit()
+    # writes in the chosen format
+    mode = args.format or ("json" if getattr(args, "json", False) else
+                           "jsonl" if getattr(args, "jsonl", False) else None)
+    for flag in ("json", "jsonl"):
+        if hasattr(args, flag):
+            setattr(args, flag, mode is not None)
+    return mode
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.command != "batch":
+        output.mode = output_mode(args)
+    try:
+        dispatch(parser, args)
+        output.close()
+    except BrokenPipeError:
+        # the reader went away (netcut --jsonl ... | head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
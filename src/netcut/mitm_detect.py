@@ -1,10 +1,16 @@
-import subprocess
+from rich.console import Console
+from netcut.neighbors import read_neighbors, watch_neighbors
+from netcut.output import show_all
 
-def detect_mitm():
-    arp_output = subprocess.getoutput("arp -a")
-    macs = [line.split()[1] for line in arp_output.splitlines() if "-" in line or ":" in line]
-    duplicates = set([mac for mac in macs if macs.count(mac) > 1])
-    if duplicates:
-        print("⚠️ Possible MITM detected: Duplicate MACs ->", duplicates)
+def render(conflicts):
+    if conflicts:
+        print("⚠️ Possible MITM detected: Duplicate MACs ->", {c["mac"]: c["ips"] for c in conflicts})
     else:
-        print("✅ No signs of MITM detected.")
\ No newline at end of file
+        print("✅ No signs of MITM detected.")
+
+def detect_mitm(watch=False, interval=2.0):
+    if watch:
+        watch_neighbors(Console(), interval)
+        return
+    conflicts = [{"mac": mac, "ips": sorted(ips)} for mac, ips in read_neighbors().conflicts().items()]
+    return show_all(conflicts, render)
@@ -0,0 +1,130 @@
+import heapq
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from netcut.check import icmp_ping, tcp_check
+from netcut.history import HistoryStore
+from netcut.output import emit, status, structured
+from netcut.statuspage import StatusPage
+
+UPTIME_WINDOW = 24 * 3600
+COMPACT_EVERY = 3600
+
+def load_config(path):
+    with open(path) as f:
+        config = json.load(f)
+    services = config["services"] if isinstance(config, dict) else config
+    for service in services:
+        service.setdefault("type", "http" if "url" in service else "tcp" if "port" in service else "icmp")
+        service.setdefault("name", service.get("url") or service.get("host"))
+        service.setdefault("interval", 30)
+        service.setdefault("timeout", 2)
+    return services
+
+def run_check(service, session):
+    kind = service["type"]
+    timeout = service["timeout"]
+    start = time.perf_counter()
+    if kind == "icmp":
+        return icmp_ping(service["host"], timeout)
+    if kind == "tcp":
+        up = tcp_check(service["host"], service["port"], timeout)
+        return up, round((time.perf_counter() - start) * 1000, 2) if up else None
+    if kind == "http":
+        try:
+            r = session.get(service["url"], timeout=timeout)
+            up = r.status_code < service.get("max_status", 400)
+        except requests.RequestException:
+            return False, None
+        return up, round((time.perf_counter() - start) * 1000, 2)
+    raise ValueError(f"unknown check type: {kind}")
+
+class Uptime:
+    def __init__(self, window=UPTIME_WINDOW):
+        self.window = window
+        self.samples = deque()
+        self.up = 0
+
+    def seed(self, ts, up):
+        for t, u in zip(ts, up):
+            self.add(t, u)
+
+    def add(self, ts, up):
+        self.samples.append((ts, up))
+        self.up += up
+        while self.samples[0][0] < ts - self.window:
+            self.up -= self.samples.popleft()[1]
+
+    def percent(self):
+        return 100.0 * self.up / len(self.samples) if self.samples else None
+
+def run_monitor(config, output="status.html", store_dir=None, workers=16, refresh=5):
+    services = load_config(config)
+    store = HistoryStore(store_dir)
+    page = StatusPage(output)
+    session = requests.Session()
+    uptime = {}
+    now = time.time()
+    for service in services:
+        tracker = uptime[service["name"]] = Uptime()
+        # seed from the tail of the store only, never the whole history
+        ts, up, lat = store.get(service["name"]).read(now - UPTIME_WINDOW)
+        tracker.seed(ts, up)
+        if ts:
+            latency = None if lat[-1] != lat[-1] else lat[-1]
+            page.update({"name": service["name"], "up": bool(up[-1]), "latency": latency, "uptime": tracker.percent()})
+
+    due = [(time.monotonic(), i) for i in range(len(services))]
+    heapq.heapify(due)
+    running = {}
+    next_flush = 0.0
+    next_compact = time.monotonic() + COMPACT_EVERY
+    status(f"📡 Monitoring {len(services)} services, writing {output} (Ctrl+C to stop)")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                now = time.monotonic()
+                while due and due[0][0] <= now:
+                    at, i = heapq.heappop(due)
+                    service = services[i]
+                    if i not in running.values():
+                        running[pool.submit(run_check, service, session)] = i
+                    # stay on the service's own cadence, skipping missed slots
+                    heapq.heappush(due, (max(at + service["interval"], now), i))
+                timeout = max(0.0, due[0][0] - now) if due else None
+                if running:
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(timeout or 1)
+                    done = ()
+                for future in done:
+                    service = services[running.pop(future)]
+                    try:
+                        up, latency = future.result()
+                    except Exception as e:
+                        status(f"❌ {service['name']}: {e}")
+                        up, latency = False, None
+                    ts = time.time()
+                    store.append(service["name"], ts, up, latency)
+                    tracker = uptime[service["name"]]
+                    tracker.add(ts, 1 if up else 0)
+                    result = {"name": service["name"], "up": up, "latency": latency, "uptime": tracker.percent()}
+                    page.update(result)
+                    if structured():
+                        emit({"time": round(ts, 3), **result})
+                if time.monotonic() >= next_flush:
+                    page.flush()
+                    next_flush = time.monotonic() + refresh
+                if time.monotonic() >= next_compact:
+                    store.compact(time.time())
+                    next_compact = time.monotonic() + COMPACT_EVERY
+    except KeyboardInterrupt:
+        status("\n🛑 Monitor stopped.")
+    finally:
+        page.flush()
+        store.close()
+        session.close()
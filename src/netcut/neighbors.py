@@ -0,0 +1,101 @@
+import os
+import re
+import subprocess
+import time
+
+from netcut import output
+
+PROC_ARP = "/proc/net/arp"
+ATF_COM = 0x2
+# "? (10.0.0.1) at aa:bb:cc:dd:ee:ff [ether] on eth0" (Linux/BSD/macOS) and
+# "  10.0.0.1    aa-bb-cc-dd-ee-ff   dynamic" (Windows)
+ARP_LINE = re.compile(r"\(?(?P<ip>\d+\.\d+\.\d+\.\d+)\)?\s+(?:at\s+)?(?P<mac>[0-9a-fA-F]{1,2}(?:[:-][0-9a-fA-F]{1,2}){5})(?:.*\bon\s+(?P<iface>\S+))?")
+
+def normalize_mac(mac):
+    return ":".join(part.zfill(2) for part in mac.lower().replace("-", ":").split(":"))
+
+def shared_mac(mac):
+    # broadcast and multicast addresses are legitimately shared by many IPs
+    return mac == "ff:ff:ff:ff:ff:ff" or int(mac[:2], 16) & 1
+
+def read_proc_arp(path=PROC_ARP):
+    with open(path) as f:
+        next(f, None)
+        for line in f:
+            parts = line.split()
+            if len(parts) < 6 or not int(parts[2], 16) & ATF_COM:
+                continue
+            yield parts[0], parts[3], parts[5]
+
+def read_arp_command():
+    output = subprocess.run(["arp", "-a"], capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        m = ARP_LINE.search(line)
+        if m:
+            yield m["ip"], normalize_mac(m["mac"]), m["iface"] or "-"
+
+def read_neighbors():
+    if os.path.exists(PROC_ARP):
+        return NeighborTable(read_proc_arp())
+    return NeighborTable(read_arp_command())
+
+class NeighborTable:
+    def __init__(self, entries):
+        self.entries = {}
+        self.by_mac = {}
+        for ip, mac, iface in entries:
+            self.entries[ip] = (mac, iface)
+            self.by_mac.setdefault(mac, set()).add(ip)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def conflicts(self):
+        return {mac: ips for mac, ips in self.by_mac.items() if len(ips) > 1 and not shared_mac(mac)}
+
+    def records(self):
+        conflicts = self.conflicts()
+        return [{"ip": ip, "mac": mac, "interface": iface, "conflict": mac in conflicts}
+                for ip, (mac, iface) in self.entries.items()]
+
+    def diff(self, prev):
+        # only what changed since prev: IPs that moved to another MAC and
+        # MACs that picked up an IP they did not answer for before
+        moved = []
+        for ip, (mac, _) in self.entries.items():
+            old = prev.entries.get(ip)
+            if old and old[0] != mac:
+                moved.append((ip, old[0], mac))
+        claimed = {}
+        for mac, ips in self.conflicts().items():
+            new = ips - prev.by_mac.get(mac, set())
+            if new:
+                claimed[mac] = (new, ips)
+        return moved, claimed
+
+def watch_neighbors(console, interval=2.0):
+    def alert(text, **record):
+        # with an output format every alert is an event record instead
+        if output.structured():
+            output.emit({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **record})
+        else:
+            console.print(f"[bold red]{text}[/bold red]")
+
+    prev = read_neighbors()
+    output.status(f"👀 Watching {len(prev)} neighbors every {interval:g}s (Ctrl+C to stop)")
+    for mac, ips in prev.conflicts().items():
+        alert(f"⚠️ MAC {mac} already used by: {', '.join(sorted(ips))}", event="conflict", mac=mac, ips=sorted(ips))
+    try:
+        while True:
+            time.sleep(interval)
+            curr = read_neighbors()
+            moved, claimed = curr.diff(prev)
+            stamp = time.strftime("%H:%M:%S")
+            for ip, old, new in moved:
+                alert(f"{stamp} ⚠️ {ip} moved from {old} to {new}", event="moved", ip=ip, old_mac=old, mac=new)
+            for mac, (new, ips) in claimed.items():
+                alert(f"{stamp} ⚠️ MAC {mac} now also answers for {', '.join(sorted(new))} (all: {', '.join(sorted(ips))})",
+                      event="claimed", mac=mac, new=sorted(new), ips=sorted(ips))
+            prev = curr
+    except KeyboardInterrupt:
+        pass
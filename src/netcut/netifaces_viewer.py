@@ -1,9 +1,14 @@
-import psutil
-import netifaces
 from rich.console import Console
 from rich.table import Table
+from netcut.ifaces import snapshot
+from netcut.output import emit
 
-def show_interfaces():
+def show_interfaces(as_json=False):
+    interfaces = snapshot()
+    if as_json:
+        for iface in interfaces.values():
+            emit(iface)
+        return
     console = Console()
     table = Table(title="Network Interfaces")
 
@@ -13,13 +18,9 @@ def show_interfaces():
     table.add_column("RX Bytes")
     table.add_column("TX Bytes")
 
-    for iface in netifaces.interfaces():
-        addrs = netifaces.ifaddresses(iface)
-        ip = addrs.get(netifaces.AF_INET, [{}])[0].get('addr', '-')
-        mac = addrs.get(netifaces.AF_LINK, [{}])[0].get('addr', '-')
-        stats = psutil.net_io_counters(pernic=True).get(iface)
-        rx = str(stats.bytes_recv) if stats else '-'
-        tx = str(stats.bytes_sent) if stats else '-'
-        table.add_row(iface, ip, mac, rx, tx)
+    for iface in interfaces.values():
+        rx = str(iface.bytes_recv) if iface.bytes_recv is not None else '-'
+        tx = str(iface.bytes_sent) if iface.bytes_sent is not None else '-'
+        table.add_row(iface.name, iface.ip or '-', iface.mac or '-', rx, tx)
 
-    console.print(table)
\ No newline at end of file
+    console.print(table)
@@ -0,0 +1,148 @@
+import csv
+import json
+import sys
+import threading
+from contextlib import contextmanager
+
+# set from the global --json/--jsonl/--csv flags. None leaves each command to
+# its own tables and text; commands asked for --jsonl on their own still go
+# through emit(), as jsonl
+mode = None
+
+lock = threading.Lock()
+writer = None
+# batch jobs run side by side in one process, each with its own flags and
+# its own writer; a thread inside job() sees those instead of the globals
+local = threading.local()
+
+def as_record(item):
+    # results are dicts, slotted dataclasses, or slotted classes with a
+    # record() method (ifaces.Interface). dataclasses are walked by hand:
+    # importing the module for asdict() would cost more than --help does
+    if isinstance(item, dict):
+        return item
+    if hasattr(item, "__dataclass_fields__"):
+        return {name: plain(getattr(item, name)) for name in item.__dataclass_fields__}
+    return item.record()
+
+def plain(value):
+    if hasattr(value, "__dataclass_fields__"):
+        return as_record(value)
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    return value
+
+def flatten(record, prefix=""):
+    # one CSV column per leaf: nested dicts become dotted names, lists of
+    # plain values are joined, anything deeper stays JSON in its cell
+    row = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten(value, f"{name}."))
+        elif isinstance(value, (list, tuple)):
+            if all(not isinstance(v, (dict, list, tuple)) for v in value):
+                row[name] = ";".join("" if v is None else str(v) for v in value)
+            else:
+                row[name] = json.dumps(value, default=str)
+        else:
+            row[name] = "" if value is None else value
+    return row
+
+class Writer:
+    def __init__(self, mode):
+        self.mode = mode
+        self.count = 0
+        self.csv = None
+
+    def write(self, record):
+        out = sys.stdout
+        if self.mode == "csv":
+            row = flatten(record)
+            if self.csv is None:
+                # the first record fixes the columns; later records fill the
+                # ones they have
+                self.csv = csv.DictWriter(out, list(row), restval="", extrasaction="ignore")
+                self.csv.writeheader()
+            self.csv.writerow(row)
+        elif self.mode == "json":
+            # a JSON array, written element by element so consumers that
+            # stream-parse see records as they are produced
+            out.write(("[\n" if not self.count else ",\n") + json.dumps(record, default=str))
+        else:
+            out.write(json.dumps(record, default=str) + "\n")
+        self.count += 1
+        out.flush()
+
+    def close(self):
+        if self.mode == "json":
+            sys.stdout.write("\n]\n" if self.count else "[]\n")
+            sys.stdout.flush()
+
+def current():
+    return local.mode if hasattr(local, "mode") else mode
+
+@contextmanager
+def job(job_mode):
+    local.mode, local.writer = job_mode, None
+    try:
+        yield
+        close()
+    finally:
+        del local.mode, local.writer
+
+def emit(item):
+    global writer
+    record = as_record(item)
+    if hasattr(local, "mode"):
+        if local.writer is None:
+            local.writer = Writer(local.mode or "jsonl")
+        local.writer.write(record)
+        return record
+    with lock:
+        if writer is None:
+            writer = Writer(mode or "jsonl")
+        writer.write(record)
+    return record
+
+def close():
+    global writer
+    if hasattr(local, "mode"):
+        if local.writer is None and local.mode == "json":
+            local.writer = Writer(local.mode)
+        if local.writer is not None:
+            local.writer.close()
+            local.writer = None
+        return
+    with lock:
+        if writer is None and mode == "json":
+            writer = Writer(mode)
+        if writer is not None:
+            writer.close()
+            writer = None
+
+def structured():
+    return current() is not None
+
+def show(item, render):
+    # the one switch between the two halves of a command: records when an
+    # output format was asked for, the human rendering otherwise
+    if current():
+        emit(item)
+    else:
+        render(item)
+    return item
+
+def show_all(items, render):
+    # same for commands that render their records together, as a table
+    if current():
+        for item in items:
+            emit(item)
+    else:
+        render(items)
+    return items
+
+def status(message):
+    # progress lines stay off stdout while records are being written there,
+    # and always inside a batch job, whose stdout is its result
+    print(message, file=sys.stderr if current() or hasattr(local, "mode") else sys.stdout, flush=True)
@@ -1,6 +1,24 @@
-from scapy.all import sniff
+import ipaddress
+import math
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scapy.all import sniff, conf
+from scapy.error import Scapy_Exception
 from rich.console import Console
-from rich.table import Table
+from rich.live import Live
+
+from netcut.flows import FlowTable, FlowExporter, IP_PROTOS, PORTED, parse_frame, render_flows
+from netcut.output import emit, structured
+from netcut.pcapfile import Capture, CaptureError
+
+BPF_PROTOS = {"tcp", "udp", "icmp", "icmp6", "sctp", "arp", "ip", "ip6"}
+PROTO_NUMBERS = {name.lower(): num for num, name in IP_PROTOS.items()}
+# frame header length by scapy link-layer class; Ether is resolved per
+# frame because of VLAN tags
+LINK_OFFSETS = {"Ether": 14, "CookedLinux": 16, "CookedLinuxV2": 20, "Loopback": 4, "IP": 0, "IPv6": 0}
 
 def packet_filter(pkt, port=None, proto=None, src=None, dst=None):
     if port and (pkt.haslayer("TCP") or pkt.haslayer("UDP")):
@@ -15,16 +33,208 @@ def packet_filter(pkt, port=None, proto=None, src=None, dst=None):
         return False
     return True
 
-def sniff_packets(port=None, proto=None, src=None, dst=None):
-    console = Console()
-    def process(pkt):
-        if packet_filter(pkt, port, proto, src, dst):
-            table = Table(show_header=True, header_style="bold magenta")
-            table.add_column("Src")
-            table.add_column("Dst")
-            table.add_column("Proto")
-            table.add_column("Len")
-            proto_type = pkt.lastlayer().name
-            table.add_row(pkt[0][1].src, pkt[0][1].dst, proto_type, str(len(pkt)))
-            console.print(table)
-    sniff(prn=process, store=0)
\ No newline at end of file
+def check_host(value):
+    try:
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        if not value.replace("-", "").replace(".", "").isalnum():
+            raise ValueError(f"invalid host: {value}")
+        return value
+
+def build_bpf(port=None, proto=None, src=None, dst=None):
+    parts = []
+    if proto and proto.lower() in BPF_PROTOS:
+        parts.append(proto.lower())
+    if port:
+        parts.append(f"port {int(port)}")
+    if src:
+        parts.append(f"src host {check_host(src)}")
+    if dst:
+        parts.append(f"dst host {check_host(dst)}")
+    return " and ".join(parts) or None
+
+def pack_ip(value):
+    try:
+        ip = ipaddress.ip_address(value)
+    except ValueError:
+        ip = ipaddress.ip_address(socket.gethostbyname(value))
+    return ip.packed
+
+def raw_matcher(port=None, proto=None, src=None, dst=None):
+    # same semantics as the BPF expression, checked against parsed header
+    # fields; only used when the kernel filter could not be installed
+    port = int(port) if port else None
+    proto_num = PROTO_NUMBERS.get(proto.lower()) if proto else None
+    src = pack_ip(src) if src else None
+    dst = pack_ip(dst) if dst else None
+    if port is None and proto_num is None and src is None and dst is None:
+        return None
+
+    def match(flow):
+        if proto_num is not None and flow[0] != proto_num:
+            return False
+        if port is not None and flow[3] != port and flow[4] != port:
+            return False
+        if src is not None and flow[1] != src:
+            return False
+        if dst is not None and flow[2] != dst:
+            return False
+        return True
+    return match
+
+def flow_of(pkt):
+    ip = pkt.getlayer("IP") or pkt.getlayer("IPv6")
+    if ip is None:
+        return None
+    proto = ip.proto if ip.name == "IP" else ip.nh
+    l4 = ip.payload
+    sport = getattr(l4, "sport", 0) if proto in PORTED else 0
+    dport = getattr(l4, "dport", 0) if proto in PORTED else 0
+    family = socket.AF_INET if ip.name == "IP" else socket.AF_INET6
+    return proto, socket.inet_pton(family, ip.src), socket.inet_pton(family, ip.dst), sport, dport
+
+class FlowView:
+    def __init__(self, table, rows=20, by="bytes"):
+        self.table = table
+        self.rows = rows
+        self.by = by
+        self.started = time.monotonic()
+
+    def add(self, flow, length, ts):
+        self.table.add(flow, length, ts)
+
+    def render(self):
+        table = self.table
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        title = (f"{table.packets} packets, {table.bytes / 1024:.1f} KB, {table.packets / elapsed:.0f} pkt/s, "
+                 f"{len(table)} flows, {table.evicted} evicted")
+        return render_flows(table, self.rows, self.by, title)
+
+def capture_raw(iface, bpf, match, view):
+    try:
+        sock = conf.L2listen(iface=iface, filter=bpf)
+    except Scapy_Exception:
+        sock = conf.L2listen(iface=iface)
+    offsets = {}
+    try:
+        while True:
+            cls, data, ts = sock.recv_raw()
+            if data is None:
+                continue
+            offset = offsets.get(cls)
+            if offset is None:
+                offset = offsets[cls] = LINK_OFFSETS.get(getattr(cls, "__name__", ""), 14)
+            flow = parse_frame(data, offset)
+            if flow is not None and (match is None or match(flow)):
+                view.add(flow, len(data), ts or time.time())
+    finally:
+        sock.close()
+
+def read_chunk(capture, table, match, start=None, end=None, state=None):
+    data = capture.data
+    for ts, lo, hi, length, header in capture.records(start, end, state):
+        flow = parse_frame(data, header, lo, hi)
+        if flow is not None and (match is None or match(flow)):
+            table.add(flow, length, ts)
+
+def aggregate_chunk(path, start, end, state, filters):
+    table = FlowTable(sys.maxsize, math.inf)
+    with Capture(path) as capture:
+        read_chunk(capture, table, raw_matcher(*filters), start, end, state)
+    return table.partial()
+
+def flow_sink(exporter):
+    # evicted flows go to the export file and, with an output format, out as
+    # records the moment the table lets go of them
+    writers = [writer for writer in (exporter and exporter.write, structured() and emit) if writer]
+    if len(writers) < 2:
+        return writers[0] if writers else None
+    return lambda flow: [writer(flow) for writer in writers]
+
+def analyze_capture(path, port=None, proto=None, src=None, dst=None, workers=1,
+                    top=20, window=10, export=None, max_flows=65536, idle=120):
+    console = Console(stderr=structured())
+    if proto and proto.lower() not in PROTO_NUMBERS:
+        console.print(f"[bold red]❌ Offline filters understand {', '.join(sorted(PROTO_NUMBERS))}, not {proto}[/bold red]")
+        return
+    filters = (port, proto, src, dst)
+    exporter = FlowExporter(export) if export else None
+    started = time.perf_counter()
+    try:
+        with Capture(path) as capture:
+            if workers > 1:
+                # partial tables are unbounded so that merging is exact
+                table = FlowTable(sys.maxsize, math.inf, window, flow_sink(exporter))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(aggregate_chunk, path, start, end, state, filters)
+                               for start, end, state in capture.chunks(workers)]
+                    for future in futures:
+                        for partial in future.result():
+                            table.merge(*partial)
+            else:
+                table = FlowTable(max_flows, idle, window, flow_sink(exporter))
+                read_chunk(capture, table, raw_matcher(*filters))
+    except (CaptureError, OSError) as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    title = (f"{path}: {table.packets} packets, {table.bytes / 1024:.1f} KB, {len(table) + table.evicted} flows, "
+             f"{table.packets / elapsed:.0f} pkt/s")
+    if not structured():
+        console.print(render_flows(table, top, "bytes", title))
+    table.drain()
+    if exporter:
+        exporter.close()
+        console.print(f"💾 Exported {table.evicted} flows to {export}")
+
+def sniff_packets(port=None, proto=None, src=None, dst=None, iface=None, fast=False, refresh=4,
+                  flows=False, top=20, window=10, export=None, max_flows=65536, idle=120):
+    console = Console(stderr=structured())
+    try:
+        bpf = build_bpf(port, proto, src, dst)
+    except ValueError as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        return
+    if proto and proto.lower() not in BPF_PROTOS and fast:
+        console.print(f"[bold red]❌ --fast only understands {', '.join(sorted(PROTO_NUMBERS))}; drop --fast to match {proto}[/bold red]")
+        return
+
+    match = None
+    if bpf:
+        # probe once whether the kernel filter can be compiled here
+        try:
+            conf.L2listen(iface=iface, filter=bpf).close()
+        except Scapy_Exception as e:
+            console.print(f"[yellow]⚠️ BPF filter unavailable ({e}); filtering in Python.[/yellow]")
+            match = raw_matcher(port, proto, src, dst)
+            bpf = None
+
+    exporter = FlowExporter(export) if export else None
+    table = FlowTable(max_flows, idle, window, flow_sink(exporter))
+    view = FlowView(table, top, "rate" if flows else "bytes")
+    live = None
+    if not structured():
+        live = Live(get_renderable=view.render, console=console, refresh_per_second=refresh, transient=False)
+        live.start()
+    try:
+        if fast:
+            capture_raw(iface, bpf, match, view)
+        else:
+            python_filter = proto and proto.lower() not in BPF_PROTOS or match is not None
+
+            def process(pkt):
+                if python_filter and not packet_filter(pkt, port, proto, src, dst):
+                    return
+                flow = flow_of(pkt)
+                if flow is not None:
+                    view.add(flow, len(pkt), float(pkt.time))
+            sniff(iface=iface, filter=bpf, prn=process, store=0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if live:
+            live.stop()
+    table.drain()
+    if exporter:
+        exporter.close()
+        console.print(f"💾 Exported {table.evicted} flows to {export}")
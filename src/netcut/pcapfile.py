@@ -0,0 +1,155 @@
+import mmap
+import struct
+
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+# frame header length per pcap LINKTYPE_*; raw-IP link types have none
+LINK_HEADERS = {0: 4, 1: 14, 12: 0, 14: 0, 101: 0, 108: 4, 113: 16, 228: 0, 229: 0, 276: 20}
+
+class CaptureError(Exception):
+    pass
+
+class Capture:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise CaptureError(f"{path} is empty")
+        magic = self.data[:4]
+        if magic in PCAP_MAGIC:
+            self.kind = "pcap"
+            self.order, self.scale = PCAP_MAGIC[magic]
+            linktype = struct.unpack_from(self.order + "I", self.data, 20)[0] & 0xFFFF
+            if linktype not in LINK_HEADERS:
+                self.close()
+                raise CaptureError(f"unsupported link type {linktype}")
+            self.header = LINK_HEADERS[linktype]
+            self.first = 24
+            self.record = struct.Struct(self.order + "IIII")
+        elif magic == PCAPNG_MAGIC:
+            self.kind = "pcapng"
+            self.first = 0
+        else:
+            self.close()
+            raise CaptureError(f"{path} is not a pcap or pcapng file")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def records(self, start=None, end=None, state=None):
+        # yields (timestamp, frame start, frame end, original length, link
+        # header length); frames are never copied, callers index straight
+        # into self.data
+        start = self.first if start is None else start
+        end = len(self.data) if end is None else end
+        if self.kind == "pcap":
+            return self.pcap_records(start, end)
+        order, interfaces = state or ("<", [])
+        return self.pcapng_records(start, end, order, list(interfaces))
+
+    def pcap_records(self, start, end):
+        data, unpack, scale, header = self.data, self.record.unpack_from, self.scale, self.header
+        pos = start
+        while pos + 16 <= end:
+            sec, frac, caplen, origlen = unpack(data, pos)
+            pos += 16
+            if pos + caplen > len(data):
+                return
+            yield sec + frac * scale, pos, pos + caplen, origlen, header
+            pos += caplen
+
+    def pcapng_records(self, start, end, order, interfaces):
+        data = self.data
+        pos = start
+        while pos + 12 <= end:
+            block_type = struct.unpack_from(order + "I", data, pos)[0]
+            if block_type == 0x0A0D0D0A:
+                order = "<" if data[pos + 8:pos + 12] == b"\x4d\x3c\x2b\x1a" else ">"
+                interfaces.clear()
+            block_len = struct.unpack_from(order + "I", data, pos + 4)[0]
+            if block_len < 12 or pos + block_len > len(data):
+                return
+            body = pos + 8
+            if block_type == 1:
+                linktype = struct.unpack_from(order + "H", data, body)[0]
+                interfaces.append((LINK_HEADERS.get(linktype), self.tsresol(body + 8, pos + block_len - 4, order)))
+            elif block_type in (6, 2):
+                if block_type == 6:
+                    iface, high, low, caplen, origlen = struct.unpack_from(order + "IIIII", data, body)
+                else:
+                    iface, _, high, low, caplen, origlen = struct.unpack_from(order + "HHIIII", data, body)
+                if iface < len(interfaces) and interfaces[iface][0] is not None:
+                    header, scale = interfaces[iface]
+                    frame = body + 20
+                    yield ((high << 32 | low) * scale, frame, frame + caplen, origlen, header)
+            elif block_type == 3 and interfaces and interfaces[0][0] is not None:
+                origlen = struct.unpack_from(order + "I", data, body)[0]
+                caplen = min(origlen, block_len - 16)
+                yield 0.0, body + 4, body + 4 + caplen, origlen, interfaces[0][0]
+            pos += block_len
+
+    def tsresol(self, pos, end, order):
+        data = self.data
+        while pos + 4 <= end:
+            code, length = struct.unpack_from(order + "HH", data, pos)
+            if code == 0:
+                break
+            if code == 9 and length >= 1:
+                value = data[pos + 4]
+                return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+            pos += 4 + (length + 3) // 4 * 4
+        return 1e-6
+
+    def chunks(self, count):
+        # walk record headers only (no frame parsing) to cut the file into
+        # roughly equal byte ranges that start on record boundaries; pcapng
+        # chunks also carry the interface table in effect at their start
+        size = len(self.data)
+        target = max(1, (size - self.first) // max(1, count))
+        bounds = [(self.first, None)]
+        if self.kind == "pcap":
+            pos = self.first
+            unpack = self.record.unpack_from
+            next_cut = self.first + target
+            while pos + 16 <= size:
+                if pos >= next_cut:
+                    bounds.append((pos, None))
+                    next_cut = pos + target
+                pos += 16 + unpack(self.data, pos)[2]
+        else:
+            interfaces = []
+            pos = 0
+            order = "<"
+            next_cut = target
+            while pos + 12 <= size:
+                block_type = struct.unpack_from(order + "I", self.data, pos)[0]
+                if block_type == 0x0A0D0D0A:
+                    order = "<" if self.data[pos + 8:pos + 12] == b"\x4d\x3c\x2b\x1a" else ">"
+                    interfaces = []
+                elif pos >= next_cut:
+                    bounds.append((pos, (order, list(interfaces))))
+                    next_cut = pos + target
+                block_len = struct.unpack_from(order + "I", self.data, pos + 4)[0]
+                if block_len < 12:
+                    break
+                if block_type == 1:
+                    linktype = struct.unpack_from(order + "H", self.data, pos + 8)[0]
+                    interfaces.append((LINK_HEADERS.get(linktype), self.tsresol(pos + 16, pos + block_len - 4, order)))
+                pos += block_len
+        ends = [start for start, _ in bounds[1:]] + [size]
+        return [(start, end, state) for (start, state), end in zip(bounds, ends)]
@@ -1,19 +1,358 @@
+import errno
+import heapq
+import ipaddress
+import itertools
+import selectors
 import socket
-from concurrent.futures import ThreadPoolExecutor
+import struct
+import sys
+import time
+from collections import deque
 
-def scan_port(host, port):
-    try:
-        with socket.create_connection((host, port), timeout=0.5):
-            return port
-    except:
+from netcut.output import emit
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+OPEN, CLOSED, FILTERED, RETRY = "open", "closed", "filtered", "retry"
+
+# errors that mean "we ran out of local resources", not "the port is closed"
+LOCAL_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL}
+IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY}
+LINGER_RST = struct.pack("ii", 1, 0)
+
+def raise_fd_limit(wanted):
+    if resource is None:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted + 256
+    if hard != resource.RLIM_INFINITY:
+        target = min(target, hard)
+    if soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    return max(1, min(wanted, soft - 256))
+
+class ScanController:
+    def __init__(self, concurrency=1000, rate=None, timeout=None, min_timeout=0.2, max_timeout=3.0):
+        self.max_window = max(1, concurrency)
+        self.min_window = min(16, self.max_window)
+        self.window = min(100, self.max_window)
+        self.rate = rate
+        self.fixed_timeout = timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.responses = 0
+        self.timeouts = 0
+        self.next_send = 0.0
+
+    def timeout(self):
+        if self.fixed_timeout:
+            return self.fixed_timeout
+        if self.srtt is None:
+            return 1.0
+        rto = self.srtt + 4 * self.rttvar
+        return min(self.max_timeout, max(self.min_timeout, rto))
+
+    def limit(self):
+        return int(self.window)
+
+    def send_delay(self, now):
+        if not self.rate or self.next_send <= now:
+            return 0.0
+        return self.next_send - now
+
+    def sent(self, now):
+        if self.rate:
+            self.next_send = max(now, self.next_send) + 1 / self.rate
+
+    def record(self, state, rtt):
+        if rtt is not None:
+            # RFC 6298 smoothing, same as TCP's retransmission timer
+            if self.srtt is None:
+                self.srtt, self.rttvar = rtt, rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        if state == RETRY:
+            self.window = max(self.min_window, self.window / 2)
+            return
+        if state == FILTERED:
+            self.timeouts += 1
+        else:
+            self.responses += 1
+        if self.responses + self.timeouts >= max(50, self.limit()):
+            self.adjust()
+
+    def adjust(self):
+        total = self.responses + self.timeouts
+        loss = self.timeouts / total
+        # a host that drops everything is firewalled, not congested, so only
+        # back off when some probes are answered and others are lost
+        if self.responses and loss > 0.1:
+            self.window = max(self.min_window, self.window / 2)
+        elif loss < 0.02 or not self.responses:
+            self.window = min(self.max_window, self.window * 1.5)
+        self.responses = self.timeouts = 0
+
+def close_probe(sock, state):
+    if state == OPEN:
+        # reset instead of FIN so open ports don't pile up TIME_WAIT sockets
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RST)
+        except OSError:
+            pass
+    sock.close()
+
+def classify(err):
+    if err == 0:
+        return OPEN
+    if err == errno.ECONNREFUSED:
+        return CLOSED
+    if err in LOCAL_ERRNOS:
+        return RETRY
+    return FILTERED
+
+def run_scan(probes, controller, on_result, per_host=None):
+    sel = selectors.DefaultSelector()
+    deadlines = []
+    inflight = {}
+    retry = []
+    ready = deque()
+    deferred = {}
+    host_load = {}
+    seq = itertools.count()
+    probes = iter(probes)
+    exhausted = False
+    backlog = 0
+    max_backlog = max(1024, controller.max_window * 4)
+
+    def next_target():
+        nonlocal exhausted, backlog
+        if retry:
+            return retry.pop()
+        if ready:
+            return ready.popleft()
+        # park probes for saturated hosts instead of stalling the whole queue,
+        # but stop pulling from the generator once too many are parked
+        while not exhausted and backlog < max_backlog:
+            target = next(probes, None)
+            if target is None:
+                exhausted = True
+                return None
+            if per_host and host_load.get(target[3], 0) >= per_host:
+                deferred.setdefault(target[3], deque()).append(target)
+                backlog += 1
+                continue
+            return target
         return None
 
-def scan_ports(host, fast=False):
-    ports = range(1, 1025) if fast else range(1, 65536)
-    open_ports = []
-    with ThreadPoolExecutor(max_workers=100) as executor:
-        results = executor.map(lambda p: scan_port(host, p), ports)
-    for port in results:
-        if port:
-            open_ports.append(port)
-    print(f"Open ports on {host}: {', '.join(map(str, open_ports))}")
\ No newline at end of file
+    def release(host):
+        nonlocal backlog
+        load = host_load[host] - 1
+        if load:
+            host_load[host] = load
+        else:
+            del host_load[host]
+        waiting = deferred.get(host)
+        if waiting:
+            ready.append(waiting.popleft())
+            backlog -= 1
+            if not waiting:
+                del deferred[host]
+
+    def finish(fd, state, now):
+        sock, target, start, _ = inflight.pop(fd)
+        sel.unregister(sock)
+        close_probe(sock, state)
+        release(target[3])
+        rtt = now - start if state in (OPEN, CLOSED) else None
+        controller.record(state, rtt)
+        if state == RETRY:
+            retry.append(target)
+        else:
+            on_result(target, state, rtt)
+
+    try:
+        while True:
+            now = time.monotonic()
+            wait = None
+            while len(inflight) < controller.limit():
+                wait = controller.send_delay(now)
+                if wait:
+                    break
+                target = next_target()
+                if target is None:
+                    wait = None
+                    break
+                family, addr = target[0], target[1]
+                try:
+                    sock = socket.socket(family, socket.SOCK_STREAM)
+                except OSError as e:
+                    # EMFILE and friends clear up as probes finish; anything
+                    # else (no IPv6 on this host, say) never will
+                    state = classify(e.errno)
+                    controller.record(state, None)
+                    if state == RETRY:
+                        retry.append(target)
+                        break
+                    on_result(target, state, None)
+                    continue
+                sock.setblocking(False)
+                err = sock.connect_ex(addr)
+                controller.sent(now)
+                if err not in IN_PROGRESS:
+                    state = classify(err)
+                    close_probe(sock, state)
+                    controller.record(state, 0.0 if state in (OPEN, CLOSED) else None)
+                    if state == RETRY:
+                        retry.append(target)
+                        break
+                    on_result(target, state, 0.0)
+                    continue
+                fd = sock.fileno()
+                token = next(seq)
+                inflight[fd] = (sock, target, time.monotonic(), token)
+                host_load[target[3]] = host_load.get(target[3], 0) + 1
+                sel.register(sock, selectors.EVENT_WRITE, fd)
+                heapq.heappush(deadlines, (now + controller.timeout(), token, fd))
+
+            if not inflight:
+                if exhausted and not retry and not ready:
+                    break
+                time.sleep(wait or 0.01)
+                continue
+
+            timeout = max(0.0, deadlines[0][0] - now) if deadlines else None
+            if wait is not None:
+                timeout = wait if timeout is None else min(timeout, wait)
+            events = sel.select(timeout)
+            now = time.monotonic()
+            for key, _ in events:
+                err = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                finish(key.data, classify(err), now)
+            while deadlines and deadlines[0][0] <= now:
+                _, token, fd = heapq.heappop(deadlines)
+                entry = inflight.get(fd)
+                if entry is not None and entry[3] == token:
+                    finish(fd, FILTERED, now)
+            # drop stale heap entries left behind by probes that already answered
+            while deadlines and (deadlines[0][2] not in inflight or inflight[deadlines[0][2]][3] != deadlines[0][1]):
+                heapq.heappop(deadlines)
+    finally:
+        for sock, _, _, _ in inflight.values():
+            sock.close()
+        sel.close()
+
+def resolve(host):
+    family, _, _, _, sockaddr = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)[0]
+    return family, sockaddr[0]
+
+def parse_ports(spec):
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            lo, hi = int(lo or 1), int(hi or 65535)
+        else:
+            lo = hi = int(part)
+        if not 1 <= lo <= hi <= 65535:
+            raise ValueError(f"invalid port range: {part}")
+        ports.update(range(lo, hi + 1))
+    if not ports:
+        raise ValueError("empty port spec")
+    return sorted(ports)
+
+def read_targets(path):
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def iter_hosts(targets):
+    for target in targets:
+        try:
+            net = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            net = None
+        if net is not None:
+            family = socket.AF_INET if net.version == 4 else socket.AF_INET6
+            hosts = net.hosts() if net.num_addresses > 2 else iter(net)
+            for ip in hosts:
+                yield family, str(ip), str(ip)
+            continue
+        try:
+            family, ip = resolve(target)
+        except socket.gaierror as e:
+            print(f"❌ Could not resolve {target}: {e}", file=sys.stderr)
+            continue
+        yield family, ip, target
+
+def iter_probes(hosts, ports, block=256):
+    # hosts are consumed in blocks and ports are walked outermost inside each
+    # block, so consecutive probes hit different hosts and only one block of
+    # hosts is ever held in memory
+    hosts = iter(hosts)
+    while True:
+        chunk = list(itertools.islice(hosts, block))
+        if not chunk:
+            return
+        for port in ports:
+            for family, ip, name in chunk:
+                addr = (ip, port) if family == socket.AF_INET else (ip, port, 0, 0)
+                yield family, addr, port, ip, name
+
+def scan_ports(targets, fast=False, concurrency=1000, rate=None, timeout=None,
+               ports=None, per_host=256, jsonl=False, file=None):
+    if isinstance(targets, str):
+        targets = [targets]
+    sources = [targets or []]
+    if file:
+        sources.append(read_targets(file))
+    try:
+        port_list = parse_ports(ports) if ports else range(1, 1025) if fast else range(1, 65536)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return {}
+    controller = ScanController(raise_fd_limit(concurrency), rate, timeout)
+    open_ports = {}
+    scanned = 0
+
+    def on_result(target, state, rtt):
+        nonlocal scanned
+        scanned += 1
+        if state != OPEN:
+            return
+        _, _, port, ip, name = target
+        open_ports.setdefault(name, []).append(port)
+        if jsonl:
+            record = {"host": name, "ip": ip, "port": port, "state": state,
+                      "rtt_ms": round(rtt * 1000, 3) if rtt is not None else None}
+            emit(record)
+        else:
+            print(f"🟢 {name}:{port} open", flush=True)
+
+    start = time.perf_counter()
+    hosts = iter_hosts(itertools.chain.from_iterable(sources))
+    run_scan(iter_probes(hosts, port_list), controller, on_result, per_host)
+    elapsed = time.perf_counter() - start
+    if not jsonl:
+        for name, found in open_ports.items():
+            print(f"Open ports on {name}: {', '.join(map(str, sorted(found)))}")
+        print(f"Scanned {scanned} ports in {elapsed:.2f}s ({scanned / max(elapsed, 1e-9):.0f} ports/s)")
+    return open_ports
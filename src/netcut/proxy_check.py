@@ -1,26 +1,380 @@
-import requests
+import base64
+import heapq
+import http.client
+import io
+import ipaddress
+import json
+import os
+import socket
+import ssl
+import struct
+import sys
 import time
-import urllib3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import unquote, urlsplit
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from rich.console import Console
+from rich.table import Table
 
-def check_proxy(proxy_url):
-    proxies = {
-        "http": proxy_url,
-        "https": proxy_url
-    }
+from netcut.output import emit, show, status, structured
+
+ECHO_URL = "http://httpbin.org/ip"
+DEFAULT_PORTS = {"http": 8080, "https": 443, "socks4": 1080, "socks4a": 1080, "socks5": 1080, "socks5h": 1080}
+MAX_BACKOFF = 32
+
+class ProxyError(Exception):
+    pass
+
+def parse_proxy(text):
+    text = text.strip()
+    if "://" not in text:
+        text = "http://" + text
+    proxy = urlsplit(text)
+    if proxy.scheme not in DEFAULT_PORTS or not proxy.hostname:
+        raise ValueError(f"unsupported proxy: {text}")
+    return proxy
+
+def iter_proxies(file):
+    f = sys.stdin if file == "-" else open(file)
     try:
-        start = time.time()
-        session = requests.Session()
-        session.verify = False
-        session.trust_env = False
-        r = session.get("http://httpbin.org/ip", proxies=proxies, timeout=5)
-        end = time.time()
-        if "application/json" in r.headers.get("Content-Type", ""):
-            print("Your IP via Proxy:", r.json().get("origin"))
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ProxyError("proxy closed the connection")
+        data += chunk
+    return data
+
+def socks5_handshake(sock, proxy, host, port):
+    user, password = unquote(proxy.username or ""), unquote(proxy.password or "")
+    sock.sendall(b"\x05\x02\x00\x02" if user else b"\x05\x01\x00")
+    version, method = recv_exact(sock, 2)
+    if version != 5 or method == 0xFF:
+        raise ProxyError("SOCKS5 proxy refused our authentication methods")
+    if method == 2:
+        sock.sendall(bytes([1, len(user)]) + user.encode() + bytes([len(password)]) + password.encode())
+        if recv_exact(sock, 2)[1] != 0:
+            raise ProxyError("SOCKS5 authentication failed")
+    if proxy.scheme == "socks5":
+        # plain socks5 resolves locally, socks5h leaves names to the proxy
+        host = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    try:
+        ip = ipaddress.ip_address(host)
+        address = (b"\x01" if ip.version == 4 else b"\x04") + ip.packed
+    except ValueError:
+        address = b"\x03" + bytes([len(host)]) + host.encode("idna")
+    sock.sendall(b"\x05\x01\x00" + address + struct.pack("!H", port))
+    _, reply, _, kind = recv_exact(sock, 4)
+    if reply != 0:
+        raise ProxyError(f"SOCKS5 connect failed (reply {reply})")
+    recv_exact(sock, {1: 4, 4: 16}.get(kind) or recv_exact(sock, 1)[0])
+    recv_exact(sock, 2)
+
+def socks4_handshake(sock, proxy, host, port):
+    user = unquote(proxy.username or "").encode()
+    if proxy.scheme == "socks4a":
+        # 0.0.0.x tells a 4a proxy to resolve the name that follows
+        request = struct.pack("!BBH4s", 4, 1, port, b"\x00\x00\x00\x01") + user + b"\x00" + host.encode("idna") + b"\x00"
+    else:
+        ip = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+        request = struct.pack("!BBH4s", 4, 1, port, socket.inet_aton(ip)) + user + b"\x00"
+    sock.sendall(request)
+    reply = recv_exact(sock, 8)
+    if reply[1] != 0x5A:
+        raise ProxyError(f"SOCKS4 connect refused (reply {reply[1]:#x})")
+
+def proxy_auth(proxy):
+    if not proxy.username:
+        return {}
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
+
+def http_connect(sock, proxy, host, port):
+    headers = "".join(f"{k}: {v}\r\n" for k, v in proxy_auth(proxy).items())
+    sock.sendall(f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n{headers}\r\n".encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ProxyError("proxy closed the connection during CONNECT")
+        response += chunk
+        if len(response) > 65536:
+            raise ProxyError("oversized CONNECT response")
+    status = response.split(b"\r\n", 1)[0].split()
+    if len(status) < 2 or status[1] != b"200":
+        raise ProxyError(f"CONNECT refused: {b' '.join(status[1:]).decode(errors='replace')}")
+
+class NestedTLS:
+    # TLS to the target inside the TLS session with an https proxy; an
+    # SSLSocket cannot be wrapped a second time, so this one runs on BIOs
+    def __init__(self, sock, context, server_hostname):
+        self.sock = sock
+        self.incoming = ssl.MemoryBIO()
+        self.outgoing = ssl.MemoryBIO()
+        self.tls = context.wrap_bio(self.incoming, self.outgoing, server_hostname=server_hostname)
+        self.run(self.tls.do_handshake)
+
+    def run(self, operation, *args):
+        while True:
+            try:
+                result = operation(*args)
+            except ssl.SSLWantReadError:
+                self.flush()
+                data = self.sock.recv(65536)
+                if data:
+                    self.incoming.write(data)
+                else:
+                    self.incoming.write_eof()
+                continue
+            except ssl.SSLZeroReturnError:
+                result = 0 if len(args) > 1 else b""
+            self.flush()
+            return result
+
+    def flush(self):
+        if data := self.outgoing.read():
+            self.sock.sendall(data)
+
+    def sendall(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[self.run(self.tls.write, view):]
+
+    def send(self, data):
+        return self.run(self.tls.write, data)
+
+    def recv(self, size):
+        return self.run(self.tls.read, size)
+
+    def recv_into(self, buffer, size=0):
+        return self.run(self.tls.read, size or len(buffer), buffer)
+
+    def makefile(self, mode="rb", buffering=-1):
+        return io.BufferedReader(socket.SocketIO(self, "rb"))
+
+    def _decref_socketios(self):
+        pass
+
+    def close(self):
+        self.sock.close()
+
+class ProxyCheck:
+    # every probe goes out over a hand-built connection so the proxy's own
+    # connect time can be told apart from the request it relays
+    def __init__(self, url=ECHO_URL, download=None, timeout=5.0, insecure=False):
+        self.url = urlsplit(url)
+        self.download = urlsplit(download) if download else None
+        if self.download and (self.download.scheme, self.download.netloc) != (self.url.scheme, self.url.netloc):
+            raise ValueError("the download URL must be on the same host as the echo URL")
+        self.timeout = timeout
+        # the target is always verified, otherwise an intercepting proxy
+        # would pass as working; --insecure only relaxes the proxy hop
+        self.context = ssl.create_default_context()
+        self.proxy_context = self.context
+        if insecure:
+            self.proxy_context = ssl.create_default_context()
+            self.proxy_context.check_hostname = False
+            self.proxy_context.verify_mode = ssl.CERT_NONE
+
+    def connect(self, proxy, result):
+        host = self.url.hostname
+        port = self.url.port or (443 if self.url.scheme == "https" else 80)
+        started = time.perf_counter()
+        sock = socket.create_connection((proxy.hostname, proxy.port or DEFAULT_PORTS[proxy.scheme]), timeout=self.timeout)
+        try:
+            if proxy.scheme == "https":
+                sock = self.proxy_context.wrap_socket(sock, server_hostname=proxy.hostname)
+            # plain HTTP through an HTTP proxy uses absolute-form requests;
+            # everything else gets a byte stream to the target first
+            forward = proxy.scheme in ("http", "https") and self.url.scheme == "http"
+            if proxy.scheme.startswith("socks5"):
+                socks5_handshake(sock, proxy, host, port)
+            elif proxy.scheme.startswith("socks4"):
+                socks4_handshake(sock, proxy, host, port)
+            elif not forward:
+                http_connect(sock, proxy, host, port)
+            if self.url.scheme == "https" and isinstance(sock, ssl.SSLSocket):
+                sock = NestedTLS(sock, self.context, host)
+            elif self.url.scheme == "https":
+                sock = self.context.wrap_socket(sock, server_hostname=host)
+            # up to a stream the request can be written to, tunnel included
+            result["connect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        except BaseException:
+            sock.close()
+            raise
+        conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        conn.sock = sock
+        headers = proxy_auth(proxy) if forward else {}
+        return conn, forward, headers
+
+    def fetch(self, conn, url, forward, headers):
+        target = url.geturl() if forward else (url.path or "/") + (f"?{url.query}" if url.query else "")
+        conn.request("GET", target, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        if response.status >= 400:
+            raise ProxyError(f"HTTP {response.status} {response.reason}")
+        return response, body
+
+    def check(self, text):
+        result = {"proxy": text, "ok": False, "checked": round(time.time(), 3)}
+        try:
+            proxy = parse_proxy(text)
+        except ValueError as e:
+            result["error"] = str(e)
+            return result
+        conn = None
+        try:
+            conn, forward, headers = self.connect(proxy, result)
+            started = time.perf_counter()
+            response, body = self.fetch(conn, self.url, forward, headers)
+            result["request_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["status"] = response.status
+            if "json" in response.headers.get("Content-Type", ""):
+                data = json.loads(body)
+                result["ip"] = data.get("origin") or data.get("ip") if isinstance(data, dict) else None
+            else:
+                result["text"] = body[:200].decode(errors="replace").strip()
+            if self.download:
+                started = time.perf_counter()
+                _, body = self.fetch(conn, self.download, forward, headers)
+                elapsed = time.perf_counter() - started
+                result["download_bytes"] = len(body)
+                result["download_kbps"] = round(len(body) / 1024 / elapsed, 1) if elapsed else None
+            result["ok"] = True
+        except (OSError, ProxyError, http.client.HTTPException, ValueError) as e:
+            result["error"] = str(e) or type(e).__name__
+        finally:
+            if conn:
+                conn.close()
+        return result
+
+def rank(results):
+    return sorted(results, key=lambda r: (not r["ok"], r.get("request_ms", 0) + r.get("connect_ms", 0),
+                                          -(r.get("download_kbps") or 0)))
+
+def save_results(path, results):
+    with open(path + ".tmp", "w") as f:
+        json.dump(results, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def render(results, elapsed=None):
+    ok = sum(1 for r in results if r["ok"])
+    title = f"Proxy check: {ok}/{len(results)} working" + (f" in {elapsed:.1f}s" if elapsed is not None else "")
+    table = Table(title=title)
+    table.add_column("#", justify="right")
+    table.add_column("Proxy", style="bold cyan")
+    table.add_column("Exit IP")
+    table.add_column("Connect ms", justify="right")
+    table.add_column("Request ms", justify="right")
+    table.add_column("KiB/s", justify="right")
+    table.add_column("Status")
+    for i, r in enumerate(results, 1):
+        if r["ok"]:
+            status = "[green]ok[/green]"
         else:
-            print("Non-JSON response received:")
-            print(r.text.strip())
-        print("Latency (ms):", round((end - start) * 1000, 2))
-    except Exception as e:
-        print("Proxy check failed:", e)
\ No newline at end of file
+            status = f"[red]{r.get('error', 'failed')}[/red]"
+        table.add_row(str(i), r["proxy"], r.get("ip") or "-",
+                      f"{r['connect_ms']:.1f}" if "connect_ms" in r else "-",
+                      f"{r['request_ms']:.1f}" if "request_ms" in r else "-",
+                      f"{r['download_kbps']:.0f}" if r.get("download_kbps") else "-", status)
+    return table
+
+def render_single(r):
+    if not r["ok"]:
+        print("Proxy check failed:", r["error"])
+        return
+    if "ip" in r:
+        print("Your IP via Proxy:", r["ip"])
+    else:
+        print("Non-JSON response received:")
+        print(r.get("text", ""))
+    print("Latency (ms):", round(r["connect_ms"] + r["request_ms"], 2), f"(connect {r['connect_ms']}, request {r['request_ms']})")
+
+def check_proxy(proxy_url, url=ECHO_URL, timeout=5.0, insecure=False):
+    return show(ProxyCheck(url, timeout=timeout, insecure=insecure).check(proxy_url), render_single)
+
+def check_proxies(file, url=ECHO_URL, download=None, concurrency=100, timeout=5.0, output=None, jsonl=False,
+                  insecure=False):
+    console = Console()
+    checker = ProxyCheck(url, download, timeout, insecure)
+    proxies = list(dict.fromkeys(iter_proxies(file)))
+    started = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for result in pool.map(checker.check, proxies):
+            results.append(result)
+            if jsonl:
+                emit(result)
+    results = rank(results)
+    if output:
+        save_results(output, results)
+    if not jsonl:
+        console.print(render(results, time.perf_counter() - started))
+    return results
+
+def watch_proxies(file, url=ECHO_URL, download=None, concurrency=100, timeout=5.0, output=None, interval=60.0,
+                  insecure=False):
+    # healthy proxies come round every interval; each consecutive failure
+    # doubles a proxy's wait, up to MAX_BACKOFF intervals
+    console = Console()
+    checker = ProxyCheck(url, download, timeout, insecure)
+    proxies = list(dict.fromkeys(iter_proxies(file)))
+    latest = {}
+    failures = dict.fromkeys(proxies, 0)
+    due = [(time.monotonic(), i) for i in range(len(proxies))]
+    heapq.heapify(due)
+    running = {}
+    next_save = 0.0
+    status(f"📡 Watching {len(proxies)} proxies every {interval:.0f}s (Ctrl+C to stop)")
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            while True:
+                now = time.monotonic()
+                while due and due[0][0] <= now and len(running) < concurrency * 4:
+                    _, i = heapq.heappop(due)
+                    running[pool.submit(checker.check, proxies[i])] = i
+                timeout_left = max(0.0, due[0][0] - now) if due else None
+                if not running:
+                    time.sleep(timeout_left or 1)
+                    continue
+                done, _ = wait(running, timeout=timeout_left, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    proxy = proxies[i]
+                    result = future.result()
+                    previous = latest.get(proxy)
+                    latest[proxy] = result
+                    if result["ok"]:
+                        failures[proxy] = 0
+                        wait_for = interval
+                    else:
+                        failures[proxy] += 1
+                        wait_for = interval * min(MAX_BACKOFF, 2 ** failures[proxy])
+                    heapq.heappush(due, (time.monotonic() + wait_for, i))
+                    if previous is None or previous["ok"] != result["ok"]:
+                        if structured():
+                            # state changes become event records
+                            emit({"event": "up" if result["ok"] else "down", "retry_in": wait_for, **result})
+                        elif result["ok"]:
+                            console.print(f"🟢 {proxy} up ({result['connect_ms'] + result['request_ms']:.0f} ms)")
+                        else:
+                            console.print(f"🔴 {proxy} down: {result['error']} (retry in {wait_for:.0f}s)")
+                if done and output and time.monotonic() >= next_save:
+                    save_results(output, rank(latest.values()))
+                    next_save = time.monotonic() + 1
+    except KeyboardInterrupt:
+        status("\n🛑 Proxy watch stopped.")
+    if latest and output:
+        save_results(output, rank(latest.values()))
+    if latest and not structured():
+        console.print(render(rank(latest.values())))
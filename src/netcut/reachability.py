@@ -1,11 +1,116 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from netcut.history import HistoryStore
+from netcut.output import emit
 
-def check_reachability(file):
+def iter_targets(file):
     with open(file) as f:
-        targets = [line.strip() for line in f if line.strip()]
-    for target in targets:
-        try:
-            r = requests.get(target, timeout=3)
-            print(f"{target} ✅ {r.status_code} {r.elapsed.total_seconds():.2f}s")
-        except Exception as e:
-            print(f"{target} ❌ {e}")
\ No newline at end of file
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+class SharedSession(requests.Session):
+    # callers close their session with a with block; a shared one has to
+    # outlive them, so only whoever shared it closes it
+    def __exit__(self, *exc):
+        pass
+
+# set by `netcut batch`: every job in the process then draws from the same
+# keep-alive pools instead of opening its own
+shared = None
+
+def make_session(per_host, hosts=256, cls=requests.Session):
+    if shared is not None:
+        return shared
+    session = cls()
+    # one keep-alive pool per host, sized to the per-host limit so every
+    # in-flight request to a host can reuse a warm connection
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=per_host, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch(session, target, timeout):
+    try:
+        r = session.get(target, timeout=timeout)
+        return {"url": target, "ok": True, "status": r.status_code,
+                "elapsed": round(r.elapsed.total_seconds(), 3)}
+    except Exception as e:
+        return {"url": target, "ok": False, "error": str(e)}
+
+def report(result, jsonl):
+    if jsonl:
+        emit(result)
+    elif result["ok"]:
+        print(f"{result['url']} ✅ {result['status']} {result['elapsed']:.2f}s", flush=True)
+    else:
+        print(f"{result['url']} ❌ {result['error']}", flush=True)
+
+def check_reachability(file, concurrency=16, per_host=4, jsonl=False, timeout=3, record=False):
+    concurrency = max(1, concurrency)
+    per_host = max(1, per_host)
+    targets = iter_targets(file)
+    session = make_session(per_host)
+    pending = {}
+    host_load = {}
+    deferred = {}
+    ready = deque()
+    backlog = 0
+    exhausted = False
+    store = HistoryStore() if record else None
+
+    def next_target():
+        nonlocal exhausted, backlog
+        if ready:
+            return ready.popleft()
+        # only a bounded window of the file is ever held in memory
+        while not exhausted and backlog < concurrency * 16:
+            target = next(targets, None)
+            if target is None:
+                exhausted = True
+                return None
+            host = urlsplit(target).netloc
+            if host_load.get(host, 0) >= per_host:
+                deferred.setdefault(host, deque()).append(target)
+                backlog += 1
+                continue
+            return target
+        return None
+
+    with session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            while len(pending) < concurrency:
+                target = next_target()
+                if target is None:
+                    break
+                host = urlsplit(target).netloc
+                host_load[host] = host_load.get(host, 0) + 1
+                pending[pool.submit(fetch, session, target, timeout)] = host
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                host = pending.pop(future)
+                host_load[host] -= 1
+                if not host_load[host]:
+                    del host_load[host]
+                waiting = deferred.get(host)
+                if waiting:
+                    ready.append(waiting.popleft())
+                    backlog -= 1
+                    if not waiting:
+                        del deferred[host]
+                result = future.result()
+                report(result, jsonl)
+                if store:
+                    latency = result["elapsed"] * 1000 if result["ok"] else None
+                    store.append(f"http:{result['url']}", time.time(), result["ok"], latency)
+    if store:
+        store.close()
@@ -0,0 +1,378 @@
+import asyncio
+import ipaddress
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+import dns.asyncquery
+import dns.exception
+import dns.message
+import dns.resolver
+
+RDTYPES = {"A": 1, "AAAA": 28, "TXT": 16}
+HEADER = struct.Struct("!HHHHHH")
+RR = struct.Struct("!HHIH")
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+# answers that carry no records are cached this long; we do not parse the
+# SOA just to get the exact negative TTL
+NEGATIVE_TTL = 60
+MAX_TTL = 86400
+CACHE_SIZE = 65536
+HOSTS_FILE = "/etc/hosts"
+
+class DNSError(Exception):
+    pass
+
+def system_config():
+    # (nameservers, search domains, ndots) from resolv.conf
+    try:
+        config = dns.resolver.Resolver()
+    except dns.resolver.NoResolverConfiguration:
+        return [], [], 1
+    return config.nameservers, [str(name).rstrip(".") for name in config.search], config.ndots or 1
+
+def system_nameservers():
+    return system_config()[0]
+
+hosts_cache = (None, {})
+
+def hosts_file():
+    # name -> addresses from /etc/hosts, re-read whenever the file changes
+    global hosts_cache
+    try:
+        mtime = os.stat(HOSTS_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    if hosts_cache[0] != mtime:
+        entries = {}
+        with open(HOSTS_FILE, errors="replace") as f:
+            for line in f:
+                fields = line.partition("#")[0].split()
+                try:
+                    addr = str(ipaddress.ip_address(fields[0]))
+                except (IndexError, ValueError):
+                    continue
+                for name in fields[1:]:
+                    addrs = entries.setdefault(name.lower().rstrip("."), [])
+                    if addr not in addrs:
+                        addrs.append(addr)
+        hosts_cache = (mtime, entries)
+    return hosts_cache[1]
+
+def system_addresses(host):
+    # getaddrinfo order without duplicates, [] when the name does not resolve
+    try:
+        infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        return []
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+def parse_server(server):
+    # "1.1.1.1", "127.0.0.1:5353", "[::1]:5353" or "::1"
+    if server.startswith("["):
+        host, _, port = server[1:].partition("]:")
+    elif server.count(":") == 1:
+        host, _, port = server.partition(":")
+    else:
+        host, port = server, ""
+    return host, int(port or 53)
+
+def encode_query(qid, name, rdtype):
+    labels = b"".join(bytes([len(part)]) + part for part in name.encode("idna").split(b".") if part)
+    return HEADER.pack(qid, 0x0100, 1, 0, 0, 0) + labels + b"\x00" + struct.pack("!HH", rdtype, 1)
+
+def skip_name(data, pos):
+    while True:
+        length = data[pos]
+        if length >= 0xC0:
+            return pos + 2
+        if not length:
+            return pos + 1
+        pos += length + 1
+
+def decode_answer(data, question_end, rdtype):
+    # returns (rcode, truncated, records, ttl); only the record type that was
+    # asked for is kept, CNAME hops in between are skipped
+    _, flags, _, ancount, _, _ = HEADER.unpack_from(data)
+    rcode = flags & 0x0F
+    if flags & 0x0200:
+        return rcode, True, [], 0
+    pos = question_end
+    records = []
+    ttl = MAX_TTL
+    for _ in range(ancount):
+        pos = skip_name(data, pos)
+        rtype, _, rttl, rdlen = RR.unpack_from(data, pos)
+        pos += RR.size
+        if rtype == rdtype:
+            rdata = data[pos:pos + rdlen]
+            if rtype == 1:
+                records.append(socket.inet_ntop(socket.AF_INET, rdata))
+            elif rtype == 28:
+                records.append(socket.inet_ntop(socket.AF_INET6, rdata))
+            else:
+                parts, i = [], 0
+                while i < len(rdata):
+                    parts.append(rdata[i + 1:i + 1 + rdata[i]].decode(errors="replace"))
+                    i += 1 + rdata[i]
+                records.append("".join(parts))
+            ttl = min(ttl, rttl)
+        pos += rdlen
+    return rcode, False, records, ttl if records else NEGATIVE_TTL
+
+class Channel(asyncio.DatagramProtocol):
+    # one UDP socket per nameserver and event loop, shared by every query to
+    # that server; replies are matched back by query id and question
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(data[0] << 8 | data[1])
+        if entry and not entry[1].done() and data[12:12 + len(entry[0])] == entry[0]:
+            entry[1].set_result(data)
+
+    def connection_lost(self, exc):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(DNSError("socket closed"))
+
+    async def exchange(self, wire, timeout):
+        qid = random.getrandbits(16)
+        while qid in self.pending:
+            qid = random.getrandbits(16)
+        wire = struct.pack("!H", qid) + wire[2:]
+        future = asyncio.get_running_loop().create_future()
+        self.pending[qid] = (wire[12:], future)
+        try:
+            self.transport.sendto(wire)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            del self.pending[qid]
+
+class Resolver:
+    def __init__(self, nameservers=None, timeout=3.0, attempts=2, timings=None):
+        # the resolv.conf search list only applies to the system nameservers
+        self.search, self.ndots = [], 1
+        if not nameservers:
+            nameservers, self.search, self.ndots = system_config()
+        self.nameservers = [parse_server(server) for server in nameservers]
+        if not self.nameservers:
+            raise DNSError("no nameservers configured")
+        self.timeout = timeout
+        self.attempts = attempts
+        # optional array that receives the round-trip time of every answer
+        # that came off the wire (cache hits and coalesced waits excluded)
+        self.timings = timings
+        self.cache = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.channels = {}
+        self.queries = 0
+        self.hits = 0
+        self.coalesced = 0
+
+    async def channel(self, server):
+        loop = asyncio.get_running_loop()
+        key = (loop, server)
+        channel = self.channels.get(key)
+        if channel is None or channel.transport.is_closing():
+            for stale in [k for k in self.channels if k[0].is_closed()]:
+                del self.channels[stale]
+            family = socket.AF_INET6 if ":" in server[0] else socket.AF_INET
+            _, created = await loop.create_datagram_endpoint(Channel, remote_addr=server, family=family)
+            channel = self.channels.get(key)
+            if channel is None or channel.transport.is_closing():
+                channel = self.channels[key] = created
+            else:
+                # another query opened one while we were waiting
+                created.transport.close()
+        return channel
+
+    async def query(self, name, rdtype):
+        qtype = RDTYPES[rdtype]
+        try:
+            wire = encode_query(0, name, qtype)
+        except UnicodeError as e:
+            raise DNSError(f"{name}: {e}") from None
+        error = None
+        for _ in range(self.attempts):
+            for server in self.nameservers:
+                started = time.perf_counter()
+                try:
+                    channel = await self.channel(server)
+                    data = await channel.exchange(wire, self.timeout / self.attempts)
+                    rcode, truncated, records, ttl = decode_answer(data, len(wire), qtype)
+                    if truncated:
+                        response = await dns.asyncquery.tcp(dns.message.make_query(name, rdtype), server[0],
+                                                            timeout=self.timeout, port=server[1])
+                        records = [rr.to_text().strip('"') for rrset in response.answer if rrset.rdtype == qtype for rr in rrset]
+                        rcode = response.rcode()
+                        ttl = min((rrset.ttl for rrset in response.answer), default=NEGATIVE_TTL)
+                except (asyncio.TimeoutError, OSError, DNSError, dns.exception.DNSException) as e:
+                    error = str(e) or "timeout"
+                    continue
+                except (struct.error, IndexError, ValueError, EOFError) as e:
+                    # short or garbled reply; try the next server
+                    error = f"malformed reply ({e})"
+                    continue
+                if self.timings is not None:
+                    self.timings.append(time.perf_counter() - started)
+                if rcode == 0 or rcode == 3:
+                    return rcode, records, ttl
+                error = RCODES.get(rcode, f"rcode {rcode}")
+        raise DNSError(f"{name}: {error or 'timeout'}")
+
+    def close(self):
+        # drops the sockets opened on the running loop
+        loop = asyncio.get_running_loop()
+        for key in [k for k in self.channels if k[0] is loop]:
+            self.channels.pop(key).transport.close()
+
+    async def lookup(self, name, rdtype="A"):
+        # returns (rcode, records); NXDOMAIN and empty answers are cached for
+        # NEGATIVE_TTL, failures are not cached at all
+        key = (name.lower().rstrip("."), rdtype)
+        hit = self.cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            self.hits += 1
+            return hit[1]
+        with self.lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+        if not owner:
+            # concurrent lookups of one name share the first query; the
+            # future is thread-safe so callers on other loops can wait too
+            self.coalesced += 1
+            return await asyncio.wrap_future(future)
+        self.queries += 1
+        try:
+            rcode, records, ttl = await self.query(key[0], rdtype)
+            result = (rcode, records)
+            cache = self.cache
+            if len(cache) >= CACHE_SIZE:
+                # oldest insertion first, close enough to LRU for a DNS cache
+                del cache[next(iter(cache))]
+            cache[key] = (time.monotonic() + ttl, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+    async def resolve(self, name, rdtype="A"):
+        return (await self.lookup(name, rdtype))[1]
+
+    def candidates(self, name):
+        # resolv.conf semantics: names with fewer than ndots dots are tried
+        # with each search domain first, the rest as given first
+        if name.endswith("."):
+            return [name.rstrip(".")]
+        expanded = [f"{name}.{domain}" for domain in self.search]
+        if name.count(".") >= self.ndots:
+            return [name] + expanded
+        # a bare single label almost never exists in public DNS
+        return expanded + ([name] if "." in name else [])
+
+    async def addresses(self, name):
+        v4, v6 = await asyncio.gather(self.resolve(name, "A"), self.resolve(name, "AAAA"), return_exceptions=True)
+        addrs = [addr for result in (v4, v6) if isinstance(result, list) for addr in result]
+        if not addrs and isinstance(v4, Exception):
+            raise v4
+        return addrs
+
+shared = None
+
+def get_resolver():
+    global shared
+    if shared is None:
+        shared = Resolver()
+    return shared
+
+def system_resolver():
+    # None without any usable resolv.conf; callers then go to getaddrinfo
+    try:
+        return get_resolver()
+    except DNSError:
+        return None
+
+def run_sync(coro, resolver):
+    async def main():
+        try:
+            return await coro
+        finally:
+            if resolver:
+                resolver.close()
+    return asyncio.run(main())
+
+async def host_addresses(resolver, host):
+    # literal, then /etc/hosts, then DNS along the search list; [] when none
+    # of them knows the name
+    try:
+        return [str(ipaddress.ip_address(host))]
+    except ValueError:
+        pass
+    addrs = hosts_file().get(host.lower().rstrip("."))
+    if addrs or resolver is None:
+        return list(addrs or [])
+    for name in resolver.candidates(host):
+        try:
+            addrs = await resolver.addresses(name)
+        except DNSError:
+            continue
+        if addrs:
+            return addrs
+    return []
+
+def prefer_v4(addrs):
+    return [addr for addr in addrs if ":" not in addr] + [addr for addr in addrs if ":" in addr]
+
+def resolve_all(host):
+    # blocking drop-in for socket.gethostbyname(s) that goes through the
+    # shared cache; anything it cannot answer is left to the system resolver
+    try:
+        return [str(ipaddress.ip_address(host))]
+    except ValueError:
+        pass
+    resolver = system_resolver()
+    addrs = run_sync(host_addresses(resolver, host), resolver) or system_addresses(host)
+    if not addrs:
+        raise socket.gaierror(socket.EAI_NONAME, f"{host}: name does not resolve")
+    return addrs
+
+def resolve_host(host):
+    return prefer_v4(resolve_all(host))[0]
+
+def resolve_many(hosts, concurrency=64):
+    # first address of every host, IPv4 preferred, None if it does not
+    # resolve; literals pass straight through
+    resolver = system_resolver()
+
+    async def run():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one(host):
+            async with limit:
+                return (prefer_v4(await host_addresses(resolver, host)) or [None])[0]
+        return await asyncio.gather(*(one(host) for host in hosts))
+
+    results = run_sync(run(), resolver)
+    for i, ip in enumerate(results):
+        if ip is None:
+            results[i] = (prefer_v4(system_addresses(hosts[i])) or [None])[0]
+    return results
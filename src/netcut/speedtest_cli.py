@@ -1,12 +1,113 @@
-import speedtest as speedtest_module
+from dataclasses import dataclass
+
+from netcut.linktest import PORT, Server, run_test
+from netcut.output import show, status
+
+@dataclass(slots=True)
+class SpeedResult:
+    download_mbps: float | None = None
+    upload_mbps: float | None = None
+    ping_ms: float | None = None
+    server: str | None = None
+    error: str | None = None
+
+def measure():
+    # speedtest-cli is only needed against speedtest.net, not between two
+    # netcut endpoints
+    import speedtest as speedtest_module
+    result = SpeedResult()
+    try:
+        st = speedtest_module.Speedtest()
+        status("🧪 Testing download speed...")
+        result.download_mbps = round(st.download() / 1_000_000, 2)
+        status("🧪 Testing upload speed...")
+        result.upload_mbps = round(st.upload() / 1_000_000, 2)
+    except Exception as e:
+        result.error = str(e)
+        return result
+    result.ping_ms = st.results.ping
+    server = st.results.server or {}
+    result.server = server.get("host")
+    return result
+
+def render(result):
+    if result.error:
+        print(f"❌ Speedtest failed: {result.error}")
+        return
+    print(f"⬇️ Download: {result.download_mbps:.2f} Mbps")
+    print(f"⬆️ Upload: {result.upload_mbps:.2f} Mbps")
+    print(f"📡 Ping: {result.ping_ms} ms")
 
 def run_speedtest():
-    st = speedtest_module.Speedtest()
-    print("🧪 Testing download speed...")
-    download = st.download() / 1_000_000
-    print("🧪 Testing upload speed...")
-    upload = st.upload() / 1_000_000
-    ping = st.results.ping
-    print(f"⬇️ Download: {download:.2f} Mbps")
-    print(f"⬆️ Upload: {upload:.2f} Mbps")
-    print(f"📡 Ping: {ping} ms")
\ No newline at end of file
+    return show(measure(), render)
+
+@dataclass(slots=True)
+class LinkReport:
+    type: str
+    start: float
+    end: float
+    bytes: int
+    mbps: float
+    latency_ms: float | None = None
+    latency_max_ms: float | None = None
+    idle_latency_ms: float | None = None
+    jitter_ms: float | None = None
+    lost: int | None = None
+    packets: int | None = None
+
+def link_report(kind, data, udp):
+    seconds = data["end"] - data["start"]
+    return LinkReport(kind, data["start"], data["end"], data["bytes"],
+                      round(data["bytes"] * 8 / seconds / 1_000_000, 2) if seconds > 0 else 0.0,
+                      data.get("latency_ms"), data.get("latency_max_ms"), data.get("idle_latency_ms"),
+                      data["jitter_ms"] if udp else None, data["lost"] if udp else None,
+                      data["packets"] if udp else None)
+
+def render_report(report):
+    line = f"[{report.start:6.1f}-{report.end:6.1f} s] {report.bytes / 1_000_000:10.1f} MB {report.mbps:10.2f} Mbps"
+    if report.latency_ms is not None:
+        line += f"  latency {report.latency_ms:.2f} ms"
+    if report.packets is not None:
+        sent = report.packets + report.lost
+        line += f"  jitter {report.jitter_ms or 0:.3f} ms  lost {report.lost}/{sent}"
+        line += f" ({100 * report.lost / sent:.2f}%)" if sent else ""
+    if report.type == "summary":
+        print("-" * len(line))
+        line = line.replace("latency", "loaded latency")
+        if report.idle_latency_ms is not None:
+            line += f" (idle {report.idle_latency_ms:.2f} ms)"
+    print(line)
+
+def run_client(host, port=PORT, udp=False, reverse=False, streams=4, duration=10.0, interval=1.0, mbps=100.0,
+               length=None):
+    protocol = "udp" if udp else "tcp"
+    status(f"🚀 {protocol.upper()} {'download from' if reverse else 'upload to'} {host}:{port}, "
+           f"{streams} streams, {duration:g} s")
+    try:
+        result = run_test(host, port, protocol, reverse, streams, duration, interval, mbps, length,
+                          lambda data: show(link_report("interval", data, udp), render_report))
+    except (OSError, ValueError) as e:
+        status(f"❌ Speedtest failed: {e}")
+        return None
+    return show(link_report("summary", {**result, "start": 0.0, "end": result["seconds"]}, udp), render_report)
+
+def render_served(result):
+    if "error" in result:
+        print(f"❌ {result['client']}: {result['error']}")
+        return
+    mbps = result["bytes"] * 8 / result["seconds"] / 1_000_000 if result["seconds"] else 0.0
+    verb = "received from" if result["direction"] == "upload" else "sent to"
+    print(f"✅ {result['protocol'].upper()} {result['bytes'] / 1_000_000:.1f} MB {verb} {result['client']} "
+          f"over {result['streams']} streams in {result['seconds']:.1f} s: {mbps:.2f} Mbps")
+
+def serve_speedtest(bind="", port=PORT, once=False):
+    try:
+        server = Server(bind, port)
+    except OSError as e:
+        status(f"❌ Cannot listen on port {port}: {e}")
+        return
+    status(f"📡 Speedtest server listening on {bind or '*'}:{server.port} (TCP and UDP, Ctrl+C to stop)")
+    try:
+        server.serve(lambda result: show(result, render_served), once)
+    except KeyboardInterrupt:
+        status("\n🛑 Server stopped.")
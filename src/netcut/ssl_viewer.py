@@ -1,14 +1,281 @@
-import ssl
+import hashlib
 import socket
-from datetime import datetime
-
-def view_cert(host):
-    ctx = ssl.create_default_context()
-    with ctx.wrap_socket(socket.socket(), server_hostname=host) as s:
-        s.connect((host, 443))
-        cert = s.getpeercert()
-        print("Subject:", cert.get('subject'))
-        print("Issuer:", cert.get('issuer'))
-        print("Valid From:", cert.get('notBefore'))
-        print("Valid Until:", cert.get('notAfter'))
-        print("SANs:", [entry[1] for entry in cert.get('subjectAltName', [])])
\ No newline at end of file
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from rich.console import Console
+from rich.table import Table
+
+from netcut.cache import cache_path, load_json, save_json
+from netcut.output import emit, show
+
+CACHE_SIZE = 50000
+
+def parse_target(line, default_port=443):
+    # "host", "host:port", "[v6]:port", optionally followed by an SNI name
+    parts = line.split()
+    target, sni = parts[0], parts[1] if len(parts) > 1 else None
+    if target.startswith("["):
+        host, _, port = target[1:].partition("]")
+        port = port.lstrip(":")
+    elif target.count(":") == 1:
+        host, _, port = target.partition(":")
+    else:
+        host, port = target, ""
+    return host, int(port or default_port), sni
+
+def iter_targets(file, default_port=443):
+    with open(file) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield parse_target(line, default_port)
+
+# DER object identifiers, as encoded, for the attributes the report uses
+ATTRIBUTES = {b"\x55\x04\x03": "commonName", b"\x55\x04\x06": "countryName", b"\x55\x04\x07": "localityName",
+              b"\x55\x04\x08": "stateOrProvinceName", b"\x55\x04\x0a": "organizationName",
+              b"\x55\x04\x0b": "organizationalUnitName"}
+SUBJECT_ALT_NAME = b"\x55\x1d\x11"
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def peer_chain(sock):
+    # DER certificates as sent by the server, leaf first; the whole chain is
+    # only exposed from 3.13 on, older versions get the leaf alone
+    getter = getattr(sock, "get_unverified_chain", None)
+    if getter:
+        return list(getter() or [])
+    leaf = sock.getpeercert(binary_form=True)
+    return [leaf] if leaf else []
+
+def tlv(data, pos=0):
+    # (tag, value, next position) of one DER element
+    tag, length = data[pos], data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+    if pos + length > len(data):
+        raise ValueError("truncated element")
+    return tag, data[pos:pos + length], pos + length
+
+def elements(data):
+    pos = 0
+    while pos < len(data):
+        tag, value, pos = tlv(data, pos)
+        yield tag, value
+
+def text(tag, value):
+    if tag == 0x1E:
+        return value.decode("utf-16-be", "replace")
+    if tag == 0x1C:
+        return value.decode("utf-32-be", "replace")
+    return value.decode("utf-8" if tag == 0x0C else "latin-1", "replace")
+
+def name(data):
+    # RDNs as nested tuples, the same shape getpeercert() returns
+    rdns = []
+    for _, rdn in elements(data):
+        pairs = []
+        for _, attribute in elements(rdn):
+            (_, oid), (tag, value) = elements(attribute)
+            pairs.append((ATTRIBUTES.get(oid, oid.hex()), text(tag, value)))
+        rdns.append(tuple(pairs))
+    return tuple(rdns)
+
+def asn1_time(tag, value):
+    # UTCTime or GeneralizedTime to OpenSSL's "Jan  2 03:04:05 2030 GMT"
+    digits = value.decode()
+    if tag == 0x17:
+        year = int(digits[:2])
+        digits = str(1900 + year if year >= 50 else 2000 + year) + digits[2:]
+    year, month, day = int(digits[:4]), int(digits[4:6]), int(digits[6:8])
+    return f"{MONTHS[month - 1]} {day:2d} {digits[8:10]}:{digits[10:12]}:{digits[12:14]} {year} GMT"
+
+def decode_der(der):
+    # the fields summarize() needs, read straight from the DER; raises
+    # ValueError on anything that is not a well-formed certificate
+    try:
+        tbs = list(elements(tlv(tlv(der)[1])[1]))
+        if tbs[0][0] == 0xA0:
+            tbs = tbs[1:]
+        serial, issuer, validity, subject = tbs[0][1], tbs[2][1], tbs[3][1], tbs[4][1]
+        not_before, not_after = elements(validity)
+        info = {"subject": name(subject), "issuer": name(issuer),
+                "serialNumber": (serial.lstrip(b"\x00") or b"\x00").hex().upper(),
+                "notBefore": asn1_time(*not_before), "notAfter": asn1_time(*not_after)}
+        for tag, value in tbs[5:]:
+            if tag != 0xA3:
+                continue
+            for _, extension in elements(tlv(value)[1]):
+                fields = list(elements(extension))
+                if fields[0][1] != SUBJECT_ALT_NAME:
+                    continue
+                sans = []
+                for kind, value in elements(tlv(fields[-1][1])[1]):
+                    if kind == 0x82:
+                        sans.append(("DNS", value.decode("latin-1")))
+                    elif kind == 0x87:
+                        family = socket.AF_INET if len(value) == 4 else socket.AF_INET6
+                        sans.append(("IP Address", socket.inet_ntop(family, value)))
+                info["subjectAltName"] = tuple(sans)
+        return info
+    except (IndexError, ValueError, UnicodeError, OSError) as e:
+        raise ValueError(f"unparseable certificate: {e}") from None
+
+def name_of(rdns):
+    fields = dict(pair for rdn in rdns or () for pair in rdn)
+    return fields.get("commonName") or fields.get("organizationName") or "-"
+
+def summarize(info):
+    return {"subject": name_of(info.get("subject")), "issuer": name_of(info.get("issuer")),
+            "not_before": info.get("notBefore"), "not_after": info.get("notAfter"),
+            "serial": info.get("serialNumber"),
+            "sans": [value for kind, value in info.get("subjectAltName", ()) if kind == "DNS"]}
+
+class CertCache:
+    # parsed certificate fields keyed by SHA-256 fingerprint; renewals get a
+    # new fingerprint, so entries never go stale, only old
+    def __init__(self):
+        self.path = cache_path("certs.json")
+        self.entries = load_json(self.path, {})
+        self.dirty = False
+        self.hits = 0
+
+    def parse(self, der):
+        fingerprint = hashlib.sha256(der).hexdigest()
+        cert = self.entries.get(fingerprint)
+        if cert is not None:
+            self.hits += 1
+            return fingerprint, cert
+        cert = self.entries[fingerprint] = summarize(decode_der(der))
+        self.dirty = True
+        return fingerprint, cert
+
+    def save(self):
+        if not self.dirty:
+            return
+        entries = self.entries
+        if len(entries) > CACHE_SIZE:
+            entries = dict(list(entries.items())[-CACHE_SIZE:])
+        save_json(self.path, entries)
+
+def handshake(host, port, sni, context, timeout):
+    started = time.perf_counter()
+    with socket.create_connection((host, port), timeout=timeout) as raw:
+        connected = time.perf_counter()
+        with context.wrap_socket(raw, server_hostname=sni) as sock:
+            done = time.perf_counter()
+            return (connected - started) * 1000, (done - connected) * 1000, sock.version(), peer_chain(sock)
+
+def inspect(host, port, sni, timeout, cache, verifying, permissive):
+    # try a verifying handshake first so the verdict comes for free; only
+    # certificates that fail verification pay for a second handshake
+    sni = sni or host
+    result = {"host": host, "port": port, "sni": sni}
+    try:
+        try:
+            connect_ms, tls_ms, version, chain = handshake(host, port, sni, verifying, timeout)
+            result["verified"] = True
+        except ssl.SSLCertVerificationError as e:
+            result["verified"] = False
+            result["verify_error"] = e.verify_message or str(e)
+            connect_ms, tls_ms, version, chain = handshake(host, port, sni, permissive, timeout)
+    except (OSError, ssl.SSLError) as e:
+        result["error"] = str(e) or type(e).__name__
+        return result
+    result.update(connect_ms=round(connect_ms, 1), handshake_ms=round(tls_ms, 1), tls=version, chain=[])
+    try:
+        for der in chain:
+            fingerprint, cert = cache.parse(der)
+            result["chain"].append({"sha256": fingerprint, **cert})
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+    if result["chain"]:
+        expires = ssl.cert_time_to_seconds(result["chain"][0]["not_after"])
+        result["days_left"] = int((expires - time.time()) // 86400)
+    return result
+
+def make_contexts():
+    verifying = ssl.create_default_context()
+    permissive = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    permissive.check_hostname = False
+    permissive.verify_mode = ssl.CERT_NONE
+    return verifying, permissive
+
+def expiry_report(results, console):
+    table = Table(title=f"TLS certificates ({len(results)} endpoints) by expiry")
+    table.add_column("Endpoint", style="bold cyan")
+    table.add_column("Subject")
+    table.add_column("Issuer")
+    table.add_column("Expires")
+    table.add_column("Days Left", justify="right")
+    table.add_column("Status")
+    table.add_column("Handshake ms", justify="right")
+    table.add_column("Chain", justify="right")
+    ordered = sorted(results, key=lambda r: (r.get("days_left") is None, r.get("days_left", 0)))
+    for r in ordered:
+        endpoint = f"{r['host']}:{r['port']}" + (f" ({r['sni']})" if r["sni"] != r["host"] else "")
+        if "error" in r:
+            table.add_row(endpoint, "-", "-", "-", "-", f"[red]{r['error']}[/red]", "-", "-")
+            continue
+        leaf = r["chain"][0] if r["chain"] else {}
+        days = r.get("days_left")
+        color = "red" if days is None or days < 0 else "yellow" if days < 30 else "green"
+        expires = datetime.fromtimestamp(ssl.cert_time_to_seconds(leaf["not_after"]), timezone.utc).strftime("%Y-%m-%d") if leaf else "-"
+        status = "[green]valid[/green]" if r["verified"] else f"[red]{r['verify_error']}[/red]"
+        table.add_row(endpoint, leaf.get("subject", "-"), leaf.get("issuer", "-"), expires,
+                      f"[{color}]{'-' if days is None else days}[/{color}]", status,
+                      f"{r['handshake_ms']:.1f}", str(len(r["chain"])))
+    console.print(table)
+
+def render_cert(r):
+    endpoint = f"{r['host']}:{r['port']}"
+    if "error" in r:
+        print(f"❌ {endpoint}: {r['error']}")
+        return
+    if not r["chain"]:
+        print(f"❌ {endpoint}: no certificate presented")
+        return
+    leaf = r["chain"][0]
+    print("Subject:", leaf["subject"])
+    print("Issuer:", leaf["issuer"])
+    print("Valid From:", leaf["not_before"])
+    print("Valid Until:", leaf["not_after"], f"({r['days_left']} days left)")
+    print("SANs:", leaf["sans"])
+    print("Verified:", "yes" if r["verified"] else f"no ({r['verify_error']})")
+    print(f"Handshake: {r['tls']}, connect {r['connect_ms']} ms, TLS {r['handshake_ms']} ms")
+    print("Chain:")
+    for cert in r["chain"]:
+        print(f"  • {cert['subject']} (issued by {cert['issuer']}, until {cert['not_after']}) sha256:{cert['sha256'][:16]}")
+
+def view_cert(host, port=443, sni=None, timeout=5.0):
+    verifying, permissive = make_contexts()
+    cache = CertCache()
+    r = inspect(host, port, sni, timeout, cache, verifying, permissive)
+    cache.save()
+    return show(r, render_cert)
+
+def inventory(file, port=443, concurrency=64, timeout=5.0, jsonl=False):
+    console = Console()
+    verifying, permissive = make_contexts()
+    cache = CertCache()
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(inspect, host, p, sni, timeout, cache, verifying, permissive)
+                   for host, p, sni in iter_targets(file, port)]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            if jsonl:
+                emit(result)
+    cache.save()
+    if not jsonl:
+        expiry_report(results, console)
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r in results if "error" in r)
+        console.print(f"⏱️ {len(results)} endpoints in {elapsed:.1f}s, {failed} failed, {cache.hits} certificates from cache")
@@ -1,8 +1,16 @@
 from rich.table import Table
 from rich.console import Console
-import psutil
+import time
+from netcut import output
+from netcut.history import HistoryStore, parse_duration
+from netcut.ifaces import snapshot
 
-def display_stats():
+def display_stats(as_json=False):
+    interfaces = snapshot()
+    if as_json:
+        for iface in interfaces.values():
+            output.emit(iface)
+        return
     console = Console()
     table = Table(title="Current Network Interface Stats")
 
@@ -14,22 +22,63 @@ def display_stats():
     table.add_column("Packets Sent", style="bold blue")
     table.add_column("Packets Recv", style="bold blue")
 
-    net_addrs = psutil.net_if_addrs()
-    net_io = psutil.net_io_counters(pernic=True)
-
-    for iface, addrs in net_addrs.items():
-        ip = "-"
-        mac = "-"
-        for addr in addrs:
-            if addr.family.name == "AF_INET":
-                ip = addr.address
-            elif addr.family.name == "AF_LINK":
-                mac = addr.address
-
-        stats = net_io.get(iface)
-        if stats:
-            rx = f"{stats.bytes_recv / (1024**2):.2f}"
-            tx = f"{stats.bytes_sent / (1024**2):.2f}"
-            table.add_row(iface, ip, mac, rx, tx, str(stats.packets_sent), str(stats.packets_recv))
-
-    console.print(table)
\ No newline at end of file
+    for iface in interfaces.values():
+        if iface.bytes_recv is not None:
+            rx = f"{iface.bytes_recv / (1024**2):.2f}"
+            tx = f"{iface.bytes_sent / (1024**2):.2f}"
+            table.add_row(iface.name, iface.ip or "-", iface.mac or "-", rx, tx, str(iface.packets_sent), str(iface.packets_recv))
+
+    console.print(table)
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s"
+
+def history_records(store, start=None, names=None):
+    records = []
+    for name in names or store.names():
+        summary = store.get(name).summary(start)
+        if not summary.count:
+            continue
+        records.append({"service": name, "samples": summary.count, "uptime": round(summary.uptime(), 3),
+                        "longest_downtime": summary.longest_downtime(), "mean": summary.mean(),
+                        "p50": summary.percentile(50), "p95": summary.percentile(95), "p99": summary.percentile(99)})
+    return records
+
+def render_history(records, since=None):
+    console = Console()
+    if not records:
+        console.print("[bold red]⚠️ No recorded history found. Run `netcut monitor` or use --record.[/bold red]")
+        return
+    table = Table(title="Service History" + (f" (last {since})" if since else ""))
+
+    table.add_column("Service", style="bold cyan")
+    table.add_column("Samples", justify="right")
+    table.add_column("Uptime %", style="bold green", justify="right")
+    table.add_column("Longest Downtime", style="bold red", justify="right")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("p99", justify="right")
+
+    def ms(value):
+        return "-" if value is None else f"{value:.1f}"
+
+    for r in records:
+        table.add_row(r["service"], str(r["samples"]), f"{r['uptime']:.3f}", format_duration(r["longest_downtime"]),
+                      ms(r["mean"]), ms(r["p50"]), ms(r["p95"]), ms(r["p99"]))
+    console.print(table)
+
+def display_history(since=None, names=None, store_dir=None):
+    store = HistoryStore(store_dir)
+    start = time.time() - parse_duration(since) if since else None
+    return output.show_all(history_records(store, start, names), lambda records: render_history(records, since))
@@ -1,9 +1,63 @@
-def generate_status_page(services):
-    html = "<html><head><title>Status Page</title></head><body><h1>Service Status</h1><ul>"
-    for service in services:
-        html += f"<li>{service['name']}: <b style='color: {'green' if service['up'] else 'red'}'>{'Up' if service['up'] else 'Down'}</b></li>"
-    html += "</ul></body></html>"
-
-    with open("status.html", "w") as f:
-        f.write(html)
-    print("Generated status.html")
\ No newline at end of file
+import html
+import os
+
+from netcut.history import HistoryStore
+from netcut.output import emit, status, structured
+
+HEAD = "<html><head><title>Status Page</title></head><body><h1>Service Status</h1><ul>"
+TAIL = "</ul></body></html>"
+
+def render_row(service):
+    up = service["up"]
+    row = f"<li>{html.escape(service['name'])}: <b style='color: {'green' if up else 'red'}'>{'Up' if up else 'Down'}</b>"
+    if service.get("latency") is not None:
+        row += f" {service['latency']:.1f} ms"
+    if service.get("uptime") is not None:
+        row += f" &middot; {service['uptime']:.2f}% uptime"
+    return row + "</li>"
+
+def write_page(path, rows):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(HEAD)
+        f.writelines(rows)
+        f.write(TAIL)
+    os.replace(tmp, path)
+
+def services_from_history(store=None):
+    store = store or HistoryStore()
+    services = []
+    for name in store.names():
+        latest = store.get(name).latest()
+        if latest:
+            ts, up, latency = latest
+            services.append({"name": name, "up": up, "latency": latency})
+    return services
+
+def generate_status_page(services=None, path="status.html"):
+    if services is None:
+        services = services_from_history()
+    write_page(path, [render_row(service) for service in services])
+    status(f"Generated {path}")
+    if structured():
+        for service in services:
+            emit(service)
+
+class StatusPage:
+    def __init__(self, path="status.html"):
+        self.path = path
+        self.rows = {}
+        self.dirty = False
+
+    def update(self, service):
+        # rows are cached as rendered fragments; only a changed row is
+        # re-rendered and the file is only rewritten when something changed
+        row = render_row(service)
+        if self.rows.get(service["name"]) != row:
+            self.rows[service["name"]] = row
+            self.dirty = True
+
+    def flush(self):
+        if self.dirty:
+            write_page(self.path, self.rows.values())
+            self.dirty = False
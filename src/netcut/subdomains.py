@@ -1,26 +1,113 @@
+import asyncio
+import time
+
 import requests
 
-def enumerate_subdomains(domain):
-    found = set()
-    print(f"🔍 Searching CertSpotter for SSL-certified subdomains of {domain}...")
+from netcut.cache import cache_path, load_json, save_json
+from netcut.output import emit, status, structured
+from netcut.resolver import Resolver, DNSError
 
-    try:
-        url = f"https://api.certspotter.com/v1/issuances?domain={domain}&include_subdomains=true&expand=dns_names"
-        response = requests.get(url, timeout=10)
+CT_URL = "https://api.certspotter.com/v1/issuances"
+
+def in_scope(name, domain):
+    return name == domain or name.endswith("." + domain)
+
+def fetch_pages(session, url, domain, after=None):
+    # issuances come back in id order, so `after` resumes right past the
+    # newest one a previous run saw
+    params = {"domain": domain, "include_subdomains": "true", "expand": "dns_names"}
+    while True:
+        if after:
+            params["after"] = after
+        for _ in range(5):
+            response = session.get(url, params=params, timeout=10)
+            if response.status_code != 429:
+                break
+            time.sleep(min(float(response.headers.get("Retry-After", 5)), 60))
         response.raise_for_status()
+        page = response.json()
+        if not page:
+            return
+        after = page[-1]["id"]
+        yield after, page
 
-        data = response.json()
-        for entry in data:
-            for name in entry.get("dns_names", []):
-                if name.endswith(domain):
-                    found.add(name.strip())
+async def collect(domain, url, resolver, concurrency, refresh):
+    path = cache_path("certspotter", f"{domain}.json")
+    cached = {} if refresh else load_json(path, {})
+    names = set(cached.get("names", []))
+    after = cached.get("after")
+    known = len(names)
+    live = {}
+    queue = asyncio.Queue(concurrency * 4)
+    if names:
+        status(f"📦 {known} names cached, fetching issuances after {after}")
 
-    except Exception as e:
-        print(f"⚠️ CertSpotter lookup failed: {e}")
+    async def worker():
+        while (name := await queue.get()) is not None:
+            try:
+                addrs = await resolver.addresses(name)
+            except DNSError:
+                continue
+            if addrs:
+                live[name] = addrs
+                if structured():
+                    emit({"name": name, "addresses": addrs})
+                else:
+                    print(f"  • {name} → {', '.join(addrs)}", flush=True)
 
-    if found:
-        print(f"\n✅ Found {len(found)} subdomains with SSL certificates:")
-        for sub in sorted(found):
-            print(f"  • {sub}")
+    async def feed(batch):
+        # wildcard names have nothing to resolve
+        for name in batch:
+            if not name.startswith("*."):
+                await queue.put(name)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)] if resolver else []
+    if resolver:
+        # cached names are resolved again, liveness is not cached
+        await feed(sorted(names))
+    session = requests.Session()
+    pages = fetch_pages(session, url, domain, after)
+    fetched = 0
+    try:
+        while (item := await asyncio.to_thread(next, pages, None)) is not None:
+            after, page = item
+            fetched += 1
+            batch = []
+            for entry in page:
+                for name in entry.get("dns_names", []):
+                    name = name.strip().lower()
+                    if in_scope(name, domain) and name not in names:
+                        names.add(name)
+                        batch.append(name)
+            if resolver:
+                await feed(batch)
+    except (requests.RequestException, ValueError) as e:
+        status(f"⚠️ CertSpotter lookup failed: {e}")
+    finally:
+        session.close()
+        save_json(path, {"after": after, "names": sorted(names)})
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+    if resolver:
+        resolver.close()
+    return names, len(names) - known, fetched, live
+
+def enumerate_subdomains(domain, resolve=True, concurrency=100, nameserver=None, refresh=False, url=CT_URL):
+    domain = domain.strip().lower().rstrip(".")
+    status(f"🔍 Searching CertSpotter for SSL-certified subdomains of {domain}...")
+    resolver = Resolver([nameserver] if nameserver else None) if resolve else None
+    found, new, pages, live = asyncio.run(collect(domain, url, resolver, max(1, concurrency), refresh))
+
+    if not found:
+        status("❌ No SSL-certified subdomains found.")
+    elif resolve:
+        status(f"\n✅ Found {len(found)} subdomains with SSL certificates ({new} new from {pages} pages), {len(live)} live.")
     else:
-        print("❌ No SSL-certified subdomains found.")
\ No newline at end of file
+        status(f"\n✅ Found {len(found)} subdomains with SSL certificates ({new} new from {pages} pages):")
+        for sub in sorted(found):
+            if structured():
+                emit({"name": sub, "addresses": None})
+            else:
+                print(f"  • {sub}")
+    return live if resolve else sorted(found)
@@ -1,16 +1,348 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from bs4 import BeautifulSoup
+from rich.console import Console
+from rich.table import Table
+
+from netcut.output import emit
+from netcut.reachability import iter_targets, make_session
+
+VERSION = r"(?P<v>\d+(?:\.\d+)+)"
+CHUNK = 16384
+# a match can straddle two chunks, so each scan starts this far back
+OVERLAP = 512
+MAX_BYTES = 256 * 1024
+
+# name: category plus any of headers {name: regex}, cookies [regex],
+# meta {name: regex}, scripts [regex on src], html [regex], implies [names].
+# A VERSION group in a pattern is reported as the version
+SIGNATURES = {
+    "nginx": {"category": "Web server", "headers": {"server": rf"nginx(?:/{VERSION})?"}},
+    "Apache": {"category": "Web server", "headers": {"server": rf"apache(?:/{VERSION})?"}},
+    "Microsoft IIS": {"category": "Web server", "headers": {"server": rf"microsoft-iis(?:/{VERSION})?"}},
+    "LiteSpeed": {"category": "Web server", "headers": {"server": r"litespeed"}},
+    "Caddy": {"category": "Web server", "headers": {"server": r"caddy"}},
+    "OpenResty": {"category": "Web server", "headers": {"server": rf"openresty(?:/{VERSION})?"}, "implies": ["nginx"]},
+    "Gunicorn": {"category": "Web server", "headers": {"server": rf"gunicorn(?:/{VERSION})?"}, "implies": ["Python"]},
+    "Cloudflare": {"category": "CDN", "headers": {"server": r"cloudflare", "cf-ray": r""}, "cookies": [r"__cf_bm", r"__cfduid"]},
+    "Fastly": {"category": "CDN", "headers": {"x-served-by": r"cache-", "fastly-debug-digest": r""}},
+    "Akamai": {"category": "CDN", "headers": {"x-akamai-transformed": r"", "server": r"akamaighost"}},
+    "Amazon CloudFront": {"category": "CDN", "headers": {"x-amz-cf-id": r"", "via": r"cloudfront"}},
+    "Varnish": {"category": "Cache", "headers": {"via": r"varnish", "x-varnish": r""}},
+    "Vercel": {"category": "PaaS", "headers": {"server": r"vercel", "x-vercel-id": r""}},
+    "Netlify": {"category": "PaaS", "headers": {"server": r"netlify", "x-nf-request-id": r""}},
+    "PHP": {"category": "Language", "headers": {"x-powered-by": rf"php(?:/{VERSION})?"}, "cookies": [r"PHPSESSID"]},
+    "Python": {"category": "Language"},
+    "ASP.NET": {"category": "Framework", "headers": {"x-aspnet-version": VERSION, "x-powered-by": r"asp\.net"},
+                "cookies": [r"ASP\.NET_SessionId"], "html": [r"name=\"__VIEWSTATE\""]},
+    "Express": {"category": "Framework", "headers": {"x-powered-by": r"express"}, "implies": ["Node.js"]},
+    "Node.js": {"category": "Language"},
+    "Django": {"category": "Framework", "cookies": [r"csrftoken", r"django_language"], "html": [r"name=\"csrfmiddlewaretoken\""],
+               "implies": ["Python"]},
+    "Laravel": {"category": "Framework", "cookies": [r"laravel_session"], "implies": ["PHP"]},
+    "Ruby on Rails": {"category": "Framework", "meta": {"csrf-param": r"authenticity_token"}, "cookies": [r"_rails_session"]},
+    "WordPress": {"category": "CMS", "meta": {"generator": rf"wordpress(?: {VERSION})?"}, "headers": {"link": r"/wp-json/"},
+                  "scripts": [r"/wp-(?:content|includes)/"], "html": [r"/wp-content/(?:themes|plugins)/"], "implies": ["PHP"]},
+    "Drupal": {"category": "CMS", "meta": {"generator": rf"drupal(?: {VERSION})?"}, "headers": {"x-generator": r"drupal"},
+               "scripts": [r"/(?:misc|core/misc)/drupal\.js"], "implies": ["PHP"]},
+    "Joomla": {"category": "CMS", "meta": {"generator": rf"joomla!?(?: {VERSION})?"}, "implies": ["PHP"]},
+    "Ghost": {"category": "CMS", "meta": {"generator": rf"ghost(?: {VERSION})?"}, "implies": ["Node.js"]},
+    "Hugo": {"category": "Static site generator", "meta": {"generator": rf"hugo(?: {VERSION})?"}},
+    "Jekyll": {"category": "Static site generator", "meta": {"generator": rf"jekyll(?: v{VERSION})?"}},
+    "Shopify": {"category": "E-commerce", "headers": {"x-shopid": r""}, "scripts": [r"cdn\.shopify\.com"],
+                "html": [r"Shopify\.theme"]},
+    "Magento": {"category": "E-commerce", "cookies": [r"frontend", r"mage-cache-storage"], "scripts": [r"/static/version\d+/frontend/"],
+                "implies": ["PHP"]},
+    "WooCommerce": {"category": "E-commerce", "scripts": [r"/wp-content/plugins/woocommerce/"], "implies": ["WordPress"]},
+    "Wix": {"category": "Site builder", "headers": {"x-wix-request-id": r""}, "meta": {"generator": r"wix\.com"}},
+    "Squarespace": {"category": "Site builder", "headers": {"server": r"squarespace"}, "scripts": [r"static1\.squarespace\.com"]},
+    "Next.js": {"category": "Framework", "headers": {"x-powered-by": r"next\.js"}, "scripts": [r"/_next/static/"],
+                "html": [r"<script id=\"__NEXT_DATA__\""], "implies": ["React"]},
+    "Nuxt.js": {"category": "Framework", "scripts": [r"/_nuxt/"], "html": [r"window\.__NUXT__"], "implies": ["Vue.js"]},
+    "Gatsby": {"category": "Static site generator", "meta": {"generator": rf"gatsby(?: {VERSION})?"}, "html": [r"<div id=\"___gatsby\""],
+               "implies": ["React"]},
+    "React": {"category": "JavaScript framework", "scripts": [rf"react(?:-dom)?@{VERSION}",
+                                                              r"react(?:-dom)?(?:\.production)?(?:\.min)?\.js"],
+              "html": [r"data-reactroot"]},
+    "Vue.js": {"category": "JavaScript framework", "scripts": [rf"vue@{VERSION}", r"vue(?:\.runtime)?(?:\.global)?(?:\.prod)?(?:\.min)?\.js"],
+               "html": [r"data-v-[0-9a-f]{8}"]},
+    "Angular": {"category": "JavaScript framework", "html": [rf"ng-version=\"{VERSION}\""]},
+    "AngularJS": {"category": "JavaScript framework", "scripts": [rf"angular(?:js)?(?:/{VERSION})?/angular(?:\.min)?\.js"],
+                  "html": [r"ng-app\b"]},
+    "Svelte": {"category": "JavaScript framework", "html": [r"svelte-[a-z0-9]{5,}\b"]},
+    "Alpine.js": {"category": "JavaScript framework", "scripts": [rf"alpinejs(?:@{VERSION})?"], "html": [r"x-data="]},
+    "htmx": {"category": "JavaScript library", "scripts": [rf"htmx(?:\.org)?(?:@{VERSION})?(?:/dist)?/htmx(?:\.min)?\.js"]},
+    "jQuery": {"category": "JavaScript library", "scripts": [rf"jquery(?:[.-]{VERSION})?(?:\.slim)?(?:\.min)?\.js",
+                                                              rf"/jquery/{VERSION}/jquery"]},
+    "jQuery UI": {"category": "JavaScript library", "scripts": [rf"jquery-ui(?:[.-]{VERSION})?(?:\.min)?\.js"], "implies": ["jQuery"]},
+    "Lodash": {"category": "JavaScript library", "scripts": [rf"lodash(?:@{VERSION})?(?:\.min)?\.js"]},
+    "Moment.js": {"category": "JavaScript library", "scripts": [rf"moment(?:@{VERSION})?(?:\.min)?\.js"]},
+    "Bootstrap": {"category": "UI framework", "scripts": [rf"bootstrap(?:@{VERSION})?(?:\.bundle)?(?:\.min)?\.js"],
+                  "html": [rf"/bootstrap@{VERSION}/", r"/bootstrap(?:\.min)?\.css"]},
+    "Tailwind CSS": {"category": "UI framework", "scripts": [r"cdn\.tailwindcss\.com"], "html": [r"/tailwind(?:\.min)?\.css"]},
+    "Font Awesome": {"category": "Font", "scripts": [r"kit\.fontawesome\.com"], "html": [r"font-?awesome(?:\.min)?\.css"]},
+    "Google Analytics": {"category": "Analytics", "scripts": [r"google-analytics\.com/(?:analytics|ga)\.js", r"googletagmanager\.com/gtag/js"]},
+    "Google Tag Manager": {"category": "Tag manager", "scripts": [r"googletagmanager\.com/gtm\.js"], "html": [r"googletagmanager\.com/ns\.html"]},
+    "Hotjar": {"category": "Analytics", "html": [r"static\.hotjar\.com"]},
+    "Plausible": {"category": "Analytics", "scripts": [r"plausible\.io/js/"]},
+    "Matomo": {"category": "Analytics", "scripts": [r"/(?:matomo|piwik)\.js"], "cookies": [r"_pk_id"]},
+    "reCAPTCHA": {"category": "Security", "scripts": [r"google\.com/recaptcha/"]},
+    "jsDelivr": {"category": "CDN", "scripts": [r"cdn\.jsdelivr\.net"]},
+    "unpkg": {"category": "CDN", "scripts": [r"unpkg\.com/"]},
+    "cdnjs": {"category": "CDN", "scripts": [r"cdnjs\.cloudflare\.com"]},
+}
+
+CONFIDENCE = {"headers": 100, "cookies": 75, "meta": 100, "scripts": 100, "html": 50}
+
+SCRIPT_TAG = re.compile(rb"<script[^>]*?\ssrc=[\"']([^\"']+)", re.I)
+META_TAG = re.compile(rb"<meta\s([^>]*)>", re.I)
+META_ATTR = re.compile(rb"(name|property|content)\s*=\s*[\"']([^\"']*)", re.I)
+
+def leading_literal(pattern):
+    # the fixed text every match starts with, read off the pattern source;
+    # nothing when the pattern is a top-level alternation
+    depth, in_class, i = 0, False, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 1
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char in "()":
+            depth += 1 if char == "(" else -1
+        elif char == "|" and not depth:
+            return b""
+        i += 1
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char, step = pattern[i], 1
+        if char == "\\" and pattern[i + 1:i + 2] and not pattern[i + 1].isalnum():
+            char, step = pattern[i + 1], 2
+        elif char in ".^$*+?{}[]()|\\":
+            break
+        # a quantified character is not part of every match
+        if pattern[i + step:i + step + 1] in ("*", "+", "?", "{"):
+            break
+        literal.append(char)
+        i += step
+    return "".join(literal).lower().encode("latin-1")
+
+def literal_trie(words):
+    # the alternation laid out as a trie, so a shared prefix is only ever
+    # compared once per position; about twice as fast as a flat a|b|c here
+    tree = {}
+    for word in words:
+        node = tree
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+
+    def branch(node):
+        branches = [re.escape(bytes([byte])) + branch(child) for byte, child in sorted(
+            (byte, child) for byte, child in node.items() if byte is not None)]
+        if not branches:
+            return b""
+        return b"(?:" + b"|".join(branches) + b")" + (b"?" if None in node else b"")
+
+    return re.compile(branch(tree))
+
+class Matcher:
+    # header and cookie signatures are checked per response (there are only
+    # a handful of either). For the body, every html signature and the two
+    # tags we look inside (<script src>, <meta>) start with a literal; those
+    # literals go into one alternation that finds candidate positions in a
+    # single pass over the lower-cased chunk, and only there is the full
+    # pattern tried. Script sources then go through one alternation of all
+    # script signatures, meta tags through a lookup by name
+    def __init__(self, signatures=SIGNATURES):
+        self.signatures = signatures
+        self.headers = {}
+        self.cookies = []
+        self.meta = {}
+        self.table = []
+        verifiers = {b"<script": [("src", SCRIPT_TAG)], b"<meta": [("meta", META_TAG)]}
+        scripts = []
+        for name, sig in signatures.items():
+            for header, pattern in sig.get("headers", {}).items():
+                self.headers.setdefault(header, []).append((name, re.compile(pattern, re.I)))
+            for pattern in sig.get("cookies", []):
+                self.cookies.append((name, re.compile(pattern)))
+            for meta, pattern in sig.get("meta", {}).items():
+                self.meta.setdefault(meta.encode(), []).append((name, re.compile(pattern.encode(), re.I)))
+            for pattern in sig.get("scripts", []):
+                scripts.append(self.group(name, "scripts", pattern))
+            for pattern in sig.get("html", []):
+                anchor = leading_literal(pattern)
+                if len(anchor) < 3:
+                    raise ValueError(f"html signature for {name} needs a literal prefix: {pattern}")
+                verifiers.setdefault(anchor, []).append((len(self.table), re.compile(self.group(name, "html", pattern).encode(), re.I)))
+        self.scripts = re.compile("|".join(scripts).encode(), re.I)
+        # longest anchors first, and a match on an anchor also tries the
+        # patterns of every shorter anchor that is a prefix of it
+        anchors = sorted(verifiers, key=len, reverse=True)
+        self.verifiers = {anchor: [v for other in anchors if anchor.startswith(other) for v in verifiers[other]]
+                          for anchor in anchors}
+        self.anchors = literal_trie(anchors)
+
+    def group(self, name, kind, pattern):
+        # one named group per signature pattern, with its own version group,
+        # so lastgroup says which signature matched
+        index = len(self.table)
+        self.table.append((name, kind, "(?P<v>" in pattern))
+        return f"(?P<s{index}>{pattern.replace('(?P<v>', f'(?P<v{index}>')})"
+
+    def match_headers(self, headers, cookies, found):
+        for header, value in headers.items():
+            for name, pattern in self.headers.get(header.lower(), ()):
+                m = pattern.search(value)
+                if m:
+                    version = m.groupdict().get("v")
+                    found.add(name, "headers", f"{header}: {value}"[:80], version)
+        for cookie in cookies:
+            for name, pattern in self.cookies:
+                if pattern.fullmatch(cookie):
+                    found.add(name, "cookies", f"cookie {cookie}", None)
+
+    def report(self, m, found):
+        index = int(m.lastgroup[1:])
+        name, kind, versioned = self.table[index]
+        version = m.group(f"v{index}") if versioned else None
+        found.add(name, kind, m.group(0)[:80].decode("latin-1"), version.decode() if version else None)
+
+    def match_meta(self, attributes, found):
+        attrs = {key.lower(): value for key, value in META_ATTR.findall(attributes)}
+        key = attrs.get(b"name") or attrs.get(b"property")
+        for name, pattern in self.meta.get(key.lower() if key else None, ()):
+            hit = pattern.match(attrs.get(b"content", b""))
+            if hit:
+                version = hit.groupdict().get("v")
+                found.add(name, "meta", f"meta {key.decode('latin-1')}", version.decode() if version else None)
+
+    def match_body(self, data, found):
+        for m in self.anchors.finditer(data.lower()):
+            for kind, regex in self.verifiers[m.group()]:
+                hit = regex.match(data, m.start())
+                if hit is None:
+                    continue
+                if kind == "src":
+                    for s in self.scripts.finditer(hit.group(1)):
+                        self.report(s, found)
+                elif kind == "meta":
+                    self.match_meta(hit.group(1), found)
+                else:
+                    self.report(hit, found)
+
+class Detections:
+    __slots__ = ("signatures", "items")
+
+    def __init__(self, signatures):
+        self.signatures = signatures
+        self.items = {}
+
+    def add(self, name, kind, evidence, version=None, implied=False):
+        item = self.items.setdefault(name, {"name": name, "category": self.signatures[name]["category"],
+                                            "version": None, "confidence": 0, "evidence": []})
+        if version and not item["version"]:
+            item["version"] = version
+        if kind in {e.split(":", 1)[0] for e in item["evidence"]}:
+            return
+        item["confidence"] = min(100, item["confidence"] + (50 if implied else CONFIDENCE[kind]))
+        item["evidence"].append(f"{kind}: {evidence}")
+
+    def resolve(self):
+        pending = list(self.items)
+        while pending:
+            name = pending.pop()
+            for implied in self.signatures[name].get("implies", []):
+                if implied not in self.items:
+                    pending.append(implied)
+                self.add(implied, "implied", f"by {name}", implied=True)
+        return sorted(self.items.values(), key=lambda item: (item["category"], item["name"]))
+
+MATCHER = None
+
+def get_matcher():
+    global MATCHER
+    if MATCHER is None:
+        MATCHER = Matcher()
+    return MATCHER
 
-def fingerprint_tech(url):
-    r = requests.get(url)
-    server = r.headers.get('Server', 'Unknown')
-    x_powered_by = r.headers.get('X-Powered-By', 'Unknown')
+def fingerprint(session, url, timeout=10.0, max_bytes=MAX_BYTES):
+    matcher = get_matcher()
+    found = Detections(matcher.signatures)
+    result = {"url": url}
+    started = time.perf_counter()
+    try:
+        with session.get(url, timeout=timeout, stream=True) as r:
+            result.update(status=r.status_code, final_url=r.url, server=r.headers.get("Server"),
+                          powered_by=r.headers.get("X-Powered-By"))
+            matcher.match_headers(r.headers, r.cookies.keys(), found)
+            scanned = 0
+            tail = b""
+            # fingerprints live in the head and the first part of the body;
+            # reading stops at the byte budget instead of the end of the page
+            for chunk in r.iter_content(CHUNK):
+                matcher.match_body(tail + chunk, found)
+                tail = chunk[-OVERLAP:]
+                scanned += len(chunk)
+                if scanned >= max_bytes:
+                    break
+            result["bytes"] = scanned
+    except requests.RequestException as e:
+        result["error"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    result["technologies"] = found.resolve()
+    return result
 
-    soup = BeautifulSoup(r.text, 'html.parser')
-    scripts = [s.get('src') for s in soup.find_all('script') if s.get('src')]
-    styles = [s.get('href') for s in soup.find_all('link') if s.get('href')]
+def render_single(result, console):
+    if "error" in result:
+        console.print(f"[bold red]❌ {result['url']}: {result['error']}[/bold red]")
+        return
+    print("Server:", result["server"] or "Unknown")
+    print("X-Powered-By:", result["powered_by"] or "Unknown")
+    table = Table(title=f"Technologies on {result['final_url']}")
+    table.add_column("Technology", style="bold cyan")
+    table.add_column("Category")
+    table.add_column("Version")
+    table.add_column("Confidence", justify="right")
+    table.add_column("Evidence", style="dim")
+    for tech in result["technologies"]:
+        table.add_row(tech["name"], tech["category"], tech["version"] or "-", f"{tech['confidence']}%",
+                      ", ".join(e.split(":", 1)[0] for e in tech["evidence"]))
+    console.print(table)
 
-    print("Server:", server)
-    print("X-Powered-By:", x_powered_by)
-    print("Scripts:", scripts)
-    print("Stylesheets:", styles)
\ No newline at end of file
+def fingerprint_tech(url, file=None, concurrency=32, timeout=10.0, max_bytes=MAX_BYTES, jsonl=False):
+    console = Console()
+    urls = ([url] if url else []) + (list(iter_targets(file)) if file else [])
+    urls = [u if "://" in u else f"https://{u}" for u in dict.fromkeys(urls)]
+    session = make_session(max(1, concurrency))
+    started = time.perf_counter()
+    results = []
+    with session, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for result in pool.map(lambda u: fingerprint(session, u, timeout, max_bytes), urls):
+            results.append(result)
+            if jsonl:
+                emit(result)
+    elapsed = time.perf_counter() - started
+    if jsonl:
+        return results
+    if len(results) == 1:
+        render_single(results[0], console)
+        return results
+    table = Table(title=f"Technology fingerprints: {len(results)} sites in {elapsed:.1f}s ({len(results) / max(elapsed, 1e-9):.1f}/s)")
+    table.add_column("URL", style="bold cyan")
+    table.add_column("Status", justify="right")
+    table.add_column("Technologies")
+    for r in results:
+        if "error" in r:
+            table.add_row(r["url"], "-", f"[red]{r['error']}[/red]")
+            continue
+        techs = ", ".join(t["name"] + (f" {t['version']}" if t["version"] else "") for t in r["technologies"])
+        table.add_row(r["url"], str(r["status"]), techs or "-")
+    console.print(table)
+    return results
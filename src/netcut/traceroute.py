@@ -1,6 +1,303 @@
-import subprocess
+import random
+import select
+import socket
+import statistics
+import struct
+import time
+from collections import Counter
 
-def visualize_traceroute(host):
-    print(f"Traceroute to {host}:")
-    result = subprocess.getoutput(f"traceroute -n {host}")
-    print(result)
\ No newline at end of file
+from rich.console import Console
+from rich.table import Table
+
+from netcut.output import emit
+from netcut.inet import checksum
+from netcut.resolver import resolve_many
+
+PROTOS = {"icmp": socket.IPPROTO_ICMP, "udp": socket.IPPROTO_UDP, "tcp": socket.IPPROTO_TCP}
+DEFAULT_PORTS = {"udp": 33434, "tcp": 80, "icmp": 0}
+IP_HEADER = struct.Struct("!BBHHHBBH4s4s")
+ICMP_TIME_EXCEEDED = 11
+ICMP_UNREACHABLE = 3
+ICMP_ECHO_REPLY = 0
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+def source_for(dst):
+    # the kernel picks the source address for us when we "connect" UDP
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((dst, 9))
+        return s.getsockname()[0]
+
+class Target:
+    __slots__ = ("host", "ip", "dst", "src", "ident", "sport", "dport", "hops", "distance")
+
+    def __init__(self, host, ip, sport, dport):
+        self.host = host
+        self.ip = ip
+        self.dst = socket.inet_aton(ip)
+        self.src = socket.inet_aton(source_for(ip))
+        self.ident = random.getrandbits(16)
+        self.sport = sport
+        self.dport = dport
+        # ttl -> [sent, responders Counter, rtts]
+        self.hops = {}
+        self.distance = None
+
+    def record(self, ttl, addr, rtt, final):
+        hop = self.hops[ttl]
+        hop[1][addr] += 1
+        hop[2].append(rtt)
+        if final and (self.distance is None or ttl < self.distance):
+            self.distance = ttl
+
+class Tracer:
+    # every probe carries its own id in the IP ID field, which ICMP errors
+    # quote back, so one receive socket serves all targets and TTLs at once.
+    # In Paris mode everything a load balancer hashes on (addresses, ports,
+    # ICMP id and checksum) stays constant per target, so each target's
+    # probes follow one path
+    def __init__(self, proto="udp", paris=True, rate=5000):
+        self.proto = proto
+        self.paris = paris
+        self.interval = 1.0 / rate if rate else 0.0
+        self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_RAW)
+        self.icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        self.tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP) if proto == "tcp" else None
+        self.socks = [s for s in (self.icmp_sock, self.tcp_sock) if s]
+        for s in self.socks:
+            s.setblocking(False)
+        self.probes = {}
+        self.next_id = random.randrange(1, 0xFFFF)
+        self.timeout = 1.0
+        self.by_dst = {}
+        self.by_ident = {}
+
+    def close(self):
+        for s in [self.send_sock] + self.socks:
+            s.close()
+
+    def add(self, target):
+        self.by_dst[target.dst] = target
+        self.by_ident[target.ident] = target
+
+    def packet(self, target, ttl, probe_id):
+        if self.proto == "icmp":
+            seq = 0 if self.paris else ttl
+            # the second payload word cancels the first, so the ICMP checksum
+            # (which some balancers hash) is the same for every probe
+            body = struct.pack("!HH", probe_id, 0xFFFF - probe_id)
+            header = struct.pack("!BBHHH", 8, 0, 0, target.ident, seq)
+            payload = header[:2] + struct.pack("!H", checksum(header + body)) + header[4:] + body
+        elif self.proto == "udp":
+            dport = target.dport if self.paris else target.dport + ttl - 1
+            # checksum 0 means "none" for UDP over IPv4, constant by definition
+            payload = struct.pack("!HHHH", target.sport, dport, 8 + 4, 0) + b"NCUT"
+        else:
+            sport = target.sport if self.paris else (target.sport + ttl) & 0xFFFF
+            header = struct.pack("!HHIIBBHHH", sport, target.dport, probe_id, 0, 5 << 4, TCP_SYN, 64240, 0, 0)
+            pseudo = target.src + target.dst + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(header))
+            payload = header[:16] + struct.pack("!H", checksum(pseudo + header)) + header[18:]
+        ip = IP_HEADER.pack(0x45, 0, 20 + len(payload), probe_id, 0, ttl, PROTOS[self.proto], 0, target.src, target.dst)
+        return ip + payload
+
+    def take_id(self):
+        probe_id = self.next_id
+        # ids wrap at 16 bits and 0 would be replaced by the kernel. An id
+        # whose probe is still in flight is waited on until it is answered or
+        # times out, then dropped as lost, so a reply is never credited to a
+        # later probe's target or TTL
+        self.next_id = self.next_id % 0xFFFF + 1
+        while (probe := self.probes.get(probe_id)) is not None:
+            left = probe[2] + self.timeout - time.perf_counter()
+            if left <= 0:
+                del self.probes[probe_id]
+                break
+            self.receive(left)
+        return probe_id
+
+    def send(self, target, ttl):
+        probe_id = self.take_id()
+        hop = target.hops.setdefault(ttl, [0, Counter(), []])
+        hop[0] += 1
+        self.probes[probe_id] = (target, ttl, time.perf_counter())
+        try:
+            self.send_sock.sendto(self.packet(target, ttl, probe_id), (target.ip, 0))
+        except OSError:
+            pass
+
+    def match(self, probe_id, dst, addr, final, now):
+        # a reply quoting some other destination leaves the probe pending
+        probe = self.probes.get(probe_id)
+        if probe is None or probe[0].dst != dst:
+            return
+        del self.probes[probe_id]
+        target, ttl, sent = probe
+        target.record(ttl, addr, (now - sent) * 1000, final)
+
+    def receive(self, timeout):
+        ready, _, _ = select.select(self.socks, [], [], timeout)
+        now = time.perf_counter()
+        for s in ready:
+            while True:
+                try:
+                    data = s.recv(4096)
+                except BlockingIOError:
+                    break
+                if s is self.icmp_sock:
+                    self.on_icmp(data, now)
+                else:
+                    self.on_tcp(data, now)
+
+    def on_icmp(self, data, now):
+        ihl = (data[0] & 0x0F) * 4
+        src = data[12:16]
+        icmp = data[ihl:]
+        if len(icmp) < 8:
+            return
+        kind = icmp[0]
+        if kind in (ICMP_TIME_EXCEEDED, ICMP_UNREACHABLE) and len(icmp) >= 8 + 20:
+            inner = icmp[8:]
+            probe_id = inner[4] << 8 | inner[5]
+            dst = inner[16:20]
+            self.match(probe_id, dst, socket.inet_ntoa(src), kind == ICMP_UNREACHABLE, now)
+        elif kind == ICMP_ECHO_REPLY and self.proto == "icmp" and len(icmp) >= 12:
+            target = self.by_ident.get(icmp[4] << 8 | icmp[5])
+            if target and target.dst == src:
+                self.match(icmp[8] << 8 | icmp[9], src, target.ip, True, now)
+
+    def on_tcp(self, data, now):
+        ihl = (data[0] & 0x0F) * 4
+        target = self.by_dst.get(data[12:16])
+        if target is None or len(data) < ihl + 20:
+            return
+        sport, dport, _, ack = struct.unpack_from("!HHII", data, ihl)
+        flags = data[ihl + 13]
+        if sport != target.dport or not flags & (TCP_RST | TCP_ACK) or flags & TCP_SYN and not flags & TCP_ACK:
+            return
+        if self.paris and dport != target.sport:
+            return
+        self.match((ack - 1) & 0xFFFF, target.dst, target.ip, True, now)
+
+    def run(self, targets, max_hops=30, queries=3, timeout=1.0):
+        self.timeout = timeout
+        for target in targets:
+            self.add(target)
+        # first round covers every TTL; later rounds only go as deep as the
+        # destination turned out to be
+        self.burst([(target, ttl) for ttl in range(1, max_hops + 1) for target in targets], timeout)
+        if queries > 1:
+            rest = [(target, ttl) for _ in range(queries - 1) for target in targets
+                    for ttl in range(1, (target.distance or max_hops) + 1)]
+            self.burst(rest, timeout)
+
+    def burst(self, probes, timeout):
+        next_send = time.perf_counter()
+        for target, ttl in probes:
+            now = time.perf_counter()
+            if now < next_send:
+                self.receive(next_send - now)
+            self.send(target, ttl)
+            next_send += self.interval
+            if not self.interval:
+                self.receive(0)
+        deadline = time.perf_counter() + timeout
+        while (left := deadline - time.perf_counter()) > 0:
+            self.receive(left)
+
+def hop_records(target):
+    last = target.distance or max(target.hops, default=0)
+    hops = []
+    for ttl in range(1, last + 1):
+        sent, responders, rtts = target.hops.get(ttl, (0, Counter(), []))
+        received = len(rtts)
+        hop = {"ttl": ttl, "addr": responders.most_common(1)[0][0] if responders else None,
+               "addrs": sorted(responders), "sent": sent, "received": received,
+               "loss": round(100 * (1 - received / sent), 1) if sent else None}
+        if rtts:
+            hop.update(min=round(min(rtts), 2), avg=round(statistics.fmean(rtts), 2), max=round(max(rtts), 2),
+                       jitter=round(statistics.pstdev(rtts), 2))
+        hops.append(hop)
+    return {"target": target.host, "ip": target.ip, "reached": target.distance is not None, "hops": hops}
+
+def render(result):
+    table = Table(title=f"Traceroute to {result['target']} ({result['ip']})" + ("" if result["reached"] else " — not reached"))
+    table.add_column("TTL", justify="right")
+    table.add_column("Address")
+    table.add_column("Loss %", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Avg", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("")
+    scale = max((hop.get("avg", 0) for hop in result["hops"]), default=0) or 1
+    for hop in result["hops"]:
+        if not hop["received"]:
+            table.add_row(str(hop["ttl"]), "*", f"{hop['loss']:.0f}", "-", "-", "-", "")
+            continue
+        addr = hop["addr"] + (f" (+{len(hop['addrs']) - 1})" if len(hop["addrs"]) > 1 else "")
+        bar = "█" * max(1, round(hop["avg"] / scale * 30))
+        table.add_row(str(hop["ttl"]), addr, f"{hop['loss']:.0f}", f"{hop['min']:.1f}", f"{hop['avg']:.1f}", f"{hop['max']:.1f}", bar)
+    return table
+
+def iter_hosts(hosts, file):
+    yield from hosts
+    if file:
+        with open(file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+
+def visualize_traceroute(hosts, file=None, proto="udp", port=None, max_hops=30, queries=3, timeout=1.0,
+                         rate=5000, paris=True, jsonl=False):
+    console = Console(stderr=jsonl)
+    hosts = list(dict.fromkeys(iter_hosts(hosts, file)))
+    if proto not in PROTOS:
+        console.print(f"[bold red]❌ Probe protocol must be one of {', '.join(PROTOS)}[/bold red]")
+        return
+    port = port or DEFAULT_PORTS[proto]
+    sport = random.randrange(33000, 60000)
+    targets = []
+    for host, ip in zip(hosts, resolve_many(hosts)):
+        if ip is None or ":" in ip:
+            console.print(f"[yellow]⚠️ Skipping {host}: {'IPv6 is not supported' if ip else 'does not resolve'}[/yellow]")
+            continue
+        targets.append(Target(host, ip, sport, port))
+    if not targets:
+        return
+    try:
+        tracer = Tracer(proto, paris, rate)
+    except PermissionError:
+        console.print("[bold red]❌ Traceroute needs raw sockets; run as root or with CAP_NET_RAW[/bold red]")
+        return
+    started = time.perf_counter()
+    try:
+        tracer.run(targets, max_hops, max(1, queries), timeout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tracer.close()
+    elapsed = time.perf_counter() - started
+    results = [hop_records(target) for target in targets]
+    if jsonl:
+        for result in results:
+            emit(result)
+        return results
+    if len(results) == 1:
+        console.print(render(results[0]))
+        return results
+    table = Table(title=f"Traceroute to {len(results)} targets ({proto.upper()}{', Paris' if paris else ''}) in {elapsed:.1f}s")
+    table.add_column("Target", style="bold cyan")
+    table.add_column("IP")
+    table.add_column("Hops", justify="right")
+    table.add_column("Reached")
+    table.add_column("Last Hop")
+    table.add_column("Avg ms", justify="right")
+    table.add_column("Loss %", justify="right")
+    for result in results:
+        last = next((hop for hop in reversed(result["hops"]) if hop["received"]), None)
+        table.add_row(result["target"], result["ip"], str(len(result["hops"])), "✅" if result["reached"] else "❌",
+                      last["addr"] if last else "-", f"{last['avg']:.1f}" if last else "-",
+                      f"{last['loss']:.0f}" if last else "-")
+    console.print(table)
+    return results
@@ -1,13 +1,33 @@
+from dataclasses import dataclass, field
+
 import requests
-import socket
 
-def detect_tunnel_leak():
+from netcut.output import show
+from netcut.resolver import resolve_all
+
+@dataclass(slots=True)
+class TunnelResult:
+    public_ip: str | None = None
+    resolved: list = field(default_factory=list)
+    error: str | None = None
+
+def check_tunnel():
+    result = TunnelResult()
     try:
-        ip = requests.get("https://api.ipify.org").text
-        print(f"🌐 Public IP: {ip}")
-        dns = socket.getaddrinfo("example.com", 80)
-        print("🔍 DNS Resolution Path:")
-        for entry in dns:
-            print(f"  {entry[4][0]}")
+        result.public_ip = requests.get("https://api.ipify.org").text
+        result.resolved = resolve_all("example.com")
     except Exception as e:
-        print("❌ Error detecting VPN leak:", e)
\ No newline at end of file
+        result.error = str(e)
+    return result
+
+def render(result):
+    if result.error:
+        print("❌ Error detecting VPN leak:", result.error)
+        return
+    print(f"🌐 Public IP: {result.public_ip}")
+    print("🔍 DNS Resolution Path:")
+    for addr in result.resolved:
+        print(f"  {addr}")
+
+def detect_tunnel_leak():
+    return show(check_tunnel(), render)
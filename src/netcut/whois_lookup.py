@@ -1,9 +1,366 @@
-import whois
-
-def perform_whois(domain):
-    w = whois.whois(domain)
-    print(f"Domain: {domain}")
-    print(f"Registrar: {w.registrar}")
-    print(f"Creation Date: {w.creation_date}")
-    print(f"Expiration Date: {w.expiration_date}")
-    print(f"Name Servers: {w.name_servers}")
\ No newline at end of file
+import re
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+from rich.console import Console
+from rich.table import Table
+
+from netcut.cache import TTLCache, cache_path
+from netcut.output import emit, show, status, structured
+
+IANA = "whois.iana.org"
+WHOIS_PORT = 43
+RDAP_BOOTSTRAP = "https://data.iana.org/rdap/dns.json"
+REFERRAL_AGE = 30 * 86400
+RESPONSE_AGE = 86400
+MAX_RESPONSE = 1024 * 1024
+RETRIES = 3
+BACKOFF = 10
+
+# registries spell the same field a dozen ways; the first alias present wins
+ALIASES = {
+    "registrar": ("registrar", "registrar name", "sponsoring registrar", "registrar organization"),
+    "created": ("creation date", "created", "created on", "registered on", "registration time", "registered",
+                "domain registration date", "created date"),
+    "expires": ("registry expiry date", "registrar registration expiration date", "expiration date",
+                "expiry date", "expires", "expires on", "expire date", "paid-till", "expiration time",
+                "renewal date", "domain expiration date"),
+    "updated": ("updated date", "last updated", "last modified", "changed", "modified", "last update"),
+    "name_servers": ("name server", "nameserver", "nameservers", "name servers", "nserver", "dns"),
+    "status": ("domain status", "status", "state"),
+}
+NOT_FOUND = re.compile(r"no match|not found|no entries found|no data found|no object found|status:\s*(free|available)",
+                       re.IGNORECASE)
+THROTTLED = re.compile(r"rate limit|limit exceeded|too many|quota|try again later", re.IGNORECASE)
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d-%b-%Y", "%d-%b-%Y %H:%M:%S", "%d.%m.%Y", "%Y.%m.%d",
+                "%Y.%m.%d %H:%M:%S", "%Y/%m/%d", "%d/%m/%Y", "%Y%m%d", "%a %b %d %H:%M:%S %Z %Y")
+
+@dataclass(slots=True)
+class WhoisResult:
+    domain: str
+    registrar: str | None = None
+    creation_date: str | None = None
+    expiration_date: str | None = None
+    name_servers: list = field(default_factory=list)
+    error: str | None = None
+    updated_date: str | None = None
+    status: list = field(default_factory=list)
+    days_left: int | None = None
+    server: str | None = None
+    cached: bool = False
+
+def parse_date(value):
+    # normalized to ISO 8601 in UTC; None when no known format matches
+    if not value:
+        return None
+    text = re.sub(r"(\d{2}:\d{2}:\d{2})\.\d+", r"\1", value.split(" (")[0].strip())
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                moment = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+def fields_of(text):
+    # "Key: value" lines, plus the .uk style of a bare "Key:" followed by
+    # indented value lines
+    fields = defaultdict(list)
+    label = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith(("%", "#", ">>>")):
+            label = None
+            continue
+        key, sep, value = line.partition(":")
+        if sep and 0 < len(key) < 48 and "//" not in key:
+            key, value = key.strip().lower(), value.strip()
+            if value:
+                fields[key].append(value)
+                label = None
+            else:
+                label = key
+        elif label and raw[:1].isspace():
+            fields[label].append(line)
+    return fields
+
+def pick(fields, name):
+    for alias in ALIASES[name]:
+        if fields.get(alias):
+            return fields[alias]
+    return []
+
+def unique(values):
+    return list(dict.fromkeys(value for value in values if value))
+
+def parse_whois(domain, text):
+    fields = fields_of(text)
+    result = WhoisResult(domain)
+    registrar = pick(fields, "registrar")
+    result.registrar = registrar[0] if registrar else None
+    result.creation_date = parse_date(next(iter(pick(fields, "created")), None))
+    result.expiration_date = parse_date(next(iter(pick(fields, "expires")), None))
+    result.updated_date = parse_date(next(iter(pick(fields, "updated")), None))
+    result.name_servers = sorted({value.split()[0].lower().rstrip(".") for value in pick(fields, "name_servers")})
+    result.status = unique(value.split()[0] for value in pick(fields, "status"))
+    if not (result.registrar or result.expiration_date or result.creation_date):
+        result.error = "not registered" if NOT_FOUND.search(text) else "no registration data in response"
+    return result
+
+def parse_rdap(domain, data):
+    events = {event.get("eventAction"): event.get("eventDate") for event in data.get("events", [])}
+    result = WhoisResult(domain, creation_date=parse_date(events.get("registration")),
+                         expiration_date=parse_date(events.get("expiration")),
+                         updated_date=parse_date(events.get("last changed")), status=data.get("status", []))
+    for entity in data.get("entities", []):
+        if "registrar" in entity.get("roles", []):
+            for item in (entity.get("vcardArray") or [None, []])[1]:
+                if item[0] == "fn":
+                    result.registrar = item[3]
+    names = {ns.get("ldhName", "").lower().rstrip(".") for ns in data.get("nameservers", [])}
+    result.name_servers = sorted(names - {""})
+    return result
+
+def query(server, text, timeout):
+    host, _, port = server.partition(":")
+    with socket.create_connection((host, int(port or WHOIS_PORT)), timeout=timeout) as sock:
+        sock.sendall(f"{text}\r\n".encode())
+        chunks, size = [], 0
+        while size < MAX_RESPONSE:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+    return b"".join(chunks).decode("utf-8", "replace")
+
+class Limiter:
+    # one schedule per registry server: queries to the same server are
+    # spaced 1/rate apart while other servers proceed in parallel
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next = {}
+        self.lock = threading.Lock()
+
+    def wait(self, server):
+        with self.lock:
+            now = time.monotonic()
+            due = max(now, self.next.get(server, now))
+            self.next[server] = due + self.interval
+        if due > now:
+            time.sleep(due - now)
+
+    def back_off(self, server, seconds):
+        with self.lock:
+            self.next[server] = max(self.next.get(server, 0), time.monotonic() + seconds)
+
+class WhoisClient:
+    def __init__(self, timeout=10.0, rate=2.0, rdap=False, server=None, refresh=False):
+        self.timeout = timeout
+        self.limiter = Limiter(rate)
+        self.server = server
+        self.refresh = refresh
+        # referrals (TLD -> WHOIS server, the RDAP bootstrap) rarely change;
+        # answers are kept for a day so repeated audits don't re-query
+        self.referrals = TTLCache(cache_path("whois", "referrals.json"), REFERRAL_AGE)
+        self.responses = TTLCache(cache_path("whois", "domains.json"), RESPONSE_AGE)
+        self.locks = defaultdict(threading.Lock)
+        self.session = None
+        if rdap:
+            from netcut.reachability import make_session
+            self.session = make_session(8)
+
+    def ask(self, server, text):
+        for attempt in range(RETRIES):
+            self.limiter.wait(server)
+            try:
+                answer = query(server, text, self.timeout)
+            except ConnectionResetError:
+                # several registries drop the connection instead of answering
+                # once a client is over its limit
+                answer = None
+            if answer is None or len(answer) < 512 and THROTTLED.search(answer):
+                self.limiter.back_off(server, BACKOFF * (attempt + 1))
+                continue
+            return answer
+        raise ConnectionError(f"{server} is rate limiting us")
+
+    def whois_server(self, tld):
+        if self.server:
+            return self.server
+        with self.locks[tld]:
+            server = self.referrals.get(tld)
+            if server is None:
+                fields = fields_of(self.ask(IANA, tld))
+                server = next(iter(fields.get("refer", []) or fields.get("whois", [])), "")
+                self.referrals.put(tld, server)
+        if not server:
+            raise LookupError(f"no WHOIS server for .{tld}")
+        return server
+
+    def rdap_base(self, tld):
+        with self.locks["rdap"]:
+            services = self.referrals.get("rdap")
+            if services is None:
+                response = self.session.get(RDAP_BOOTSTRAP, timeout=self.timeout)
+                response.raise_for_status()
+                services = {}
+                for tlds, urls in response.json().get("services", []):
+                    url = next((url for url in urls if url.startswith("https")), urls[0] if urls else None)
+                    for name in tlds:
+                        services[name.lower()] = url
+                self.referrals.put("rdap", services)
+        return services.get(tld)
+
+    def rdap(self, domain, base):
+        host = urlsplit(base).netloc
+        for attempt in range(RETRIES):
+            self.limiter.wait(host)
+            response = self.session.get(f"{base.rstrip('/')}/domain/{domain}", timeout=self.timeout,
+                                        headers={"Accept": "application/rdap+json"})
+            if response.status_code == 429:
+                self.limiter.back_off(host, float(response.headers.get("Retry-After", BACKOFF * (attempt + 1))))
+                continue
+            if response.status_code == 404:
+                return WhoisResult(domain, error="not registered", server=host)
+            response.raise_for_status()
+            result = parse_rdap(domain, response.json())
+            result.server = host
+            return result
+        raise ConnectionError(f"{host} is rate limiting us")
+
+    def fetch(self, domain):
+        tld = domain.rsplit(".", 1)[-1]
+        base = self.session and not self.server and self.rdap_base(tld)
+        if base:
+            return self.rdap(domain, base)
+        server = self.whois_server(tld)
+        result = parse_whois(domain, self.ask(server, domain))
+        result.server = server
+        return result
+
+    def lookup(self, domain):
+        try:
+            domain = domain.strip().lower().rstrip(".").encode("idna").decode()
+        except UnicodeError as e:
+            return WhoisResult(domain, error=f"invalid domain: {e}")
+        cached = None if self.refresh else self.responses.get(domain)
+        if cached is not None:
+            result = WhoisResult(**cached)
+            result.cached = True
+        else:
+            try:
+                result = self.fetch(domain)
+            except Exception as e:
+                return WhoisResult(domain, error=str(e) or type(e).__name__)
+            # misses are cached too, the expensive part of an audit is
+            # asking again about names nobody owns
+            if result.error in (None, "not registered"):
+                self.responses.put(domain, {name: getattr(result, name) for name in WhoisResult.__slots__
+                                            if name not in ("days_left", "cached")})
+        if result.expiration_date:
+            expires = datetime.fromisoformat(result.expiration_date)
+            result.days_left = int((expires - datetime.now(timezone.utc)).total_seconds() // 86400)
+        return result
+
+    def save(self):
+        self.referrals.save()
+        self.responses.save()
+
+def render(result):
+    if result.error:
+        print(f"❌ WHOIS lookup for {result.domain} failed: {result.error}")
+        return
+    print(f"Domain: {result.domain}")
+    print(f"Registrar: {result.registrar}")
+    print(f"Creation Date: {result.creation_date}")
+    print(f"Expiration Date: {result.expiration_date}" +
+          (f" ({result.days_left} days left)" if result.days_left is not None else ""))
+    print(f"Updated Date: {result.updated_date}")
+    print(f"Name Servers: {', '.join(result.name_servers) or None}")
+    print(f"Status: {', '.join(result.status) or None}")
+    print(f"Source: {result.server}{' (cached)' if result.cached else ''}")
+
+def perform_whois(domain, timeout=10.0, rdap=False, server=None, refresh=False):
+    client = WhoisClient(timeout, 0, rdap, server, refresh)
+    result = client.lookup(domain)
+    client.save()
+    return show(result, render)
+
+def iter_domains(domains, file):
+    yield from domains
+    if file:
+        f = sys.stdin if file == "-" else open(file)
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line.split()[0]
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+def interleave(domains):
+    # round-robin across TLDs so a thousand .com names queued behind one
+    # registry's rate limit don't hold up every other registry
+    by_tld = defaultdict(list)
+    for domain in domains:
+        by_tld[domain.rstrip(".").rsplit(".", 1)[-1].lower()].append(domain)
+    return [domain for group in zip_longest(*by_tld.values()) for domain in group if domain is not None]
+
+def expiry_report(results, console):
+    table = Table(title=f"Domains ({len(results)}) by expiry")
+    table.add_column("Domain", style="bold cyan")
+    table.add_column("Registrar")
+    table.add_column("Expires")
+    table.add_column("Days Left", justify="right")
+    table.add_column("Name Servers")
+    table.add_column("Source")
+    ordered = sorted(results, key=lambda r: (r.days_left is None, r.days_left or 0))
+    for r in ordered:
+        if r.error:
+            table.add_row(r.domain, "-", "-", "-", "-", f"[red]{r.error}[/red]")
+            continue
+        days = r.days_left
+        color = "red" if days is None or days < 0 else "yellow" if days < 30 else "green"
+        servers = ", ".join(r.name_servers[:2]) + (f" +{len(r.name_servers) - 2}" if len(r.name_servers) > 2 else "")
+        table.add_row(r.domain, r.registrar or "-", (r.expiration_date or "-")[:10],
+                      f"[{color}]{'-' if days is None else days}[/{color}]", servers or "-",
+                      f"{r.server}{' (cached)' if r.cached else ''}")
+    console.print(table)
+
+def bulk_whois(domains, file=None, concurrency=32, rate=2.0, timeout=10.0, rdap=False, server=None, refresh=False):
+    console = Console()
+    domains = interleave(dict.fromkeys(iter_domains(domains, file)))
+    client = WhoisClient(timeout, rate, rdap, server, refresh)
+    results = []
+    started = time.perf_counter()
+    status(f"🔍 Looking up {len(domains)} domains")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for result in pool.map(client.lookup, domains):
+            results.append(result)
+            if structured():
+                emit(result)
+    client.save()
+    if not structured():
+        expiry_report(results, console)
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r in results if r.error)
+        console.print(f"⏱️ {len(results)} domains in {elapsed:.1f}s, {failed} failed, "
+                      f"{client.responses.hits} answers from cache")
+    return results
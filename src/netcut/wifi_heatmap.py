@@ -1,48 +1,57 @@
 import subprocess
 import time
 import platform
+from dataclasses import dataclass
+
 from rich.console import Console
 from rich.table import Table
 
-def export_wifi_heatmap():
+from netcut.output import show_all, status
+
+@dataclass(slots=True)
+class Network:
+    ssid: str
+    signal: int | None
+    timestamp: str
+
+def scan_networks():
+    os_name = platform.system()
+    if os_name == "Darwin":
+        result = subprocess.run(["networksetup", "-listpreferredwirelessnetworks", "en0"], capture_output=True, text=True, check=True)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        return [Network(line.strip(), None, timestamp) for line in result.stdout.strip().splitlines()[1:] if line.strip()]
+    if os_name == "Linux":
+        scan = subprocess.getoutput("nmcli -t -f SSID,SIGNAL dev wifi")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        networks = []
+        for line in scan.strip().splitlines():
+            parts = line.split(":")
+            if len(parts) == 2 and parts[0].strip():
+                ssid, signal = parts
+                networks.append(Network(ssid, int(signal) if signal.isdigit() else None, timestamp))
+        return networks
+    return []
+
+def render(networks):
     console = Console()
+    if not networks:
+        console.print("[bold red]⚠️ No WiFi networks found.[/bold red]")
+        return
     table = Table(title="📶 WiFi Signal Heatmap")
     table.add_column("SSID", style="cyan")
     table.add_column("Signal", style="magenta")
     table.add_column("Timestamp", style="green")
+    for network in networks:
+        table.add_row(network.ssid, "?" if network.signal is None else str(network.signal), network.timestamp)
+    console.print(table)
 
-    found = False
-    os_name = platform.system()
-
+def export_wifi_heatmap():
+    networks = []
     for _ in range(3):
-        if os_name == "Darwin":
-            try:
-                result = subprocess.run(["networksetup", "-listpreferredwirelessnetworks", "en0"], capture_output=True, text=True, check=True)
-                lines = result.stdout.strip().splitlines()
-            except Exception as e:
-                console.print(f"[red]Failed to query preferred networks: {e}[/red]")
-                return
-
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-            for line in lines[1:]:
-                ssid = line.strip()
-                if ssid:
-                    table.add_row(ssid, "?", timestamp)
-                    found = True
-
-        elif os_name == "Linux":
-            scan = subprocess.getoutput("nmcli -t -f SSID,SIGNAL dev wifi")
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-            for line in scan.strip().splitlines():
-                parts = line.split(":")
-                if len(parts) == 2 and parts[0].strip():
-                    ssid, signal = parts
-                    table.add_row(ssid, signal, timestamp)
-                    found = True
-
+        try:
+            networks.extend(scan_networks())
+        except Exception as e:
+            status(f"Failed to query preferred networks: {e}")
+            return []
         time.sleep(1)
-
-    if found:
-        console.print(table)
-    else:
-        console.print("[bold red]⚠️ No WiFi networks found.[/bold red]")
\ No newline at end of file
+    return show_all(networks, render)
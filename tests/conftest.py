@@ -0,0 +1,110 @@
+import json
+import socket
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import netcut.cache
+
+QTYPES = {1: "A", 28: "AAAA", 16: "TXT"}
+PAGES = json.loads((Path(__file__).parent / "fixtures" / "certspotter_example.com.json").read_text())
+
+@pytest.fixture(autouse=True)
+def cache_root(tmp_path, monkeypatch):
+    # no test ever reads or writes the real ~/.netcut cache
+    root = tmp_path / "cache"
+    monkeypatch.setattr(netcut.cache, "CACHE_ROOT", str(root))
+    return root
+
+class DNSStub:
+    # answers A/AAAA/TXT from `records` ({name: {"A": [...]}}) over loopback
+    # UDP; unknown names get NXDOMAIN, names in `garbage` a truncated reply
+    def __init__(self, records, garbage=()):
+        self.records = records
+        self.garbage = set(garbage)
+        self.queries = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.address = f"127.0.0.1:{self.sock.getsockname()[1]}"
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                data, peer = self.sock.recvfrom(512)
+            except OSError:
+                return
+            self.sock.sendto(self.answer(data), peer)
+
+    def answer(self, data):
+        qid = data[:2]
+        labels, pos = [], 12
+        while data[pos]:
+            labels.append(data[pos + 1:pos + 1 + data[pos]].decode())
+            pos += 1 + data[pos]
+        question = data[12:pos + 5]
+        name = ".".join(labels).lower()
+        rdtype = QTYPES.get(struct.unpack_from("!H", data, pos + 1)[0])
+        self.queries.append((name, rdtype))
+        if name in self.garbage:
+            # claims one answer but ends right after the question
+            return qid + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0) + question
+        if name not in self.records:
+            return qid + struct.pack("!HHHHH", 0x8183, 1, 0, 0, 0) + question
+        answers = b""
+        values = self.records[name].get(rdtype, [])
+        for value in values:
+            if rdtype == "A":
+                rdata = socket.inet_pton(socket.AF_INET, value)
+            elif rdtype == "AAAA":
+                rdata = socket.inet_pton(socket.AF_INET6, value)
+            else:
+                rdata = bytes([len(value)]) + value.encode()
+            answers += struct.pack("!HHHIH", 0xC00C, struct.unpack_from("!H", data, pos + 1)[0], 1, 300, len(rdata)) + rdata
+        return qid + struct.pack("!HHHHH", 0x8180, 1, len(values), 0, 0) + question + answers
+
+    def close(self):
+        self.sock.close()
+
+@pytest.fixture
+def dns_stub():
+    stubs = []
+
+    def start(records, garbage=()):
+        stubs.append(DNSStub(records, garbage))
+        return stubs[-1]
+    yield start
+    for stub in stubs:
+        stub.close()
+
+@pytest.fixture
+def certspotter():
+    # replays the recorded pages, honouring `after` like the real API
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+            requests.append(params)
+            after = params.get("after")
+            index = next((i + 1 for i, page in enumerate(PAGES) if page[-1]["id"] == after), 0 if after is None else len(PAGES))
+            body = json.dumps(PAGES[index] if index < len(PAGES) else []).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/issuances", requests
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,147 @@
+import socket
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from netcut.api_monitor import Histogram, LoadRun, probe
+
+TLS = Path(__file__).parent / "fixtures" / "tls"
+BODY = b"x" * 4096
+
+@pytest.fixture
+def endpoint():
+    # keep-alive HTTP/1.1 endpoint; /slow answers after 20 ms, every request
+    # is logged with its arrival time
+    arrivals = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            arrivals.append((time.perf_counter(), self.command, self.path))
+            if self.path == "/slow":
+                time.sleep(0.02)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            arrivals.append((time.perf_counter(), self.command, body))
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    servers = []
+
+    def start(tls=False):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        server.handle_error = lambda *args: None
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(TLS / "leaf.pem", TLS / "leaf.key")
+            server.socket = context.wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"{'https' if tls else 'http'}://localhost:{server.server_port}"
+    yield start, arrivals
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_closed_loop_reuses_connections(endpoint):
+    start, arrivals = endpoint
+    run = LoadRun(start() + "/")
+    elapsed = run.run(count=200, concurrency=4)
+    summary = run.summary(elapsed, 4, None)
+    assert summary["mode"] == "closed" and summary["completed"] == 200 and not summary["errors"]
+    assert summary["statuses"] == {"200": 200}
+    assert len(arrivals) == 200
+    # one keep-alive connection per worker
+    assert run.connections == 4
+    assert run.bytes == 200 * len(BODY)
+    assert summary["latency"]["count"] == 200
+    assert summary["latency"]["min"] <= summary["latency"]["p50"] <= summary["latency"]["p99"] <= summary["latency"]["max"]
+
+def test_custom_method_and_body(endpoint):
+    start, arrivals = endpoint
+    run = LoadRun(start() + "/items", "POST", b'{"id": 1}', {"Content-Type": "application/json"})
+    run.run(count=5, concurrency=1)
+    assert dict(run.statuses) == {201: 5}
+    assert [entry[1:] for entry in arrivals] == [("POST", b'{"id": 1}')] * 5
+
+def test_phase_breakdown(endpoint):
+    start, _ = endpoint
+    run = LoadRun(start() + "/")
+    run.run(count=10, concurrency=2)
+    assert {phase: run.phases[phase].total for phase in ("dns", "connect", "tls", "ttfb", "body")} == \
+        {"dns": 2, "connect": 2, "tls": 0, "ttfb": 10, "body": 10}
+
+    run = LoadRun(start(tls=True) + "/")
+    run.context.load_verify_locations(TLS / "ca.pem")
+    run.run(count=10, concurrency=2)
+    assert not run.errors
+    assert {phase: run.phases[phase].total for phase in ("dns", "connect", "tls", "ttfb", "body")} == \
+        {"dns": 2, "connect": 2, "tls": 2, "ttfb": 10, "body": 10}
+    # a handshake costs more than the loopback connect before it
+    assert run.phases["tls"].min > run.phases["connect"].min
+
+def test_open_loop_holds_the_schedule(endpoint):
+    start, arrivals = endpoint
+    run = LoadRun(start() + "/")
+    elapsed = run.run(concurrency=4, duration=0.5, rate=40)
+    assert run.latency.total == 20 and elapsed >= 0.45
+    gaps = [b[0] - a[0] for a, b in zip(arrivals, arrivals[1:])]
+    assert min(gaps) > 0.015 and max(gaps) < 0.1
+
+def test_open_loop_charges_queueing_to_latency(endpoint):
+    # one worker can serve 50 req/s; asked for 200 req/s the backlog grows,
+    # and latency measured from the intended start must show it even though
+    # every single response took ~20 ms
+    start, _ = endpoint
+    run = LoadRun(start() + "/slow")
+    run.run(concurrency=1, duration=0.25, rate=200)
+    assert run.latency.total == 50
+    assert run.phases["ttfb"].max < 200_000
+    assert run.latency.max > 500_000
+
+def test_histogram_percentiles_track_a_uniform_distribution():
+    histogram = Histogram()
+    for us in range(1, 100_001):
+        histogram.record(us * 1000)
+    assert histogram.total == 100_000 and histogram.min == 1 and histogram.max == 100_000
+    for q in (50, 90, 99, 99.9):
+        assert histogram.percentile(q) == pytest.approx(q * 1000, rel=0.016)
+    summary = histogram.summary()
+    assert summary["p50"] == pytest.approx(50, rel=0.016) and summary["p999"] == pytest.approx(99.9, rel=0.016)
+    assert summary["mean"] == pytest.approx(50.0005, abs=0.001)
+
+def test_histogram_small_values_are_exact_and_merge_adds_up():
+    low, high = Histogram(), Histogram()
+    for us in range(100):
+        (low if us % 2 else high).record(us * 1000)
+    low.merge(high)
+    assert low.total == 100 and low.min == 0 and low.max == 99
+    assert [low.percentile(q) for q in (1, 50, 90, 100)] == [0, 49, 89, 99]
+    assert Histogram().percentile(50) is None and Histogram().summary() is None
+
+def test_probe_times_out_on_a_stalled_endpoint():
+    # the kernel completes the handshake but nobody ever answers
+    listener = socket.create_server(("127.0.0.1", 0))
+    try:
+        started = time.perf_counter()
+        result = probe(f"http://127.0.0.1:{listener.getsockname()[1]}/", {}, timeout=0.3)
+    finally:
+        listener.close()
+    assert time.perf_counter() - started < 3
+    assert not result["ok"] and "timed out" in result["error"]
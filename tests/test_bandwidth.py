@@ -0,0 +1,118 @@
+import json
+import math
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pytest
+
+from netcut import bandwidth, output
+from netcut.bandwidth import BandwidthMonitor, Meter, ProcessTraffic, show_bandwidth
+
+Counters = namedtuple("Counters", "bytes_sent bytes_recv")
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def counters(monkeypatch):
+    # net_io_counters hands out the snapshots queued here one per call, and
+    # the monitor's clock only moves when the test moves it
+    queue = []
+    clock = Clock()
+    monkeypatch.setattr(bandwidth.psutil, "net_io_counters", lambda pernic: queue.pop(0))
+    monkeypatch.setattr(bandwidth, "time", SimpleNamespace(monotonic=clock, time=time.time, sleep=time.sleep))
+    return queue, clock
+
+def test_meter_smooths_and_keeps_a_window_of_samples():
+    meter = Meter(4)
+    meter.update(100.0, 50.0, 0.5)
+    assert (meter.tx, meter.rx) == (100.0, 50.0)
+    meter.update(300.0, 50.0, 0.5)
+    assert (meter.tx, meter.rx) == (200.0, 50.0)
+    for total in (10.0, 20.0, 30.0):
+        meter.update(total, 0.0, 0.5)
+    # the 150 sample fell out of the four-sample ring, 350 did not
+    assert meter.peak() == 350.0
+    assert meter.p95() == 350.0 and sorted(meter.ring) == [10.0, 20.0, 30.0, 350.0]
+    assert Meter(4).peak() == 0.0 and Meter(4).p95() == 0.0
+
+def test_monitor_rates_per_interface(counters):
+    queue, clock = counters
+    queue += [{"eth0": Counters(1000, 5000), "lo": Counters(0, 0)},
+              {"eth0": Counters(3000, 9000), "lo": Counters(500, 500), "wg0": Counters(10 ** 6, 10 ** 6)},
+              {"eth0": Counters(100, 9000), "wg0": Counters(10 ** 6 + 4000, 10 ** 6)}]
+    monitor = BandwidthMonitor(window=10)
+    clock.now += 2.0
+    monitor.sample()
+    # wg0 showed up between samples, so it has no rate yet
+    assert sorted(monitor.meters) == ["eth0", "lo"]
+    assert (monitor.meters["eth0"].tx, monitor.meters["eth0"].rx) == (1000.0, 2000.0)
+
+    clock.now += 2.0
+    monitor.sample()
+    # lo went away; eth0's counters were reset, which reads as no traffic
+    assert sorted(monitor.meters) == ["eth0", "wg0"]
+    alpha = 1 - math.exp(-2.0 / bandwidth.SMOOTHING)
+    assert monitor.meters["eth0"].tx == pytest.approx(1000.0 * (1 - alpha))
+    assert monitor.meters["wg0"].tx == 2000.0
+
+    records = monitor.records()
+    assert [(r["interface"], r["tx_bps"], r["peak_bps"]) for r in records] == \
+        [("eth0", round(1000.0 * (1 - alpha)), 3000), ("wg0", 2000, 2000)]
+    assert all(r["pid"] is None and r["process"] is None for r in records)
+
+def test_one_shot_emits_records(counters, monkeypatch, capsys):
+    queue, clock = counters
+    queue += [{"eth0": Counters(0, 0)}, {"eth0": Counters(2048, 1024)}]
+    monkeypatch.setattr(output, "mode", "jsonl")
+    monkeypatch.setattr(output, "writer", None)
+    show_bandwidth(interval=0.1)
+    record, = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert record["interface"] == "eth0" and record["tx_bps"] > 0 and record["rx_bps"] > 0
+
+def test_process_traffic_charges_loopback_bytes_to_their_owner():
+    try:
+        traffic = ProcessTraffic(10)
+    except (PermissionError, AttributeError):
+        pytest.skip("needs an AF_PACKET socket")
+    server = socket.create_server(("127.0.0.1", 0))
+    try:
+        client = socket.create_connection(server.getsockname())
+        conn, _ = server.accept()
+        traffic.refresh()
+        assert traffic.owner(6, socket.inet_aton("127.0.0.1"), client.getsockname()[1]) == os.getpid()
+        received = []
+
+        def drain():
+            while sum(received) < 20_000:
+                received.append(len(conn.recv(65536)))
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+        client.sendall(bytes(20_000))
+        reader.join(5)
+        # let the capture thread catch up with the last segments and ACKs
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and min(traffic.counts.get(os.getpid(), [0, 0])) < 20_000:
+            time.sleep(0.05)
+        time.sleep(0.2)
+        traffic.sample(1.0, 1.0)
+        meter = traffic.meters[os.getpid()]
+        # both ends are ours: every byte goes out once and comes in once
+        assert meter.tx >= 20_000 and meter.rx >= 20_000
+        assert traffic.name(os.getpid())
+        # a quiet process fades out and is forgotten
+        traffic.sample(1.0, 1.0)
+        assert os.getpid() not in traffic.meters
+        client.close()
+        conn.close()
+    finally:
+        server.close()
+        traffic.close()
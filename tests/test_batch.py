@@ -0,0 +1,51 @@
+import json
+import socket
+
+import pytest
+
+from netcut import output
+from netcut.batch import run_batch
+
+NAMES = ["*.example.com", "api.example.com", "dev.example.com", "example.com",
+         "gone.example.com", "mail.example.com", "v6.example.com", "www.example.com"]
+
+@pytest.fixture
+def listener():
+    sock = socket.create_server(("127.0.0.1", 0))
+    yield sock.getsockname()[1]
+    sock.close()
+
+def run(tmp_path, capsys, jobs):
+    path = tmp_path / "jobs.txt"
+    path.write_text("\n".join(json.dumps(job) for job in jobs) + "\n")
+    results = {r["id"]: r for r in run_batch(str(path), concurrency=2)}
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(json.loads(line)["id"] for line in lines) == sorted(results)
+    return results
+
+def test_each_job_uses_its_own_output_flags(tmp_path, capsys, certspotter, listener):
+    url, _ = certspotter
+    results = run(tmp_path, capsys, [
+        {"id": "json", "args": f"--json subdomains example.com --ct-url {url} --no-resolve"},
+        {"id": "jsonl", "args": ["check", "127.0.0.1", "--no-icmp", "--port", str(listener), "--count", "2",
+                                 "--interval", "0", "--jsonl"]},
+    ])
+    assert [r["name"] for r in results["json"]["records"]] == NAMES
+    # the progress lines went to the job's stderr, not into its records
+    assert "Searching CertSpotter" in results["json"]["stderr"]
+    [record] = results["jsonl"]["records"]
+    assert record["tcp"]["state"] == "open" and record["tcp"]["sent"] == 2
+    assert output.mode is None and not output.structured()
+
+def test_plain_job_keeps_status_out_of_its_output(tmp_path, capsys, certspotter, listener):
+    url, _ = certspotter
+    results = run(tmp_path, capsys, [
+        {"id": "plain", "args": f"subdomains example.com --ct-url {url} --no-resolve"},
+        {"id": "csv", "args": f"--csv check 127.0.0.1 --no-icmp --port {listener} --count 1"},
+    ])
+    plain = results["plain"]
+    assert plain["ok"] and "records" not in plain
+    assert plain["output"].split() == [token for name in NAMES for token in ("•", name)]
+    assert "✅ Found 8 subdomains" in plain["stderr"]
+    header, row = results["csv"]["output"].splitlines()
+    assert header.startswith("host,ip,") and row.startswith("127.0.0.1,127.0.0.1,")
@@ -0,0 +1,86 @@
+import json
+import socket
+import time
+
+import pytest
+
+from netcut import check, output
+from netcut.check import Pinger, Target, check_host, probe_tcp, summarize
+from netcut.inet import checksum
+from netcut.portscan import CLOSED, OPEN
+
+@pytest.fixture
+def pinger():
+    # the loopback interface answers echo requests like any live host
+    try:
+        pinger = Pinger()
+    except PermissionError:
+        pytest.skip("no raw or unprivileged ICMP sockets here")
+    yield pinger
+    pinger.close()
+
+@pytest.fixture
+def listener():
+    sock = socket.create_server(("127.0.0.1", 0), backlog=64)
+    yield sock.getsockname()[1]
+    sock.close()
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_checksum_matches_rfc1071_example():
+    assert checksum(bytes.fromhex("0001f203f4f5f6f7")) == 0x220D
+    # odd lengths are padded with a zero byte
+    assert checksum(b"\x01") == checksum(b"\x01\x00")
+
+def test_summarize_orders_samples_by_probe_number():
+    result = summarize(4, [(2, 30.0), (0, 10.0), (1, 20.0)])
+    assert result == {"sent": 4, "received": 3, "loss": 25.0, "min": 10.0, "avg": 20.0, "max": 30.0, "jitter": 10.0}
+
+def test_icmp_rounds_follow_the_interval(pinger):
+    targets = [Target("localhost", "127.0.0.1"), Target("lo2", "127.0.0.2")]
+    started = time.perf_counter()
+    pinger.run(targets, count=3, interval=0.1, timeout=1.0)
+    assert time.perf_counter() - started >= 0.2
+    for target in targets:
+        assert target.icmp_sent == 3
+        assert sorted(number for number, _ in target.icmp) == [0, 1, 2]
+        assert all(rtt < 1000 for _, rtt in target.icmp)
+    assert not pinger.pending
+
+def test_tcp_probes_keep_interval_and_send_order(listener):
+    open_target, closed_target = Target("up", "127.0.0.1"), Target("down", "127.0.0.1")
+    port = closed_port()
+    started = time.perf_counter()
+    probe_tcp([open_target], listener, count=3, interval=0.15, timeout=1.0)
+    assert time.perf_counter() - started >= 0.3
+    assert [number for number, _ in open_target.tcp] == [0, 1, 2]
+    assert open_target.tcp_states == {OPEN: 3}
+    probe_tcp([closed_target], port, count=2, interval=0, timeout=1.0)
+    assert closed_target.tcp_sent == 2 and closed_target.tcp_states == {CLOSED: 2} and not closed_target.tcp
+
+def test_check_host_reports_both_probes(pinger, listener, capsys):
+    # two names for one address are still probed and matched separately
+    results = check_host(["127.0.0.1", "localhost", "127.0.0.1"], port=listener, count=2, interval=0.05,
+                         timeout=1.0, jsonl=True)
+    assert [r["host"] for r in results] == ["127.0.0.1", "localhost"]
+    for result in results:
+        assert result["icmp"]["received"] == 2 and result["icmp"]["loss"] == 0
+        assert result["tcp"]["state"] == OPEN and result["tcp"]["received"] == 2
+    assert capsys.readouterr().out.count('"ip": "127.0.0.1"') == 2
+
+def test_no_icmp_rights_falls_back_to_tcp(listener, monkeypatch, capsys):
+    def denied():
+        raise PermissionError(1, "Operation not permitted")
+
+    monkeypatch.setattr(check, "Pinger", denied)
+    monkeypatch.setattr(output, "mode", "jsonl")
+    monkeypatch.setattr(output, "writer", None)
+    results = check_host(["127.0.0.1"], port=listener, count=2, interval=0, timeout=1.0, jsonl=True)
+    assert results[0]["icmp"] is None and results[0]["tcp"]["state"] == OPEN
+    out, err = capsys.readouterr()
+    # stdout carries nothing but the record stream
+    assert [json.loads(line)["host"] for line in out.splitlines()] == ["127.0.0.1"]
+    assert "checking TCP only" in err
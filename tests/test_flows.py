@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import math
+import socket
+import struct
+import sys
+
+from rich.console import Console
+
+from netcut.flows import FlowExporter, FlowTable, parse_frame, render_flows
+from netcut.packets import raw_matcher
+
+def ipv4(proto, src, dst, l4, fragment=0):
+    return struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(l4), 1, fragment, 64, proto, 0,
+                       socket.inet_aton(src), socket.inet_aton(dst)) + l4
+
+def ipv6(proto, src, dst, l4):
+    return struct.pack("!IHBB16s16s", 6 << 28, len(l4), proto, 64, socket.inet_pton(socket.AF_INET6, src),
+                       socket.inet_pton(socket.AF_INET6, dst)) + l4
+
+def ports(sport, dport):
+    return struct.pack("!HH", sport, dport) + bytes(16)
+
+def ether(payload, ethertype=0x0800, vlan=None):
+    tag = struct.pack("!HH", 0x8100, vlan) if vlan is not None else b""
+    return b"\x02" * 6 + b"\x04" * 6 + tag + struct.pack("!H", ethertype) + payload
+
+def key(proto, src, dst, sport=0, dport=0):
+    family = socket.AF_INET6 if ":" in src else socket.AF_INET
+    return proto, socket.inet_pton(family, src), socket.inet_pton(family, dst), sport, dport
+
+def test_parse_frame_keys_ipv4_and_ipv6():
+    tcp = key(6, "10.0.0.1", "10.0.0.2", 40000, 443)
+    assert parse_frame(ether(ipv4(6, "10.0.0.1", "10.0.0.2", ports(40000, 443))), 14) == tcp
+    assert parse_frame(ether(ipv6(17, "2001:db8::1", "2001:db8::2", ports(5353, 53)), 0x86DD), 14) == \
+        key(17, "2001:db8::1", "2001:db8::2", 5353, 53)
+    # ICMP has no ports, and neither does a fragment past the first
+    assert parse_frame(ether(ipv4(1, "10.0.0.1", "10.0.0.2", bytes(8))), 14) == key(1, "10.0.0.1", "10.0.0.2")
+    assert parse_frame(ether(ipv4(17, "10.0.0.1", "10.0.0.2", ports(1, 2), fragment=185)), 14) == \
+        key(17, "10.0.0.1", "10.0.0.2")
+
+def test_parse_frame_link_headers_and_vlan_offsets():
+    packet = ipv4(17, "192.0.2.1", "192.0.2.2", ports(1234, 53))
+    expected = key(17, "192.0.2.1", "192.0.2.2", 1234, 53)
+    assert parse_frame(ether(packet, vlan=42), 14) == expected
+    assert parse_frame(packet, 0) == expected
+    assert parse_frame(b"\x02\x00\x00\x00" + packet, 4) == expected
+    assert parse_frame(bytes(16) + packet, 16) == expected
+    # the frame can sit anywhere in a bigger buffer, as in a mapped capture
+    buffer = b"junk" + ether(packet, vlan=7) + b"next record"
+    assert parse_frame(buffer, 14, 4, 4 + 18 + len(packet)) == expected
+
+def test_parse_frame_rejects_what_it_cannot_key():
+    packet = ipv4(6, "10.0.0.1", "10.0.0.2", ports(1, 2))
+    assert parse_frame(ether(bytes(28), 0x0806), 14) is None
+    assert parse_frame(ether(packet)[:30], 14) is None
+    # a VLAN tag pushes the IP header past the end of a short frame
+    assert parse_frame(ether(packet[:18], vlan=1), 14) is None
+    assert parse_frame(ether(ipv6(6, "::1", "::2", b"")[:30], 0x86DD), 14) is None
+    # too short for ports, still a flow
+    assert parse_frame(ether(ipv4(6, "10.0.0.1", "10.0.0.2", b"\x00")), 14) == key(6, "10.0.0.1", "10.0.0.2")
+
+def test_lru_eviction_drops_the_least_recently_seen_flow():
+    evicted = []
+    table = FlowTable(3, math.inf, on_evict=lambda flow: evicted.append(flow.key[3]))
+    for port in (1, 2, 3):
+        table.add(key(6, "10.0.0.1", "10.0.0.2", port, 80), 100, 0.0)
+    table.add(key(6, "10.0.0.1", "10.0.0.2", 1, 80), 100, 0.1)
+    table.add(key(6, "10.0.0.1", "10.0.0.2", 4, 80), 100, 0.2)
+    table.add(key(6, "10.0.0.1", "10.0.0.2", 5, 80), 100, 0.3)
+    assert evicted == [2, 3]
+    assert [flow.key[3] for flow in table.snapshot()] == [1, 4, 5]
+    table.drain()
+    assert evicted == [2, 3, 1, 4, 5] and len(table) == 0
+    assert (table.packets, table.bytes, table.evicted) == (6, 600, 5)
+
+def test_idle_flows_expire_in_last_seen_order():
+    evicted = []
+    table = FlowTable(100, 10, on_evict=lambda flow: evicted.append((flow.key[3], flow.packets)))
+    a, b, c = (key(17, "10.0.0.1", "10.0.0.2", port, 53) for port in (1, 2, 3))
+    table.add(a, 60, 0.0)
+    table.add(b, 60, 5.0)
+    table.add(c, 60, 12.0)
+    assert evicted == [(1, 1)]
+    table.add(b, 60, 13.0)
+    table.add(a, 60, 30.0)
+    # c went quiet before b did; a came back as a new flow
+    assert evicted == [(1, 1), (3, 1), (2, 2)]
+    assert [flow.packets for flow in table.snapshot()] == [1]
+
+def test_merged_partials_match_a_single_pass():
+    packets = [(key(6, "10.0.0.1", "10.0.0.2", 1000 + i % 7, 443), 64 + i, 100.0 + i) for i in range(50)]
+    whole = FlowTable(sys.maxsize, math.inf)
+    for packet in packets:
+        whole.add(*packet)
+    merged = FlowTable(sys.maxsize, math.inf)
+    for part in (packets[:17], packets[17:31], packets[31:]):
+        table = FlowTable(sys.maxsize, math.inf)
+        for packet in part:
+            table.add(*packet)
+        for partial in table.partial():
+            merged.merge(*partial)
+    assert sorted(merged.partial()) == sorted(whole.partial())
+    assert (merged.packets, merged.bytes) == (whole.packets, whole.bytes)
+
+def test_rate_covers_the_trailing_window():
+    table = FlowTable(window=4)
+    flow = key(6, "10.0.0.1", "10.0.0.2", 1, 2)
+    for size, ts in ((100, 100.2), (200, 101.5), (400, 103.9)):
+        table.add(flow, size, ts)
+    (_, rate), = table.top(1, "rate")
+    assert rate == 700 / 4
+    assert table.flows[flow].rate(105.0) == 400 / 4
+    assert table.flows[flow].rate(107.0) == 0.0
+
+def test_top_talkers_and_export(tmp_path):
+    table = FlowTable()
+    small, big = key(17, "10.0.0.1", "10.0.0.2", 1, 53), key(6, "2001:db8::1", "2001:db8::2", 2, 443)
+    table.add(small, 100, 1.0)
+    table.add(big, 1500, 2.0)
+    table.add(big, 1500, 3.5)
+    assert [flow.key for flow, _ in table.top(2)] == [big, small]
+    console = Console(file=io.StringIO(), width=120)
+    console.print(render_flows(table, 1))
+    assert "[2001:db8::1]:2" in console.file.getvalue() and "10.0.0.1" not in console.file.getvalue()
+
+    for name in ("flows.csv", "flows.jsonl"):
+        exporter = FlowExporter(str(tmp_path / name))
+        for flow in table.snapshot():
+            exporter.write(flow)
+        exporter.close()
+    rows = list(csv.DictReader(open(tmp_path / "flows.csv")))
+    assert rows[1] == {"proto": "TCP", "src": "2001:db8::1", "sport": "2", "dst": "2001:db8::2", "dport": "443",
+                       "packets": "2", "bytes": "3000", "first": "2.0", "last": "3.5"}
+    records = [json.loads(line) for line in open(tmp_path / "flows.jsonl")]
+    assert records[0] == {"proto": "UDP", "src": "10.0.0.1", "sport": 1, "dst": "10.0.0.2", "dport": 53,
+                          "packets": 1, "bytes": 100, "first": 1.0, "last": 1.0}
+
+def test_raw_matcher_follows_bpf_semantics():
+    assert raw_matcher() is None
+    flow = key(6, "10.0.0.1", "10.0.0.2", 40000, 443)
+    assert raw_matcher(port="443")(flow) and raw_matcher(port=40000)(flow)
+    assert not raw_matcher(port=80)(flow)
+    assert raw_matcher(proto="TCP")(flow) and not raw_matcher(proto="udp")(flow)
+    assert raw_matcher(src="10.0.0.1", dst="10.0.0.2")(flow)
+    assert not raw_matcher(src="10.0.0.2")(flow) and not raw_matcher(dst="10.0.0.1")(flow)
+    assert raw_matcher(proto="icmpv6", src="2001:db8::1")(key(58, "2001:db8::1", "2001:db8::2"))
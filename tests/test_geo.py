@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+
+from netcut.geo import INDEX_MAGIC, GeoCache, RangeDatabase, iter_hosts
+
+def test_cache_hits_do_not_rewrite_the_file(tmp_path):
+    path = tmp_path / "geo.json"
+    cache = GeoCache(str(path))
+    cache.put("192.0.2.1", ["NL", None, "Amsterdam", None])
+    cache.save()
+    written = path.stat().st_mtime_ns
+    os.utime(path, ns=(written - 10 ** 9, written - 10 ** 9))
+
+    cache = GeoCache(str(path))
+    assert cache.get("192.0.2.1") == ("NL", None, "Amsterdam", None)
+    assert cache.get("192.0.2.2") is None
+    cache.save()
+    assert path.stat().st_mtime_ns == written - 10 ** 9
+
+def test_unreadable_index_is_rebuilt(tmp_path, cache_root):
+    csv = tmp_path / "ranges.csv"
+    csv.write_text("1.0.0.0,1.0.0.255,AU,Queensland,Brisbane\n3232235520,3232235775,ZZ,,,LAN\n")
+    assert RangeDatabase.load(str(csv)).lookup("1.0.0.7") == ("AU", "Queensland", "Brisbane", None)
+    [index] = (cache_root / "geo").iterdir()
+    # written by some other version, or cut short by a crash
+    assert index.read_bytes().startswith(INDEX_MAGIC)
+    index.write_bytes(b"cnetcut.geo\nRangeIndex\n.")
+    db = RangeDatabase.load(str(csv))
+    assert db.lookup("192.168.0.9") == ("ZZ", None, None, "LAN")
+    assert len(db) == 2
+    index.write_bytes(index.read_bytes()[:-3])
+    assert RangeDatabase.load(str(csv)).lookup("1.0.0.7") == ("AU", "Queensland", "Brisbane", None)
+
+def test_index_round_trips_both_families(tmp_path, cache_root):
+    csv = tmp_path / "ranges.csv"
+    csv.write_text("1.0.0.0,1.0.0.255,AU,,,APNIC\n"
+                   "2001:db8::,2001:db8::ffff,NL,North Holland,Amsterdam,Example\n"
+                   "2001:db8:1::,2001:db8:1:ffff:ffff:ffff:ffff:ffff,DE,,Berlin\n")
+    built = RangeDatabase.load(str(csv))
+    loaded = RangeDatabase.load(str(csv))
+    assert loaded.v4 == built.v4 and loaded.v6 == built.v6 and loaded.records == built.records
+    assert loaded.lookup("2001:db8::42") == ("NL", "North Holland", "Amsterdam", "Example")
+    assert loaded.lookup("2001:db8:1:ffff::1") == ("DE", None, "Berlin", None)
+    assert loaded.lookup("2001:db8:2::1") is None and loaded.lookup("1.0.1.0") is None
+
+def test_index_follows_path_and_content(tmp_path, cache_root):
+    # same name, size and mtime in two places, then an edit that keeps both
+    first, second = tmp_path / "a" / "ranges.csv", tmp_path / "b" / "ranges.csv"
+    for path, country in ((first, "AU"), (second, "NZ")):
+        path.parent.mkdir()
+        path.write_text(f"1.0.0.0,1.0.0.255,{country},,\n")
+        os.utime(path, ns=(10 ** 18, 10 ** 18))
+    assert RangeDatabase.load(str(first)).lookup("1.0.0.1")[0] == "AU"
+    assert RangeDatabase.load(str(second)).lookup("1.0.0.1")[0] == "NZ"
+    first.write_text("1.0.0.0,1.0.0.255,JP,,\n")
+    os.utime(first, ns=(10 ** 18, 10 ** 18))
+    assert RangeDatabase.load(str(first)).lookup("1.0.0.1")[0] == "JP"
+    assert len(list((cache_root / "geo").iterdir())) == 2
+
+def test_reading_hosts_from_stdin_leaves_it_open(monkeypatch):
+    stdin = io.StringIO("# hosts\n192.0.2.1\n\nexample.com\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert list(iter_hosts(["198.51.100.7"], "-")) == ["198.51.100.7", "192.0.2.1", "example.com"]
+    assert not stdin.closed
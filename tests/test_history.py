@@ -0,0 +1,151 @@
+import os
+
+import pytest
+
+from netcut.history import COUNT, ROLLUP, START, UP, HistoryStore, Summary, series_key
+
+DAY = 86400
+BASE = 19700 * DAY
+
+def samples(count, step, start=BASE):
+    # one long outage plus scattered single failures; latencies are exact in
+    # float32, the on-disk type, so stitched and raw answers compare equal
+    for i in range(count):
+        up = not (count // 3 <= i < count // 3 + 40 or i % 97 == 0)
+        yield start + i * step, up, (i % 50) * 0.75 + 0.25 if up else None
+
+def fill(store, name, rows):
+    rows = list(rows)
+    for ts, up, latency in rows:
+        store.append(name, ts, up, latency)
+    return rows
+
+def rollups(series, res):
+    with open(series.rollup_path(res), "rb") as f:
+        return list(ROLLUP.iter_unpack(f.read()))
+
+def raw_summary(rows, start=-1, end=float("inf")):
+    summary = Summary()
+    picked = [row for row in rows if start <= row[0] < end]
+    summary.add_samples([row[0] for row in picked], [row[1] for row in picked],
+                        [float("nan") if row[2] is None else row[2] for row in picked])
+    return summary
+
+def same(stitched, raw):
+    assert stitched.count == raw.count and stitched.up == raw.up
+    assert stitched.uptime() == pytest.approx(raw.uptime())
+    assert stitched.mean() == pytest.approx(raw.mean())
+    assert stitched.lat_min == raw.lat_min and stitched.lat_max == raw.lat_max
+    for p in (50, 90, 95, 99):
+        assert stitched.percentile(p) == raw.percentile(p)
+    assert stitched.longest_downtime() == pytest.approx(raw.longest_downtime())
+
+def test_append_and_reopen(tmp_path):
+    store = HistoryStore(tmp_path)
+    rows = fill(store, "api:https://example.com/health", samples(500, 30))
+    store.close()
+
+    store = HistoryStore(tmp_path)
+    assert store.names() == ["api:https://example.com/health"]
+    series = store.get("api:https://example.com/health")
+    ts, up, lat = series.read()
+    assert list(ts) == [row[0] for row in rows]
+    assert list(up) == [int(row[1]) for row in rows]
+    assert series.latest() == (rows[-1][0], rows[-1][1], pytest.approx(rows[-1][2]))
+    # appending after a reopen continues the open rollup bucket
+    store.append("api:https://example.com/health", rows[-1][0] + 1, True, 1.0)
+    assert rollups(series, 60)[-1][COUNT] == sum(1 for row in rows if row[0] >= rollups(series, 60)[-1][START]) + 1
+    store.close()
+
+def test_reopen_cuts_ragged_columns(tmp_path):
+    store = HistoryStore(tmp_path)
+    fill(store, "host", samples(10, 60))
+    store.close()
+    series = store.get("host")
+    # a crash between column writes: the timestamp landed, the rest did not
+    with open(series.column_path("ts"), "ab") as f:
+        f.write(b"\0" * 8)
+    store.append("host", BASE + 3600, True, 2.0)
+    store.close()
+    ts, up, lat = series.read()
+    assert len(ts) == len(up) == len(lat) == 11 and ts[-1] == BASE + 3600
+
+def test_distinct_names_never_share_a_series(tmp_path):
+    names = ["a:b", "a_b", "A_B", "..", "x" * 300]
+    assert len({series_key(name) for name in names}) == len(names)
+    store = HistoryStore(tmp_path)
+    for i, name in enumerate(names):
+        store.append(name, BASE + i, True, float(i))
+    store.close()
+    store = HistoryStore(tmp_path)
+    assert sorted(store.names()) == sorted(names)
+    for i, name in enumerate(names):
+        assert store.get(name).latest() == (BASE + i, True, float(i))
+    assert all(os.path.dirname(store.get(name).path) == str(tmp_path) for name in names)
+
+def test_rollup_boundaries(tmp_path):
+    store = HistoryStore(tmp_path)
+    edges = [BASE + 59.999, BASE + 60, BASE + 3599.5, BASE + 3600, BASE + DAY - 0.001, BASE + DAY]
+    for ts in edges:
+        store.append("edge", ts, True, 1.0)
+    series = store.get("edge")
+    assert [(r[START], r[COUNT]) for r in rollups(series, 60)] == \
+        [(BASE, 1), (BASE + 60, 1), (BASE + 3540, 1), (BASE + 3600, 1), (BASE + DAY - 60, 1), (BASE + DAY, 1)]
+    assert [(r[START], r[COUNT]) for r in rollups(series, 3600)] == \
+        [(BASE, 3), (BASE + 3600, 1), (BASE + DAY - 3600, 1), (BASE + DAY, 1)]
+    assert [(r[START], r[COUNT]) for r in rollups(series, DAY)] == [(BASE, 5), (BASE + DAY, 1)]
+    # a late sample lands in the raw columns but leaves closed buckets alone
+    store.append("edge", BASE + 30, False, None)
+    assert len(series.read()[0]) == 7
+    assert rollups(series, DAY)[0][COUNT] == 5 and rollups(series, DAY)[0][UP] == 5
+    store.close()
+
+def test_queries_stitch_rollups_and_raw_samples(tmp_path):
+    store = HistoryStore(tmp_path)
+    rows = fill(store, "stitch", samples(7000, 37.3))
+    series = store.get("stitch")
+    # unaligned ends force raw samples and minute/hour rollups at both edges
+    # and whole days in the middle
+    for start, end in ((None, None), (BASE + 1234.5, BASE + 2 * DAY + 7777.7), (BASE + 30, BASE + 90),
+                       (BASE + 3 * 3600 + 17, BASE + 9 * 3600 + 5)):
+        summary = series.summary(start, end)
+        same(summary, raw_summary(rows, start if start is not None else -1, end if end is not None else float("inf")))
+    summary = series.summary()
+    assert summary.count == 7000 and 0 < summary.uptime() < 100
+    # the outage runs from its first failed sample to the next good one
+    assert summary.longest_downtime() == pytest.approx(40 * 37.3)
+    store.close()
+
+def test_compaction_drops_raw_data_but_keeps_rollups(tmp_path):
+    store = HistoryStore(tmp_path)
+    rows = fill(store, "long", samples(45 * 144, 600))
+    series = store.get("long")
+    before = series.summary()
+    now = rows[-1][0] + 1
+    store.compact(now)
+
+    ts, _, _ = series.read()
+    assert ts[0] >= now - 7 * DAY and len(ts) == sum(1 for row in rows if row[0] >= now - 7 * DAY)
+    assert rollups(series, 60)[0][START] >= now - 30 * DAY - 60
+    assert rollups(series, 3600)[0][START] == BASE
+    # the whole range is still answered, from day and hour rollups where the
+    # raw samples are gone
+    same(series.summary(), before)
+    old = series.summary(BASE, BASE + 10 * DAY)
+    assert old.count == 10 * 144 and old.percentile(50) == raw_summary(rows, BASE, BASE + 10 * DAY).percentile(50)
+
+    # appending after compaction picks up where the rollups left off
+    store.append("long", now + 5, True, 3.0)
+    assert series.summary().count == len(rows) + 1
+    store.close()
+
+def test_compaction_is_deferred_until_a_quarter_expires(tmp_path):
+    store = HistoryStore(tmp_path)
+    rows = fill(store, "short", samples(8 * 144, 600))
+    series = store.get("short")
+    size = os.path.getsize(series.column_path("ts"))
+    store.compact(rows[-1][0] + 1)
+    assert os.path.getsize(series.column_path("ts")) == size
+    store.compact(rows[-1][0] + 3 * DAY)
+    assert os.path.getsize(series.column_path("ts")) < size
+    store.close()
@@ -0,0 +1,69 @@
+import socket
+import threading
+
+import pytest
+
+from netcut import linktest
+from netcut.linktest import Server, run_test
+
+@pytest.fixture
+def server():
+    # serves one test; finish() waits for the server's own result
+    results = []
+    server = Server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve, args=(results.append, True), daemon=True)
+    thread.start()
+
+    def finish():
+        thread.join(5)
+        return results
+    yield server, finish
+
+@pytest.fixture
+def payloads(monkeypatch):
+    # every temp file handed to the senders, to check it gets closed
+    files = []
+    original = linktest.payload
+
+    def payload(length):
+        source = original(length)
+        files.append(source[0])
+        return source
+    monkeypatch.setattr(linktest, "payload", payload)
+    return files
+
+@pytest.mark.parametrize("protocol, reverse", [("tcp", False), ("tcp", True), ("udp", False), ("udp", True)])
+def test_loopback_modes(server, payloads, protocol, reverse):
+    server, finish = server
+    intervals = []
+    result = run_test("127.0.0.1", server.port, protocol, reverse, streams=2, duration=0.6, interval=0.2, mbps=20,
+                      on_interval=intervals.append)
+    assert "error" not in result
+    assert result["bytes"] > 0 and result["seconds"] > 0
+    assert result["idle_latency_ms"] is not None
+    assert intervals and all("bits_per_second" in interval or "bytes" in interval for interval in intervals)
+    if protocol == "udp":
+        assert result["packets"] > 0 and result["lost"] >= 0
+    # the server reports the same test from its side
+    results = finish()
+    assert results[-1]["protocol"] == protocol and results[-1]["direction"] == ("download" if reverse else "upload")
+    assert len(payloads) == (protocol == "tcp") and all(f.closed for f in payloads)
+
+def test_stray_datagram_does_not_break_udp_hellos(server):
+    server, finish = server
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as stray:
+        stop = threading.Event()
+
+        def spam():
+            while not stop.is_set():
+                stray.sendto(b"hi", ("127.0.0.1", server.port))
+                stop.wait(0.01)
+        thread = threading.Thread(target=spam, daemon=True)
+        thread.start()
+        try:
+            result = run_test("127.0.0.1", server.port, "udp", True, streams=1, duration=0.3, interval=0.1, mbps=5)
+        finally:
+            stop.set()
+            thread.join()
+    assert "error" not in result and result["packets"] > 0
+    assert not any("error" in r for r in finish())
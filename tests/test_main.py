@@ -0,0 +1,19 @@
+import pytest
+
+from netcut.main import build_parser, output_mode
+
+@pytest.mark.parametrize("argv, mode", [
+    (["check", "example.com"], None),
+    (["--csv", "check", "example.com"], "csv"),
+    (["check", "example.com", "--jsonl"], "jsonl"),
+    (["stats", "--json"], "json"),
+    # --output of proxy and monitor is a file path, not an output format
+    (["proxy", "--file", "proxies.txt", "--output", "ranked.json"], None),
+    (["monitor", "services.yaml"], None),
+    (["--jsonl", "proxy", "--file", "proxies.txt", "--output", "ranked.json"], "jsonl"),
+])
+def test_output_mode(argv, mode):
+    args = build_parser().parse_args(argv)
+    assert output_mode(args) == mode
+    if hasattr(args, "jsonl"):
+        assert args.jsonl == (mode is not None)
@@ -0,0 +1,80 @@
+import json
+import subprocess
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from netcut import neighbors, output
+from netcut.neighbors import NeighborTable, normalize_mac, read_arp_command, read_proc_arp, watch_neighbors
+
+PROC_ARP = """IP address       HW type     Flags       HW address            Mask     Device
+192.168.1.1      0x1         0x2         aa:bb:cc:00:00:01     *        eth0
+192.168.1.7      0x1         0x0         00:00:00:00:00:00     *        eth0
+192.168.1.20     0x1         0x6         aa:bb:cc:00:00:14     *        eth0
+10.8.0.1         0x1         0x2         aa:bb:cc:00:00:01     *        wg0
+"""
+
+def table(*entries):
+    return NeighborTable((ip, mac, "eth0") for ip, mac in entries)
+
+def test_proc_arp_skips_incomplete_entries(tmp_path):
+    (tmp_path / "arp").write_text(PROC_ARP)
+    assert list(read_proc_arp(str(tmp_path / "arp"))) == [
+        ("192.168.1.1", "aa:bb:cc:00:00:01", "eth0"), ("192.168.1.20", "aa:bb:cc:00:00:14", "eth0"),
+        ("10.8.0.1", "aa:bb:cc:00:00:01", "wg0")]
+
+def test_arp_command_output_from_every_platform(monkeypatch):
+    listing = ("? (192.168.1.1) at aa:bb:cc:0:0:1 on en0 ifscope [ethernet]\n"
+               "gateway (10.0.0.1) at AA:BB:CC:DD:EE:FF [ether] on eth0\n"
+               "? (10.0.0.9) at <incomplete> on eth0\n"
+               "Interface: 192.168.1.50 --- 0x4\n"
+               "  192.168.1.254         00-11-22-33-44-55     dynamic\n")
+    monkeypatch.setattr(subprocess, "run", lambda *args, **kwargs: subprocess.CompletedProcess(args, 0, listing, ""))
+    assert list(read_arp_command()) == [("192.168.1.1", "aa:bb:cc:00:00:01", "en0"),
+                                        ("10.0.0.1", "aa:bb:cc:dd:ee:ff", "eth0"),
+                                        ("192.168.1.254", "00:11:22:33:44:55", "-")]
+    assert normalize_mac("A-B-C-D-E-F") == "0a:0b:0c:0d:0e:0f"
+
+def test_conflicts_ignore_broadcast_and_multicast():
+    seen = table(("10.0.0.1", "aa:bb:cc:00:00:01"), ("10.0.0.2", "aa:bb:cc:00:00:01"),
+                 ("10.0.0.255", "ff:ff:ff:ff:ff:ff"), ("10.0.0.254", "ff:ff:ff:ff:ff:ff"),
+                 ("224.0.0.251", "01:00:5e:00:00:fb"), ("224.0.0.252", "01:00:5e:00:00:fb"))
+    assert seen.conflicts() == {"aa:bb:cc:00:00:01": {"10.0.0.1", "10.0.0.2"}}
+    assert [record["conflict"] for record in seen.records()] == [True, True, False, False, False, False]
+
+def test_diff_reports_only_what_changed():
+    before = table(("10.0.0.1", "aa:bb:cc:00:00:01"), ("10.0.0.2", "aa:bb:cc:00:00:01"),
+                   ("10.0.0.3", "aa:bb:cc:00:00:03"))
+    # the standing conflict is not news; 10.0.0.3 moving onto that MAC is
+    after = table(("10.0.0.1", "aa:bb:cc:00:00:01"), ("10.0.0.2", "aa:bb:cc:00:00:01"),
+                  ("10.0.0.3", "aa:bb:cc:00:00:01"), ("10.0.0.4", "aa:bb:cc:00:00:04"))
+    moved, claimed = after.diff(before)
+    assert moved == [("10.0.0.3", "aa:bb:cc:00:00:03", "aa:bb:cc:00:00:01")]
+    assert claimed == {"aa:bb:cc:00:00:01": ({"10.0.0.3"}, {"10.0.0.1", "10.0.0.2", "10.0.0.3"})}
+    assert after.diff(after) == ([], {})
+
+def test_watch_streams_events(monkeypatch, capsys):
+    snapshots = [table(("10.0.0.1", "aa:bb:cc:00:00:01"), ("10.0.0.2", "aa:bb:cc:00:00:01")),
+                 table(("10.0.0.1", "aa:bb:cc:00:00:09"), ("10.0.0.2", "aa:bb:cc:00:00:01"))]
+
+    def sleep(seconds):
+        if not snapshots:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(neighbors, "read_neighbors", lambda: snapshots.pop(0))
+    monkeypatch.setattr(neighbors, "time", SimpleNamespace(sleep=sleep, strftime=time.strftime))
+    monkeypatch.setattr(output, "mode", "jsonl")
+    monkeypatch.setattr(output, "writer", None)
+    watch_neighbors(None, interval=0)
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(event["event"], event.get("ip")) for event in events] == [("conflict", None), ("moved", "10.0.0.1")]
+    assert events[1]["old_mac"] == "aa:bb:cc:00:00:01" and events[1]["mac"] == "aa:bb:cc:00:00:09"
+
+@pytest.mark.parametrize("exists", [True, False])
+def test_read_neighbors_prefers_proc(monkeypatch, tmp_path, exists):
+    (tmp_path / "arp").write_text(PROC_ARP)
+    monkeypatch.setattr(neighbors, "PROC_ARP", str(tmp_path / "arp") if exists else str(tmp_path / "missing"))
+    monkeypatch.setattr(neighbors, "read_proc_arp", lambda: read_proc_arp(str(tmp_path / "arp")))
+    monkeypatch.setattr(neighbors, "read_arp_command", lambda: iter([("10.0.0.1", "aa:bb:cc:00:00:01", "-")]))
+    assert len(neighbors.read_neighbors()) == (3 if exists else 1)
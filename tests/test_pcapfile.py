@@ -0,0 +1,169 @@
+import json
+import math
+import socket
+import struct
+import sys
+
+import pytest
+
+from netcut import output
+from netcut.flows import FlowTable
+from netcut.packets import aggregate_chunk, analyze_capture, read_chunk
+from netcut.pcapfile import Capture, CaptureError
+
+def frame(src, dst, sport, dport, proto=6, size=0, vlan=None):
+    l4 = struct.pack("!HH", sport, dport) + bytes(16 + size)
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 20 + len(l4), 1, 0, 64, proto, 0,
+                     socket.inet_aton(src), socket.inet_aton(dst)) + l4
+    tag = struct.pack("!HH", 0x8100, vlan) if vlan is not None else b""
+    return b"\x02" * 6 + b"\x04" * 6 + tag + b"\x08\x00" + ip
+
+def traffic(count=60):
+    # a handful of flows, some of them VLAN tagged, at 10 packets a second
+    flows = [("10.0.0.1", "10.0.0.2", 40000, 443, 6, None), ("10.0.0.3", "10.0.0.2", 5353, 53, 17, 10),
+             ("10.0.0.2", "10.0.0.1", 443, 40000, 6, None), ("10.0.0.4", "10.0.0.5", 1234, 80, 6, 20)]
+    return [(1_700_000_000 + i / 10, frame(*flows[i % len(flows)][:4], proto=flows[i % len(flows)][4],
+                                           size=i * 7 % 300, vlan=flows[i % len(flows)][5]))
+            for i in range(count)]
+
+def write_pcap(path, packets, order="<", nano=False, linktype=1, snaplen=65535):
+    with open(path, "wb") as f:
+        f.write(struct.pack(order + "IHHiIII", 0xA1B23C4D if nano else 0xA1B2C3D4, 2, 4, 0, 0, snaplen, linktype))
+        for ts, data in packets:
+            sec, frac = divmod(round(ts * (1e9 if nano else 1e6)), 10 ** 9 if nano else 10 ** 6)
+            f.write(struct.pack(order + "IIII", sec, frac, min(len(data), snaplen), len(data)))
+            f.write(data[:snaplen])
+    return str(path)
+
+def block(order, kind, body):
+    body += bytes(-len(body) % 4)
+    return struct.pack(order + "II", kind, 12 + len(body)) + body + struct.pack(order + "I", 12 + len(body))
+
+def section(order, interfaces, packets):
+    # interfaces: [(linktype, if_tsresol byte or None)]; packets:
+    # [(interface, ts, data)], interface None for a simple packet block
+    blocks = [block(order, 0x0A0D0D0A, struct.pack(order + "IHHq", 0x1A2B3C4D, 1, 0, -1))]
+    for linktype, resol in interfaces:
+        options = struct.pack(order + "HH", 9, 1) + bytes([resol]) + bytes(3) + bytes(4) if resol is not None else b""
+        blocks.append(block(order, 1, struct.pack(order + "HHI", linktype, 0, 0) + options))
+    for iface, ts, data in packets:
+        if iface is None:
+            blocks.append(block(order, 3, struct.pack(order + "I", len(data)) + data))
+            continue
+        resol = interfaces[iface][1]
+        units = round(ts * (10 ** resol if resol is not None and not resol & 0x80 else
+                            2 ** (resol & 0x7F) if resol is not None else 1e6))
+        blocks.append(block(order, 6, struct.pack(order + "IIIII", iface, units >> 32, units & 0xFFFFFFFF,
+                                                    len(data), len(data)) + data))
+    return b"".join(blocks)
+
+def write_pcapng(path, packets):
+    # the second half goes in a big-endian section whose Ethernet interface
+    # is the second one, so chunks have to carry the right interface table
+    half = len(packets) // 2
+    with open(path, "wb") as f:
+        f.write(section("<", [(1, None), (101, 9)], [(0, ts, data) for ts, data in packets[:half]]))
+        f.write(section(">", [(101, 6), (1, None)], [(1, ts, data) for ts, data in packets[half:]]))
+    return str(path)
+
+def read(path):
+    with Capture(path) as capture:
+        return [(ts, bytes(capture.data[lo:hi]), length, header) for ts, lo, hi, length, header in capture.records()]
+
+@pytest.mark.parametrize("order,nano", [("<", False), (">", False), ("<", True), (">", True)])
+def test_pcap_byte_orders_and_resolutions(tmp_path, order, nano):
+    packets = traffic(5)
+    records = read(write_pcap(tmp_path / "a.pcap", packets, order, nano))
+    assert [data for _, data, _, _ in records] == [data for _, data in packets]
+    assert [ts for ts, _, _, _ in records] == pytest.approx([ts for ts, _ in packets], abs=1e-6)
+    assert {header for _, _, _, header in records} == {14}
+
+def test_pcap_snaplen_raw_ip_and_truncation(tmp_path):
+    packets = traffic(3)
+    records = read(write_pcap(tmp_path / "a.pcap", packets, snaplen=40))
+    # frames are cut at the snap length, the original length is kept
+    assert [(len(data), length) for _, data, length, _ in records] == [(40, len(data)) for _, data in packets]
+
+    raw = [(ts, data[14:]) for ts, data in packets]
+    assert {header for _, _, _, header in read(write_pcap(tmp_path / "raw.pcap", raw, linktype=101))} == {0}
+
+    # a capture cut off mid-record ends at the last whole one
+    path = write_pcap(tmp_path / "cut.pcap", packets)
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 10)
+    assert len(read(path)) == 2
+
+def test_unreadable_captures_raise_capture_error(tmp_path):
+    (tmp_path / "empty.pcap").write_bytes(b"")
+    (tmp_path / "text.pcap").write_text("not a capture at all\n")
+    with pytest.raises(CaptureError, match="is empty"):
+        Capture(str(tmp_path / "empty.pcap"))
+    with pytest.raises(CaptureError, match="not a pcap or pcapng"):
+        Capture(str(tmp_path / "text.pcap"))
+    with pytest.raises(CaptureError, match="unsupported link type 147"):
+        Capture(write_pcap(tmp_path / "user.pcap", traffic(1), linktype=147))
+
+def test_pcapng_interfaces_resolutions_and_sections(tmp_path):
+    eth, raw = traffic(2)
+    data = (section("<", [(1, None), (101, 3)], [(0, eth[0], eth[1]), (1, raw[0], raw[1][14:])])
+            # a big-endian section with its own interface table, power-of-two
+            # timestamps and a simple packet block
+            + section(">", [(101, 0x80 | 10), (147, None)], [(0, 1024.5, raw[1][14:]), (1, 1.0, eth[1]),
+                                                            (None, 0, raw[1][14:])]))
+    (tmp_path / "a.pcapng").write_bytes(data)
+    records = read(str(tmp_path / "a.pcapng"))
+    assert [(header, data) for _, data, _, header in records] == \
+        [(14, eth[1]), (0, raw[1][14:]), (0, raw[1][14:]), (0, raw[1][14:])]
+    # the link type 147 interface can't be parsed, so its packet is skipped
+    assert [ts for ts, _, _, _ in records] == pytest.approx([eth[0], raw[0], 1024.5, 0.0], abs=1e-3)
+
+@pytest.mark.parametrize("writer", [write_pcap, write_pcapng])
+def test_chunks_cover_every_record_once(tmp_path, writer):
+    path = writer(tmp_path / "a.cap", traffic())
+    expected = read(path)
+    with Capture(path) as capture:
+        for count in (1, 2, 3, 7, 500):
+            chunks = capture.chunks(count)
+            assert chunks[-1][1] == len(capture.data)
+            assert all(end == start for (_, end, _), (start, _, _) in zip(chunks, chunks[1:]))
+            records = [(ts, bytes(capture.data[lo:hi]), length, header)
+                       for start, end, state in chunks for ts, lo, hi, length, header in capture.records(start, end, state)]
+            assert records == expected
+        assert len(capture.chunks(4)) > 2
+
+@pytest.mark.parametrize("writer", [write_pcap, write_pcapng])
+def test_parallel_chunks_merge_to_the_single_pass(tmp_path, writer):
+    path = writer(tmp_path / "a.cap", traffic(200))
+    single = FlowTable(sys.maxsize, math.inf)
+    with Capture(path) as capture:
+        read_chunk(capture, single, None)
+        chunks = capture.chunks(3)
+    merged = FlowTable(sys.maxsize, math.inf)
+    for start, end, state in chunks:
+        for partial in aggregate_chunk(path, start, end, state, (None, None, None, None)):
+            merged.merge(*partial)
+    assert len(single) == 4 and single.packets == 200
+    assert sorted(merged.partial()) == sorted(single.partial())
+    # VLAN-tagged flows are keyed on the IP header behind the tag
+    assert (17, socket.inet_aton("10.0.0.3"), socket.inet_aton("10.0.0.2"), 5353, 53) in single.flows
+
+    udp = FlowTable(sys.maxsize, math.inf)
+    for start, end, state in chunks:
+        for partial in aggregate_chunk(path, start, end, state, (None, "udp", None, None)):
+            udp.merge(*partial)
+    assert [key[0] for key in udp.flows] == [17] and udp.packets == 50
+
+def test_analyze_capture_workers_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(output, "mode", "jsonl")
+    monkeypatch.setattr(output, "writer", None)
+    path = write_pcapng(tmp_path / "a.pcapng", traffic(120))
+    exports = []
+    for workers in (1, 2):
+        export = tmp_path / f"flows-{workers}.jsonl"
+        analyze_capture(path, workers=workers, export=str(export))
+        exports.append(sorted(open(export), key=lambda line: json.loads(line)["sport"]))
+    assert exports[0] == exports[1] and len(exports[0]) == 4
+    flows = [json.loads(line) for line in exports[0]]
+    assert sum(flow["packets"] for flow in flows) == 120
+    assert {(flow["src"], flow["dport"]) for flow in flows} == \
+        {("10.0.0.1", 443), ("10.0.0.3", 53), ("10.0.0.2", 40000), ("10.0.0.4", 80)}
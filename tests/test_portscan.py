@@ -0,0 +1,79 @@
+import errno
+import socket
+import threading
+
+import pytest
+
+from netcut import portscan
+from netcut.portscan import CLOSED, FILTERED, OPEN, ScanController, iter_probes, parse_ports, run_scan
+
+def scan(probes, controller=None):
+    results = {}
+
+    def on_result(target, state, rtt):
+        results[target[2], target[3]] = state
+
+    # the scan runs in a thread so a scheduler that never drains fails the
+    # test instead of hanging it
+    thread = threading.Thread(target=run_scan, args=(probes, controller or ScanController(64), on_result), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "run_scan never finished"
+    return results
+
+def test_scan_finds_listeners_among_closed_ports():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    ports = [listener.getsockname()[1], closed.getsockname()[1]]
+    try:
+        results = scan(iter_probes([(socket.AF_INET, "127.0.0.1", "localhost")], ports))
+    finally:
+        listener.close()
+        closed.close()
+    assert results == {(ports[0], "127.0.0.1"): OPEN, (ports[1], "127.0.0.1"): CLOSED}
+
+def test_permanent_socket_error_is_reported_not_retried(monkeypatch):
+    real = socket.socket
+    calls = []
+
+    def no_ipv6(family=socket.AF_INET, *args):
+        calls.append(family)
+        if family == socket.AF_INET6:
+            raise OSError(errno.EAFNOSUPPORT, "Address family not supported by protocol")
+        return real(family, *args)
+
+    monkeypatch.setattr(portscan.socket, "socket", no_ipv6)
+    results = scan(iter_probes([(socket.AF_INET6, "2001:db8::1", "v6")], [80, 443]))
+    assert results == {(80, "2001:db8::1"): FILTERED, (443, "2001:db8::1"): FILTERED}
+    assert calls == [socket.AF_INET6, socket.AF_INET6]
+
+def test_local_exhaustion_is_retried(monkeypatch):
+    real = socket.socket
+    failures = [errno.EMFILE]
+
+    def exhausted_once(family=socket.AF_INET, *args):
+        if failures:
+            raise OSError(failures.pop(), "Too many open files")
+        return real(family, *args)
+
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    monkeypatch.setattr(portscan.socket, "socket", exhausted_once)
+    try:
+        results = scan(iter_probes([(socket.AF_INET, "127.0.0.1", "localhost")], [port]))
+    finally:
+        closed.close()
+    assert results == {(port, "127.0.0.1"): CLOSED}
+
+@pytest.mark.parametrize("spec, ports", [("22", [22]), ("80,22-23,80", [22, 23, 80]), ("-3", [1, 2, 3])])
+def test_parse_ports(spec, ports):
+    assert parse_ports(spec) == ports
+
+@pytest.mark.parametrize("spec", ["0", "10-5", "70000", ","])
+def test_parse_ports_rejects(spec):
+    with pytest.raises(ValueError):
+        parse_ports(spec)
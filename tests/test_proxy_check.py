@@ -0,0 +1,123 @@
+import io
+import json
+import socket
+import ssl
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from netcut.proxy_check import ProxyCheck, iter_proxies
+
+TLS = Path(__file__).parent / "fixtures" / "tls"
+
+def server_context():
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(TLS / "leaf.pem", TLS / "leaf.key")
+    return context
+
+@pytest.fixture
+def echo_url():
+    # HTTPS echo endpoint with the fixture certificate (CN=localhost)
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({"origin": "203.0.113.7"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.handle_error = lambda *args: None
+    # handshakes run in the handler threads, not in the accept loop
+    server.socket = server_context().wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"https://localhost:{server.server_port}/ip"
+    server.shutdown()
+    server.server_close()
+
+def relay(src, dst):
+    try:
+        while data := src.recv(65536):
+            dst.sendall(data)
+    except OSError:
+        pass
+    finally:
+        dst.close()
+
+@pytest.fixture
+def connect_proxy():
+    # minimal CONNECT proxy, optionally behind TLS itself
+    listeners = []
+
+    def start(tls=False):
+        listener = socket.create_server(("127.0.0.1", 0))
+        listeners.append(listener)
+        context = server_context() if tls else None
+
+        def serve():
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return
+                threading.Thread(target=tunnel, args=(conn,), daemon=True).start()
+
+        def tunnel(conn):
+            try:
+                if context:
+                    conn = context.wrap_socket(conn, server_side=True)
+                request = b""
+                while b"\r\n\r\n" not in request:
+                    request += conn.recv(4096)
+                host, _, port = request.split()[1].decode().rpartition(":")
+                upstream = socket.create_connection(("127.0.0.1" if host == "localhost" else host, int(port)))
+            except (OSError, ValueError, IndexError):
+                conn.close()
+                return
+            conn.sendall(b"HTTP/1.1 200 Connection established\r\n\r\n")
+            threading.Thread(target=relay, args=(upstream, conn), daemon=True).start()
+            relay(conn, upstream)
+        threading.Thread(target=serve, daemon=True).start()
+        return f"{'https' if tls else 'http'}://127.0.0.1:{listener.getsockname()[1]}"
+    yield start
+    for listener in listeners:
+        listener.close()
+
+@pytest.fixture
+def trust_fixture_ca(monkeypatch):
+    monkeypatch.setenv("SSL_CERT_FILE", str(TLS / "ca.pem"))
+
+def test_tunnel_to_verified_target(connect_proxy, echo_url, trust_fixture_ca):
+    result = ProxyCheck(echo_url, timeout=3).check(connect_proxy())
+    assert result["ok"], result
+    assert result["ip"] == "203.0.113.7" and result["status"] == 200
+
+def test_untrusted_target_certificate_fails(connect_proxy, echo_url):
+    # what an intercepting proxy looks like: the tunnel works, the cert does not
+    result = ProxyCheck(echo_url, timeout=3).check(connect_proxy())
+    assert not result["ok"] and "certificate verify failed" in result["error"]
+
+def test_tls_proxy_hop_is_verified_unless_insecure(connect_proxy, echo_url, trust_fixture_ca, monkeypatch):
+    proxy = connect_proxy(tls=True)
+    first = ProxyCheck(echo_url, timeout=3).check(proxy)
+    assert first["ok"], first
+
+    monkeypatch.delenv("SSL_CERT_FILE")
+    assert "certificate verify failed" in ProxyCheck(echo_url, timeout=3).check(proxy)["error"]
+    # --insecure gets past the proxy's own certificate, never the target's
+    result = ProxyCheck(echo_url, timeout=3, insecure=True).check(proxy)
+    assert not result["ok"] and "certificate verify failed" in result["error"]
+    assert "connect_ms" not in result
+
+def test_reading_proxies_from_stdin_leaves_it_open(monkeypatch):
+    stdin = io.StringIO("# pool\nhttp://127.0.0.1:3128\n\nsocks5://127.0.0.1:1080\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert list(iter_proxies("-")) == ["http://127.0.0.1:3128", "socks5://127.0.0.1:1080"]
+    assert not stdin.closed
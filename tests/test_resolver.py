@@ -0,0 +1,65 @@
+import asyncio
+import socket
+
+import pytest
+
+import netcut.resolver as resolver
+from netcut.resolver import DNSError, Resolver, resolve_all, resolve_host, resolve_many
+
+@pytest.fixture
+def system(monkeypatch, tmp_path):
+    # fakes resolv.conf and /etc/hosts for the module-level helpers
+    hosts = tmp_path / "hosts"
+    hosts.write_text("127.0.0.1 localhost\n10.1.2.3 override.test pinned  # local\n")
+    monkeypatch.setattr(resolver, "HOSTS_FILE", str(hosts))
+    monkeypatch.setattr(resolver, "shared", None)
+
+    def configure(nameservers, search=(), ndots=1):
+        monkeypatch.setattr(resolver, "system_config", lambda: (list(nameservers), list(search), ndots))
+    return configure
+
+def lookup(res, name):
+    async def main():
+        try:
+            return await res.addresses(name)
+        finally:
+            res.close()
+    return asyncio.run(main())
+
+def test_malformed_reply_moves_to_next_server(dns_stub):
+    bad = dns_stub({}, garbage=["broken.test"])
+    good = dns_stub({"broken.test": {"A": ["192.0.2.10"]}})
+    assert lookup(Resolver([bad.address, good.address], timeout=1), "broken.test") == ["192.0.2.10"]
+    with pytest.raises(DNSError, match="malformed"):
+        lookup(Resolver([bad.address], timeout=1), "broken.test")
+
+def test_bad_name_is_a_dns_error(dns_stub):
+    stub = dns_stub({})
+    with pytest.raises(DNSError):
+        lookup(Resolver([stub.address], timeout=1), "x" * 70 + ".test")
+
+def test_without_nameservers_literals_and_hosts_still_resolve(system):
+    system([])
+    assert resolve_many(["192.0.2.7", "::1", "localhost", "override.test"]) == ["192.0.2.7", "::1", "127.0.0.1", "10.1.2.3"]
+    assert resolve_host("pinned") == "10.1.2.3"
+
+def test_hosts_file_wins_over_dns(system, dns_stub):
+    stub = dns_stub({"override.test": {"A": ["198.51.100.9"]}, "other.test": {"A": ["198.51.100.10"]}})
+    system([stub.address])
+    assert resolve_host("override.test") == "10.1.2.3"
+    assert resolve_many(["override.test", "other.test"]) == ["10.1.2.3", "198.51.100.10"]
+    assert ("override.test", "A") not in stub.queries
+
+def test_search_domains_apply_to_short_names(system, dns_stub):
+    stub = dns_stub({"intranet.corp.test": {"A": ["10.9.9.9"]}, "db.eu.corp.test": {"AAAA": ["2001:db8::9"]}})
+    system([stub.address], search=["corp.test"])
+    assert resolve_host("intranet") == "10.9.9.9"
+    assert resolve_all("db.eu") == ["2001:db8::9"]
+    # as given first once the name has ndots dots, the search list after
+    assert [name for name, _ in stub.queries if name.startswith("db.eu")] == ["db.eu", "db.eu", "db.eu.corp.test", "db.eu.corp.test"]
+
+def test_unknown_name_raises_like_gethostbyname(system, dns_stub):
+    system([dns_stub({}).address])
+    with pytest.raises(socket.gaierror):
+        resolve_host("nothing-here.invalid")
+    assert resolve_many(["nothing-here.invalid"]) == [None]
@@ -0,0 +1,71 @@
+import socket
+import ssl
+import threading
+from pathlib import Path
+
+import pytest
+
+from netcut.ssl_viewer import CertCache, decode_der, inspect, make_contexts, summarize
+
+TLS = Path(__file__).parent / "fixtures" / "tls"
+
+def der(name):
+    return ssl.PEM_cert_to_DER_cert((TLS / name).read_text())
+
+@pytest.fixture
+def tls_server(tmp_path):
+    # serves the leaf plus its CA on loopback until the test ends
+    chain = tmp_path / "chain.pem"
+    chain.write_text((TLS / "leaf.pem").read_text() + (TLS / "ca.pem").read_text())
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(chain, TLS / "leaf.key")
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except OSError:
+                return
+            try:
+                with context.wrap_socket(conn, server_side=True) as tls:
+                    tls.recv(1)
+            except (OSError, ssl.SSLError):
+                pass
+    threading.Thread(target=serve, daemon=True).start()
+    yield listener.getsockname()[1]
+    listener.close()
+
+def test_decode_der_reads_the_fields_getpeercert_would():
+    info = decode_der(der("leaf.pem"))
+    assert info == {
+        "subject": ((("organizationName", "Exämple B.V."),), (("commonName", "localhost"),)),
+        "issuer": ((("countryName", "NL"),), (("organizationName", "Netcut Test"),), (("commonName", "Netcut Test Root"),)),
+        "serialNumber": "C0FFEE1234",
+        "notBefore": "Oct 18 21:31:47 2026 GMT",
+        "notAfter": "Nov 29 21:31:47 2056 GMT",
+        "subjectAltName": (("DNS", "localhost"), ("DNS", "*.netcut.test"), ("IP Address", "127.0.0.1")),
+    }
+    assert ssl.cert_time_to_seconds(info["notAfter"]) > ssl.cert_time_to_seconds(info["notBefore"])
+    assert summarize(decode_der(der("ca.pem")))["subject"] == "Netcut Test Root"
+
+@pytest.mark.parametrize("data", [b"", b"\x30\x82\x01", der("leaf.pem")[:200], b"\x30\x03\x02\x01\x01"])
+def test_decode_der_rejects_garbage(data):
+    with pytest.raises(ValueError):
+        decode_der(data)
+
+def test_inspect_untrusted_then_trusted(tls_server):
+    verifying, permissive = make_contexts()
+    cache = CertCache()
+    result = inspect("127.0.0.1", tls_server, "localhost", 5, cache, verifying, permissive)
+    assert result["verified"] is False and "certificate" in result["verify_error"]
+    leaf = result["chain"][0]
+    assert (leaf["subject"], leaf["issuer"], leaf["serial"]) == ("localhost", "Netcut Test Root", "C0FFEE1234")
+    assert leaf["sans"] == ["localhost", "*.netcut.test"]
+    assert result["days_left"] > 10000
+
+    trusted = ssl.create_default_context(cafile=TLS / "ca.pem")
+    again = inspect("127.0.0.1", tls_server, "localhost", 5, cache, trusted, permissive)
+    assert again["verified"] is True
+    assert again["chain"][0] == leaf
+    assert cache.hits >= 1
@@ -0,0 +1,49 @@
+import json
+
+from netcut.subdomains import enumerate_subdomains
+
+RECORDS = {
+    "example.com": {"A": ["93.184.215.14"]},
+    "www.example.com": {"A": ["93.184.215.14"]},
+    "api.example.com": {"A": ["10.0.0.5", "10.0.0.6"]},
+    "v6.example.com": {"AAAA": ["2001:db8::6"]},
+    "dev.example.com": {},
+}
+
+def test_enumerate_resolves_in_scope_names(certspotter, dns_stub):
+    url, requests = certspotter
+    # a garbled reply for one name must not take its worker down
+    stub = dns_stub(RECORDS, garbage=["mail.example.com"])
+    live = enumerate_subdomains("Example.com.", nameserver=stub.address, url=url, concurrency=4)
+    assert live == {
+        "example.com": ["93.184.215.14"],
+        "www.example.com": ["93.184.215.14"],
+        "api.example.com": ["10.0.0.5", "10.0.0.6"],
+        "v6.example.com": ["2001:db8::6"],
+    }
+    assert requests[0]["domain"] == "example.com" and "after" not in requests[0]
+    assert [r.get("after") for r in requests[1:]] == ["4187203", "4190442"]
+    # wildcards are never looked up, the out-of-scope name never listed
+    assert not any(name.startswith("*.") or name == "example.net" for name, _ in stub.queries)
+
+def test_second_run_resumes_from_cache(certspotter, dns_stub, cache_root):
+    url, requests = certspotter
+    first = enumerate_subdomains("example.com", resolve=False, url=url)
+    assert first == ["*.example.com", "api.example.com", "dev.example.com", "example.com",
+                     "gone.example.com", "mail.example.com", "v6.example.com", "www.example.com"]
+    cached = json.loads((cache_root / "certspotter" / "example.com.json").read_text())
+    assert cached["after"] == "4190442"
+
+    requests.clear()
+    stub = dns_stub(RECORDS)
+    live = enumerate_subdomains("example.com", nameserver=stub.address, url=url)
+    assert requests == [{"domain": "example.com", "include_subdomains": "true", "expand": "dns_names", "after": "4190442"}]
+    # cached names are resolved again even though no page was new
+    assert set(live) == {"example.com", "www.example.com", "api.example.com", "v6.example.com"}
+
+def test_refresh_ignores_cache(certspotter, dns_stub):
+    url, requests = certspotter
+    enumerate_subdomains("example.com", resolve=False, url=url)
+    requests.clear()
+    enumerate_subdomains("example.com", resolve=False, url=url, refresh=True)
+    assert "after" not in requests[0]
@@ -0,0 +1,38 @@
+import pytest
+
+from netcut.tech_stack import OVERLAP, SIGNATURES, Detections, Matcher, leading_literal
+
+@pytest.mark.parametrize("pattern, literal", [
+    (r"name=\"__VIEWSTATE\"", b'name="__viewstate"'),
+    (r"/wp-content/(?:themes|plugins)/", b"/wp-content/"),
+    (r"data-v-[0-9a-f]{8}", b"data-v-"),
+    (r"ng-app\b", b"ng-app"),
+    (r"abc?d", b"ab"),
+    (r"foo+", b"fo"),
+    (r"x{2}y", b""),
+    (r"a\.b|c", b""),
+    (r"(?:a|b)cd", b""),
+    (r"[|]abc", b""),
+])
+def test_leading_literal(pattern, literal):
+    assert leading_literal(pattern) == literal
+
+def test_match_body_across_chunk_boundary():
+    matcher = Matcher()
+    found = Detections(SIGNATURES)
+    page = (b"<html><head><meta name=\"generator\" content=\"WordPress 6.4.2\">"
+            b"<script src=\"https://code.jquery.com/jquery-3.7.1.min.js\"></script></head>"
+            b"<body ng-version=\"17.0.5\"><div id=\"___gatsby\"></div></body></html>")
+    # fed the way fingerprint() does: each chunk after the overlap tail
+    split = page.index(b"jquery-3") + 3
+    matcher.match_body(page[:split], found)
+    matcher.match_body(page[:split][-OVERLAP:] + page[split:], found)
+    techs = {item["name"]: item for item in found.resolve()}
+    assert techs["WordPress"]["version"] == "6.4.2"
+    assert techs["jQuery"]["version"] == "3.7.1"
+    assert techs["Angular"]["version"] == "17.0.5"
+    assert {"Gatsby", "React", "PHP"} <= set(techs)
+
+def test_html_signature_without_literal_prefix_is_rejected():
+    with pytest.raises(ValueError, match="literal prefix"):
+        Matcher({"Odd": {"category": "Test", "html": [r"(?:foo|bar)baz"]}})
@@ -0,0 +1,153 @@
+import socket
+import struct
+import time
+
+import pytest
+
+from netcut import traceroute
+from netcut.inet import checksum
+from netcut.traceroute import IP_HEADER, Target, Tracer
+
+ROUTER = socket.inet_aton("10.9.8.7")
+
+@pytest.fixture
+def tracer():
+    # nothing is sent here: probes are built with packet() and replies are
+    # hand-built bytes fed straight to on_icmp()/on_tcp()
+    tracers = []
+
+    def make(proto="udp", paris=True):
+        try:
+            tracers.append(Tracer(proto, paris, rate=0))
+        except PermissionError:
+            pytest.skip("traceroute needs raw sockets")
+        return tracers[-1]
+    yield make
+    for tracer in tracers:
+        tracer.close()
+
+def target(ip="127.0.0.2", dport=33434):
+    return Target("example.test", ip, 40000, dport)
+
+def icmp_error(kind, src, quoted):
+    # a router's reply: its own IP header, the ICMP header, then the IP
+    # header and first 8 bytes of the probe that triggered it
+    body = struct.pack("!BBHI", kind, 0, 0, 0) + quoted[:28]
+    return IP_HEADER.pack(0x45, 0, 20 + len(body), 0, 0, 64, socket.IPPROTO_ICMP, 0, src, b"\x7f\x00\x00\x01") + body
+
+def tcp_reply(src, sport, dport, ack, flags):
+    header = struct.pack("!HHIIBBHHH", sport, dport, 0, ack, 5 << 4, flags, 0, 0, 0)
+    return IP_HEADER.pack(0x45, 0, 40, 0, 0, 64, socket.IPPROTO_TCP, 0, src, b"\x7f\x00\x00\x01") + header
+
+def sent(tracer, t, ttl, probe_id):
+    t.hops.setdefault(ttl, [0, traceroute.Counter(), []])[0] += 1
+    tracer.probes[probe_id] = (t, ttl, time.perf_counter())
+    return tracer.packet(t, ttl, probe_id)
+
+def test_icmp_probes_keep_the_checksum_constant(tracer):
+    t = target()
+    tr = tracer("icmp")
+    probes = [(1, 7), (2, 8), (9, 0xFFFF)]
+    packets = [tr.packet(t, ttl, probe_id) for ttl, probe_id in probes]
+    for packet, (ttl, probe_id) in zip(packets, probes):
+        version, _, length, ident, _, hop_limit, proto, _, src, dst = IP_HEADER.unpack_from(packet)
+        assert (version, length, ident, hop_limit, proto) == (0x45, len(packet), probe_id, ttl, socket.IPPROTO_ICMP)
+        assert (src, dst) == (t.src, t.dst)
+        assert checksum(packet[20:]) == 0
+    # Paris mode: type, code, checksum, id and sequence are the same for every probe
+    assert len({packet[20:28] for packet in packets}) == 1
+
+    classic = tracer("icmp", paris=False)
+    assert classic.packet(t, 5, 7)[26:28] == b"\x00\x05"
+
+def test_udp_probes_vary_the_port_only_in_classic_mode(tracer):
+    t = target()
+    paris, classic = tracer("udp"), tracer("udp", paris=False)
+    assert {struct.unpack_from("!HH", paris.packet(t, ttl, ttl), 20) for ttl in (1, 4)} == {(40000, 33434)}
+    assert struct.unpack_from("!HH", classic.packet(t, 4, 4), 20) == (40000, 33437)
+    assert paris.packet(t, 1, 1)[28:] == b"NCUT"
+
+def test_tcp_probes_carry_the_id_in_the_sequence_number(tracer):
+    t = target(dport=443)
+    packet = tracer("tcp").packet(t, 3, 0x1234)
+    sport, dport, seq, ack, offset, flags = struct.unpack_from("!HHIIBB", packet, 20)
+    assert (sport, dport, seq, ack, offset, flags) == (40000, 443, 0x1234, 0, 5 << 4, traceroute.TCP_SYN)
+    pseudo = t.src + t.dst + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(packet) - 20)
+    assert checksum(pseudo + packet[20:]) == 0
+
+def test_time_exceeded_is_credited_to_the_quoted_probe(tracer):
+    tr = tracer("udp")
+    near, far = target(), target("127.0.0.3")
+    tr.add(near)
+    tr.add(far)
+    first, second = sent(tr, near, 1, 100), sent(tr, far, 2, 101)
+    tr.on_icmp(icmp_error(traceroute.ICMP_TIME_EXCEEDED, ROUTER, second), time.perf_counter())
+    tr.on_icmp(icmp_error(traceroute.ICMP_TIME_EXCEEDED, ROUTER, first), time.perf_counter())
+    assert near.hops[1][1] == {"10.9.8.7": 1} and far.hops[2][1] == {"10.9.8.7": 1}
+    assert near.distance is None and far.distance is None
+    assert tr.probes == {}
+
+    # port unreachable comes from the destination and ends the trace there
+    tr.on_icmp(icmp_error(traceroute.ICMP_UNREACHABLE, near.dst, sent(tr, near, 4, 102)), time.perf_counter())
+    assert near.hops[4][1] == {"127.0.0.2": 1} and near.distance == 4
+
+def test_replies_that_do_not_match_are_ignored(tracer):
+    tr = tracer("udp")
+    t = target()
+    tr.add(t)
+    packet = sent(tr, t, 1, 200)
+    # quotes a probe to some other destination
+    other = packet[:16] + socket.inet_aton("127.0.0.9") + packet[20:]
+    tr.on_icmp(icmp_error(traceroute.ICMP_TIME_EXCEEDED, ROUTER, other), time.perf_counter())
+    # too short to quote a probe at all
+    tr.on_icmp(icmp_error(traceroute.ICMP_TIME_EXCEEDED, ROUTER, packet)[:40], time.perf_counter())
+    tr.on_icmp(icmp_error(traceroute.ICMP_TIME_EXCEEDED, ROUTER, sent(tr, t, 2, 999)), time.perf_counter())
+    assert t.hops[1][2] == [] and len(t.hops[2][2]) == 1
+    assert 200 in tr.probes
+
+def test_echo_reply_reaches_the_destination(tracer):
+    tr = tracer("icmp")
+    t = target()
+    tr.add(t)
+    probe = sent(tr, t, 3, 300)[20:]
+    reply = bytes([traceroute.ICMP_ECHO_REPLY]) + probe[1:]
+    tr.on_icmp(IP_HEADER.pack(0x45, 0, 20 + len(reply), 0, 0, 64, socket.IPPROTO_ICMP, 0, t.dst, t.src) + reply,
+               time.perf_counter())
+    assert t.hops[3][1] == {"127.0.0.2": 1} and t.distance == 3
+
+    # an echo reply from anywhere but the target isn't ours
+    reply = bytes([traceroute.ICMP_ECHO_REPLY]) + sent(tr, t, 4, 301)[21:]
+    tr.on_icmp(IP_HEADER.pack(0x45, 0, 20 + len(reply), 0, 0, 64, socket.IPPROTO_ICMP, 0, ROUTER, t.src) + reply,
+               time.perf_counter())
+    assert 301 in tr.probes
+
+def test_tcp_reply_acks_the_probe_id(tracer):
+    tr = tracer("tcp")
+    t = target(dport=443)
+    tr.add(t)
+    sent(tr, t, 5, 0xFFFF)
+    sent(tr, t, 6, 400)
+    # a bare SYN and a reply to some other port are not answers
+    tr.on_tcp(tcp_reply(t.dst, 443, 40000, 401, traceroute.TCP_SYN), time.perf_counter())
+    tr.on_tcp(tcp_reply(t.dst, 22, 40000, 401, traceroute.TCP_RST | traceroute.TCP_ACK), time.perf_counter())
+    assert 400 in tr.probes
+    tr.on_tcp(tcp_reply(t.dst, 443, 40000, 401, traceroute.TCP_SYN | traceroute.TCP_ACK), time.perf_counter())
+    # the acknowledgement number wraps with the 16-bit id
+    tr.on_tcp(tcp_reply(t.dst, 443, 40000, 0x10000, traceroute.TCP_RST | traceroute.TCP_ACK), time.perf_counter())
+    assert tr.probes == {}
+    assert t.hops[5][1] == t.hops[6][1] == {"127.0.0.2": 1} and t.distance == 5
+
+def test_pending_ids_are_not_reused(tracer):
+    tr = tracer("udp")
+    t = target()
+    tr.add(t)
+    tr.timeout = 0.2
+    sent(tr, t, 1, 50)
+    tr.next_id = 50
+    started = time.perf_counter()
+    # the probe in flight under id 50 is waited out, then dropped as lost
+    assert tr.take_id() == 50
+    assert time.perf_counter() - started >= 0.2
+    assert 50 not in tr.probes and tr.next_id == 51
+    tr.next_id = 0xFFFF
+    assert tr.take_id() == 0xFFFF and tr.take_id() == 1
@@ -0,0 +1,120 @@
+import io
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+from netcut import whois_lookup
+from netcut.whois_lookup import WhoisClient, iter_domains
+
+RECORD = """Domain Name: EXAMPLE.COM
+Registrar: RESERVED-Internet Assigned Numbers Authority
+Creation Date: 1995-08-14T04:00:00Z
+Registry Expiry Date: 2099-08-13T04:00:00Z
+Name Server: A.IANA-SERVERS.NET
+Name Server: B.IANA-SERVERS.NET
+Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited
+"""
+
+class WhoisStub(socketserver.ThreadingTCPServer):
+    # answers one query per connection over loopback TCP; `answers` maps a
+    # query to its replies, handed out in order with the last one repeated
+    daemon_threads = True
+
+    def __init__(self, answers):
+        self.answers = {key: list(value) for key, value in answers.items()}
+        self.queries = []
+        super().__init__(("127.0.0.1", 0), WhoisHandler)
+        self.address = f"127.0.0.1:{self.server_address[1]}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+class WhoisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        text = self.rfile.readline().decode().strip()
+        self.server.queries.append(text)
+        replies = self.server.answers.get(text, ["No match for this query.\n"])
+        self.wfile.write((replies.pop(0) if len(replies) > 1 else replies[0]).encode())
+
+@pytest.fixture
+def whois_stub():
+    stubs = []
+
+    def start(answers):
+        stubs.append(WhoisStub(answers))
+        return stubs[-1]
+    yield start
+    for stub in stubs:
+        stub.shutdown()
+        stub.server_close()
+
+@pytest.fixture
+def registry(whois_stub, monkeypatch):
+    registry = whois_stub({"example.com": [RECORD]})
+    iana = whois_stub({"com": [f"% IANA WHOIS server\n\ndomain: COM\nrefer: {registry.address}\n"]})
+    monkeypatch.setattr(whois_lookup, "IANA", iana.address)
+    return iana, registry
+
+def test_lookup_follows_referral(registry):
+    iana, registry = registry
+    result = WhoisClient(timeout=2, rate=0).lookup("Example.COM.")
+    assert result.error is None
+    assert result.server == registry.address
+    assert result.registrar == "RESERVED-Internet Assigned Numbers Authority"
+    assert result.creation_date == "1995-08-14T04:00:00+00:00"
+    assert result.expiration_date == "2099-08-13T04:00:00+00:00"
+    assert result.name_servers == ["a.iana-servers.net", "b.iana-servers.net"]
+    assert result.status == ["clientDeleteProhibited"]
+    assert result.days_left > 0
+    assert iana.queries == ["com"] and registry.queries == ["example.com"]
+
+def test_repeat_lookups_come_from_cache(registry):
+    iana, registry = registry
+    client = WhoisClient(timeout=2, rate=0)
+    client.lookup("example.com")
+    again = client.lookup("example.com")
+    assert again.cached and again.registrar == "RESERVED-Internet Assigned Numbers Authority"
+    assert client.responses.hits == 1
+    client.save()
+
+    # a fresh client reads both caches back from disk
+    fresh = WhoisClient(timeout=2, rate=0)
+    assert fresh.lookup("example.com").cached
+    assert iana.queries.count("com") == 1 and registry.queries == ["example.com"]
+
+    refreshed = WhoisClient(timeout=2, rate=0, refresh=True).lookup("example.com")
+    assert not refreshed.cached and registry.queries == ["example.com", "example.com"]
+
+def test_throttled_reply_backs_off_and_retries(whois_stub, monkeypatch):
+    registry = whois_stub({"example.com": ["Rate limit exceeded, please try again later.\n", RECORD]})
+    monkeypatch.setattr(whois_lookup, "BACKOFF", 0.2)
+    client = WhoisClient(timeout=2, rate=0, server=registry.address)
+    started = time.monotonic()
+    result = client.lookup("example.com")
+    assert result.error is None and result.registrar
+    assert registry.queries == ["example.com", "example.com"]
+    # the retry waited out the back-off scheduled for this server
+    assert time.monotonic() - started >= 0.2
+
+def test_persistent_throttling_gives_up_uncached(whois_stub, monkeypatch):
+    registry = whois_stub({"example.com": ["Too many queries from your IP.\n"]})
+    monkeypatch.setattr(whois_lookup, "BACKOFF", 0.01)
+    client = WhoisClient(timeout=2, rate=0, server=registry.address)
+    result = client.lookup("example.com")
+    assert result.error == f"{registry.address} is rate limiting us"
+    assert len(registry.queries) == whois_lookup.RETRIES
+    assert client.responses.entries == {}
+
+def test_short_record_mentioning_exceeded_is_not_throttling(whois_stub):
+    record = "Domain Name: example.nl\nRegistrar: Exceeded Hosting B.V.\nCreation Date: 2001-02-03\n"
+    registry = whois_stub({"example.nl": [record]})
+    result = WhoisClient(timeout=2, rate=0, server=registry.address).lookup("example.nl")
+    assert result.registrar == "Exceeded Hosting B.V."
+    assert registry.queries == ["example.nl"]
+
+def test_reading_domains_from_stdin_leaves_it_open(monkeypatch):
+    stdin = io.StringIO("# portfolio\nexample.com  renews in march\n\nexample.nl\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert list(iter_domains(["example.org"], "-")) == ["example.org", "example.com", "example.nl"]
+    assert not stdin.closed